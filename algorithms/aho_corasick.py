@@ -0,0 +1,166 @@
+"""
+Implementación del algoritmo Aho-Corasick para búsqueda de múltiples patrones.
+Compila todo el conjunto de patrones en un autómata y encuentra todas las
+ocurrencias en una sola pasada sobre el texto.
+"""
+
+from collections import deque
+from .prepared_text import as_prepared
+
+class AhoCorasickAutomaton:
+    def __init__(self):
+        self.name = "Aho-Corasick"
+        self.best_for = "Muchos patrones buscados a la vez"
+        self.patterns = []
+        self.lengths = []
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+
+    def build(self, patterns, normalized=None):
+        """
+        Compila la lista de patrones en el autómata (trie + enlaces de fallo).
+
+        Args:
+            patterns (list): Lista de patrones (str). Los patrones vacíos se
+                ignoran, pero conservan su índice para mantener la alineación
+                con la lista original.
+            normalized (list): Forma normalizada de cada patrón, la que se
+                compara con el texto (por defecto, en minúsculas)
+        """
+        self.patterns = [pattern or '' for pattern in patterns]
+        if normalized is None:
+            normalized = [pattern.lower() for pattern in self.patterns]
+        self.lengths = [len(pattern) if pattern else 0 for pattern in normalized]
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+
+        # Construir el trie
+        for index, pattern in enumerate(normalized):
+            if not pattern or not self.patterns[index]:
+                continue
+
+            state = 0
+            for char in pattern:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                state = next_state
+            self.output[state].append(index)
+
+        # Calcular enlaces de fallo en orden de anchura
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+
+                # Heredar las salidas del estado de fallo
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    def search(self, text):
+        """
+        Recorre el texto una sola vez y encuentra todas las ocurrencias de
+        todos los patrones compilados.
+
+        Args:
+            text (str | PreparedText): El texto donde buscar
+
+        Returns:
+            dict: Posiciones (en el texto original) por índice de patrón {índice: [posiciones]}
+        """
+        prepared = as_prepared(text)
+        return {
+            index: [prepared.to_original(pos) for pos in positions]
+            for index, positions in self.scan(prepared.normalized).items()
+        }
+
+    def scan(self, text):
+        """
+        Recorre el texto ya normalizado con el autómata.
+
+        Args:
+            text (str): El texto normalizado (en minúsculas)
+
+        Returns:
+            dict: Posiciones en el texto normalizado por índice de patrón
+        """
+        found = {}
+        if not text or len(self.goto) == 1:
+            return found
+
+        goto = self.goto
+        fail = self.fail
+        output = self.output
+        lengths = self.lengths
+        state = 0
+
+        for i, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            for index in output[state]:
+                position = i - lengths[index] + 1
+                if index in found:
+                    found[index].append(position)
+                else:
+                    found[index] = [position]
+
+        return found
+
+    def iter_matches(self, text):
+        """
+        Recorre el texto ya normalizado entregando cada coincidencia en cuanto
+        se encuentra, para que quien consume pueda detenerse antes del final.
+
+        Args:
+            text (str): El texto normalizado (en minúsculas)
+
+        Yields:
+            tuple: (índice de patrón, posición en el texto normalizado)
+        """
+        if not text or len(self.goto) == 1:
+            return
+
+        goto = self.goto
+        fail = self.fail
+        output = self.output
+        lengths = self.lengths
+        state = 0
+
+        for i, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            for index in output[state]:
+                yield index, i - lengths[index] + 1
+
+    def find_patterns_info(self, text):
+        """
+        Encuentra información detallada de todos los patrones presentes en el texto.
+
+        Args:
+            text (str | PreparedText): El texto donde buscar
+
+        Returns:
+            dict: Información por índice de patrón, con el mismo formato que
+                find_pattern_info de KMP y Boyer-Moore
+        """
+        prepared = as_prepared(text)
+
+        return {
+            index: prepared.pattern_info(self.name, self.patterns[index], self.lengths[index], positions)
+            for index, positions in self.scan(prepared.normalized).items()
+        }
@@ -5,54 +5,295 @@ Coordina la búsqueda de múltiples patrones y genera reportes.
 
 import csv
 import os
+import threading
+import time
 from .selector import AlgorithmSelector
+from .prepared_text import PreparedText
+from .snapshot import PatternSnapshot, SEVERITY_WEIGHTS
+from .snapshot_store import load_snapshot, save_snapshot, snapshot_path, source_digest
+from .result_cache import ResultCache, text_digest
 
 class CyberbullyingAnalyzer:
-    def __init__(self, patterns_file=None):
+    def __init__(self, patterns_file=None, engine='aho-corasick', prefilter=True, fold=True, cache=True,
+                 precompiled=True):
+        """
+        Args:
+            patterns_file (str): Ruta del CSV de patrones
+            engine (str): 'aho-corasick' (una sola pasada para todos los patrones)
+                o 'selector' (KMP/Boyer-Moore patrón por patrón)
+            prefilter (bool): Descartar con q-gramas los patrones que no
+                pueden aparecer antes de buscarlos (requiere NumPy)
+            fold (bool): Plegar acentos, leetspeak y letras repetidas en el
+                texto y en los patrones, para que una sola entrada cubra sus variantes
+            cache (bool): Guardar los resultados de textos ya analizados
+            precompiled (bool): Guardar los patrones compilados junto al CSV y
+                cargarlos de ahí mientras el CSV no cambie
+        """
         self.selector = AlgorithmSelector()
-        self.patterns = []
+        self.engine = engine
+        self.use_prefilter = prefilter
+        self.fold = fold
+        self.snapshot = None
+        self.patterns_version = 0
+        self.cache = ResultCache() if cache else None
         self.patterns_file = patterns_file or 'patrones.csv'
+        self.precompiled = precompiled
+        self.loaded_from = None  # 'instantánea' o 'csv', según la última carga
+        
+        # Histogramas opcionales (ver algorithms.metrics): duración de cada
+        # etapa del análisis y de cada carga de patrones
+        self.stage_seconds = None
+        self.reload_seconds = None
+        self._reload_lock = threading.Lock()
         self.load_patterns()
     
+    # El estado de los patrones vive en la instantánea publicada; estas
+    # propiedades la exponen con los nombres de siempre
+    
+    @property
+    def patterns(self):
+        return self.snapshot.active_patterns
+    
+    @property
+    def compiled_patterns(self):
+        return self.snapshot.compiled_patterns
+    
+    @property
+    def automaton(self):
+        return self.snapshot.automaton
+    
+    @property
+    def token_index(self):
+        return self.snapshot.token_index
+    
+    @property
+    def prefilter(self):
+        return self.snapshot.prefilter
+    
+    @property
+    def patterns_hash(self):
+        return self.snapshot.patterns_hash
+    
     def load_patterns(self):
         """
         Carga los patrones desde el archivo CSV.
+        
+        Si junto al CSV hay una instantánea precompilada del mismo contenido,
+        se carga esa en lugar de volver a compilar los patrones. La nueva instantánea se construye completa sin tocar la publicada y
+        luego se publica con un único cambio de referencia: los análisis en
+        curso terminan con la instantánea con la que empezaron.
+        """
+        started = time.perf_counter()
+        with self._reload_lock:
+            version = self.patterns_version + 1
+            snapshot = None
+            
+            # Mientras no cambien el CSV ni la calibración del selector (que
+            # decide el motor de cada patrón), cargar los patrones ya compilados
+            calibration = self.selector.reload_calibration()
+            digest = None
+            if self.precompiled:
+                digest = source_digest(self.patterns_file, (self.engine, self.fold, self.use_prefilter, calibration))
+            if digest:
+                snapshot = load_snapshot(snapshot_path(self.patterns_file), digest, self.selector)
+            
+            if snapshot is None:
+                snapshot = PatternSnapshot(
+                    self._read_patterns(),
+                    self.selector,
+                    engine=self.engine,
+                    fold=self.fold,
+                    prefilter=self.use_prefilter,
+                    version=version
+                )
+                if digest:
+                    save_snapshot(snapshot, snapshot_path(self.patterns_file), digest)
+                self.loaded_from = 'csv'
+            else:
+                snapshot.version = version
+                self.loaded_from = 'instantánea'
+            
+            self._publish(snapshot)
+        
+        if self.reload_seconds is not None:
+            self.reload_seconds.observe(time.perf_counter() - started, 'completa')
+    
+    def add_patterns(self, rows, persist=None):
+        """
+        Añade patrones sin releer el archivo ni reconstruir todos los índices.
+        
+        Args:
+            rows (list): Filas con las columnas del CSV (id, frase, nivel_gravedad, ...)
+            persist (callable): Escribe las filas en el CSV. Se llama con el
+                bloqueo de recarga tomado, para que una recarga completa no
+                lea las filas ya escritas y luego se apliquen por segunda vez
+        """
+        started = time.perf_counter()
+        added = [self._parse_row(row) for row in rows]
+        with self._reload_lock:
+            if persist is not None:
+                persist()
+            self._publish(self.snapshot.apply_changes(added=added, version=self.patterns_version + 1))
+        self._observe_reload(started)
+    
+    def remove_patterns(self, pattern_ids):
+        """
+        Elimina patrones por id sin releer el archivo.
+        
+        Args:
+            pattern_ids (list): Ids de los patrones a eliminar
+            
+        Returns:
+            int: Número de patrones eliminados
+        """
+        started = time.perf_counter()
+        pattern_ids = {str(pattern_id) for pattern_id in pattern_ids}
+        with self._reload_lock:
+            snapshot = self.snapshot
+            removed = [
+                index for index, pattern_info in enumerate(snapshot.patterns)
+                if pattern_info is not None and str(pattern_info['id']) in pattern_ids
+            ]
+            if removed:
+                self._publish(snapshot.apply_changes(removed=removed, version=self.patterns_version + 1))
+        self._observe_reload(started)
+        return len(removed)
+    
+    def update_severity(self, pattern_id, nivel_gravedad):
+        """
+        Cambia el nivel de gravedad de un patrón sin releer el archivo.
+        
+        Args:
+            pattern_id: Id del patrón
+            nivel_gravedad (int): Nuevo nivel de gravedad (0-100)
+            
+        Returns:
+            int: Número de patrones actualizados
+        """
+        started = time.perf_counter()
+        pattern_id = str(pattern_id)
+        severity = self._severity_from_level(nivel_gravedad)
+        with self._reload_lock:
+            snapshot = self.snapshot
+            severities = {
+                index: severity for index, pattern_info in enumerate(snapshot.patterns)
+                if pattern_info is not None and str(pattern_info['id']) == pattern_id
+            }
+            if severities:
+                self._publish(snapshot.apply_changes(severities=severities, version=self.patterns_version + 1))
+        self._observe_reload(started)
+        return len(severities)
+    
+    def _observe_reload(self, started):
+        if self.reload_seconds is not None:
+            self.reload_seconds.observe(time.perf_counter() - started, 'incremental')
+    
+    def _publish(self, snapshot):
+        """
+        Publica una instantánea nueva (se llama con _reload_lock tomado).
+        
+        Args:
+            snapshot (PatternSnapshot): La instantánea a publicar
+        """
+        self.snapshot = snapshot
+        
+        # Permite a quien guarda estado derivado (por ejemplo, el pool de
+        # análisis por lotes) detectar que los patrones cambiaron
+        self.patterns_version = snapshot.version
+        
+        # La versión de los patrones forma parte de la clave de la caché;
+        # además se vacía para liberar los resultados viejos
+        if self.cache:
+            self.cache.clear()
+    
+    def reload_in_background(self):
+        """
+        Recarga los patrones en un hilo aparte, sin bloquear a quien llama.
+        
+        Returns:
+            threading.Thread: El hilo de la recarga
+        """
+        thread = threading.Thread(target=self.load_patterns, name='safetext-reload', daemon=True)
+        thread.start()
+        return thread
+    
+    def _read_patterns(self):
         """
-        self.patterns = []
+        Lee los patrones del archivo CSV.
         
+        Returns:
+            list: Patrones (dicts con id, pattern, category, severity, ...)
+        """
         if not os.path.exists(self.patterns_file):
             # Crear archivo con patrones por defecto si no existe
-            self.create_default_patterns()
+            return self.create_default_patterns()
         
+        patterns = []
         try:
             with open(self.patterns_file, 'r', encoding='utf-8') as file:
                 reader = csv.DictReader(file)
                 for row in reader:
-                    # Mapear severidad numérica a categórica
-                    nivel = int(row.get('nivel_gravedad', 50))
-                    if nivel >= 80:
-                        severity = 'Critical'
-                    elif nivel >= 70:
-                        severity = 'High'
-                    elif nivel >= 50:
-                        severity = 'Medium'
-                    else:
-                        severity = 'Low'
-                    
-                    self.patterns.append({
-                        'id': row.get('id', ''),
-                        'pattern': row.get('frase', '').strip('"'),  # Quitar comillas
-                        'category': row.get('categorias', 'General'),
-                        'severity': severity,
-                        'description': row.get('descripcion', '').strip('"')
-                    })
+                    patterns.append(self._parse_row(row))
         except Exception as e:
             print(f"Error al cargar patrones: {e}")
-            self.create_default_patterns()
+            return self.create_default_patterns()
+        
+        return patterns
+    
+    def _parse_row(self, row):
+        """
+        Convierte una fila del CSV en un patrón.
+        
+        Args:
+            row (dict): Fila con las columnas del CSV
+            
+        Returns:
+            dict: Patrón con id, pattern, category, severity, ...
+        """
+        # Columna opcional: ediciones permitidas (búsqueda aproximada)
+        max_errors = int(row.get('max_errores') or 0)
+        
+        # Columna opcional: 'subcadena' (por defecto) o 'palabra'
+        # (solo palabras completas, con el índice de tokens)
+        mode = (row.get('modo') or '').strip().lower()
+        if mode != 'palabra':
+            mode = 'subcadena'
+        
+        return {
+            'id': row.get('id', ''),
+            'pattern': row.get('frase', '').strip('"'),  # Quitar comillas
+            'category': row.get('categorias', 'General'),
+            'severity': self._severity_from_level(row.get('nivel_gravedad', 50)),
+            'max_errors': max_errors,
+            'mode': mode,
+            'description': row.get('descripcion', '').strip('"')
+        }
+    
+    def _severity_from_level(self, nivel_gravedad):
+        """
+        Mapea la severidad numérica del CSV a la categórica.
+        
+        Args:
+            nivel_gravedad (int): Nivel de gravedad (0-100)
+            
+        Returns:
+            str: 'Critical', 'High', 'Medium' o 'Low'
+        """
+        nivel = int(nivel_gravedad)
+        if nivel >= 80:
+            return 'Critical'
+        elif nivel >= 70:
+            return 'High'
+        elif nivel >= 50:
+            return 'Medium'
+        return 'Low'
     
     def create_default_patterns(self):
         """
         Crea un archivo CSV con patrones por defecto.
+        
+        Returns:
+            list: Los patrones por defecto
         """
         default_patterns = [
             {'id': '1', 'pattern': 'idiota', 'category': 'Insulto', 'severity': 'Medium', 'description': 'Insulto común'},
@@ -74,20 +315,36 @@ class CyberbullyingAnalyzer:
                 writer.writeheader()
                 writer.writerows(default_patterns)
             
-            self.patterns = default_patterns
         except Exception as e:
             print(f"Error al crear archivo de patrones: {e}")
+        
+        return default_patterns
     
-    def analyze_text(self, text):
+    def analyze_text(self, text, compact=False, max_details=None):
         """
         Analiza un texto buscando todos los patrones de ciberacoso.
         
         Args:
             text (str): El texto a analizar
+            compact (bool): Devolver solo las posiciones de cada patrón (sin contexto)
+            max_details (int): Máximo de entradas de matches_detail por patrón
             
         Returns:
             dict: Resultado completo del análisis
         """
+        snapshot = self.snapshot
+        return self._cached(
+            snapshot,
+            text,
+            ('analysis', compact, max_details),
+            lambda: self._analyze_text(snapshot, text, compact, max_details)
+        )
+    
+    def _analyze_text(self, snapshot, text, compact=False, max_details=None):
+        """
+        Analiza el texto con la instantánea dada, sin pasar por la caché
+        (ver analyze_text).
+        """
         if not text:
             return {
                 'text_length': 0,
@@ -105,15 +362,18 @@ class CyberbullyingAnalyzer:
         severity_counts = {'Low': 0, 'Medium': 0, 'High': 0, 'Critical': 0}
         category_counts = {}
         
+        clock = time.perf_counter
+        started = clock()
+        
+        # Normalizar (y plegar) el texto una sola vez para todos los patrones
+        prepared = PreparedText(text, fold=self.fold, compact=compact, max_details=max_details)
+        
+        # Prefiltro: solo se verifican los patrones que pueden aparecer
+        candidates = snapshot.candidates(prepared.normalized)
+        selected = clock()
+        
         # Analizar cada patrón
-        for pattern_info in self.patterns:
-            pattern = pattern_info['pattern']
-            if not pattern:
-                continue
-            
-            # Buscar el patrón en el texto
-            result = self.selector.search_pattern(text, pattern)
-            
+        for pattern_info, result in snapshot.search_patterns(prepared, candidates):
             if result['found']:
                 # Agregar información del patrón
                 result['pattern_info'] = pattern_info
@@ -130,10 +390,17 @@ class CyberbullyingAnalyzer:
                 # Contar categorías
                 category = pattern_info['category']
                 category_counts[category] = category_counts.get(category, 0) + result['total_matches']
+        searched = clock()
         
         # Calcular nivel de riesgo
         total_matches = sum(severity_counts.values())
         risk_level = self._calculate_risk_level(severity_counts, total_matches)
+        analysis_summary = self._generate_summary(matches, risk_level)
+        
+        if self.stage_seconds is not None:
+            self.stage_seconds.observe(selected - started, 'selection')
+            self.stage_seconds.observe(searched - selected, 'search')
+            self.stage_seconds.observe(clock() - searched, 'risk')
         
         return {
             'text_length': len(text),
@@ -145,9 +412,92 @@ class CyberbullyingAnalyzer:
             'algorithms_used': algorithms_used,
             'is_cyberbullying': total_matches > 0,
             'risk_level': risk_level,
-            'analysis_summary': self._generate_summary(matches, risk_level)
+            'analysis_summary': analysis_summary
         }
     
+    def analyze_verdict(self, text, threshold=SEVERITY_WEIGHTS['Critical']):
+        """
+        Calcula solo el veredicto, deteniendo la búsqueda en cuanto la
+        puntuación ponderada alcanza el umbral.
+        
+        Los patrones se recorren de mayor a menor severidad para llegar al
+        umbral cuanto antes. Si la búsqueda se detiene, risk_level es el nivel
+        alcanzado hasta ese momento (al menos el del umbral).
+        
+        Args:
+            text (str): El texto a analizar
+            threshold (int): Puntuación a partir de la cual se deja de buscar
+                (15 corresponde al corte de 'Critical')
+            
+        Returns:
+            dict: risk_level, is_cyberbullying y early_exit
+        """
+        snapshot = self.snapshot
+        return self._cached(
+            snapshot,
+            text,
+            ('verdict', threshold),
+            lambda: self._analyze_verdict(snapshot, text, threshold)
+        )
+    
+    def _analyze_verdict(self, snapshot, text, threshold):
+        """
+        Calcula el veredicto con la instantánea dada, sin pasar por la caché
+        (ver analyze_verdict).
+        """
+        severity_counts = {level: 0 for level in SEVERITY_WEIGHTS}
+        score = 0
+        early_exit = False
+        
+        if text:
+            prepared = PreparedText(text, fold=self.fold, compact=True)
+            candidates = snapshot.candidates(prepared.normalized)
+            allowed = None if candidates is None else set(candidates)
+            
+            for severity, count in snapshot.iter_severity_matches(prepared, allowed):
+                severity_counts[severity] += count
+                score += SEVERITY_WEIGHTS[severity] * count
+                if score >= threshold:
+                    early_exit = True
+                    break
+        
+        total_matches = sum(severity_counts.values())
+        return {
+            'risk_level': self._calculate_risk_level(severity_counts, total_matches),
+            'is_cyberbullying': total_matches > 0,
+            'early_exit': early_exit
+        }
+    
+    def _cached(self, snapshot, text, options, compute):
+        """
+        Devuelve el resultado guardado para el texto, o lo calcula y lo guarda.
+        
+        Args:
+            snapshot (PatternSnapshot): Instantánea con la que se analiza
+            text (str): El texto analizado
+            options (tuple): Modo y opciones del análisis (parte de la clave)
+            compute (callable): Calcula el resultado si no está guardado
+            
+        Returns:
+            dict: El resultado del análisis
+        """
+        if self.cache is None or not text:
+            return compute()
+        
+        key = (text_digest(text), snapshot.patterns_hash, options)
+        result = self.cache.get(key)
+        if result is None:
+            result = compute()
+            self.cache.put(key, result)
+        return result
+    
+    def scan_matches(self, normalized, candidates=None):
+        """
+        Busca todos los patrones en un texto ya normalizado y devuelve las
+        coincidencias en bruto (ver PatternSnapshot.scan_matches).
+        """
+        return self.snapshot.scan_matches(normalized, candidates)
+    
     def _calculate_risk_level(self, severity_counts, total_matches):
         """
         Calcula el nivel de riesgo basado en la severidad de los patrones encontrados.
@@ -162,11 +512,8 @@ class CyberbullyingAnalyzer:
         if total_matches == 0:
             return 'None'
         
-        # Pesos para cada nivel de severidad
-        weights = {'Low': 1, 'Medium': 3, 'High': 7, 'Critical': 15}
-        
         # Calcular puntuación ponderada
-        weighted_score = sum(severity_counts[level] * weights[level] for level in weights)
+        weighted_score = sum(severity_counts[level] * SEVERITY_WEIGHTS[level] for level in SEVERITY_WEIGHTS)
         
         # Determinar nivel de riesgo
         if weighted_score >= 15:
@@ -213,7 +560,8 @@ class CyberbullyingAnalyzer:
         Returns:
             dict: Estadísticas de los patrones
         """
-        if not self.patterns:
+        patterns = self.patterns
+        if not patterns:
             return {
                 'total_patterns': 0,
                 'by_category': {},
@@ -225,7 +573,7 @@ class CyberbullyingAnalyzer:
         by_severity = {}
         by_length = {'short': 0, 'medium': 0, 'long': 0}
         
-        for pattern in self.patterns:
+        for pattern in patterns:
             # Por categoría
             category = pattern['category']
             by_category[category] = by_category.get(category, 0) + 1
@@ -244,7 +592,7 @@ class CyberbullyingAnalyzer:
                 by_length['long'] += 1
         
         return {
-            'total_patterns': len(self.patterns),
+            'total_patterns': len(patterns),
             'by_category': by_category,
             'by_severity': by_severity,
             'by_length': by_length
@@ -0,0 +1,209 @@
+"""
+Implementación del algoritmo Shift-And aproximado (Wu-Manber) para búsqueda de patrones.
+Encuentra el patrón con hasta k ediciones (sustituciones, inserciones o
+eliminaciones) en una sola pasada, usando vectores de bits como estado.
+Con k = 0 se comporta como el Shift-And exacto.
+"""
+
+from .compiled import as_compiled
+from .prepared_text import as_prepared
+
+class ApproximateAlgorithm:
+    def __init__(self):
+        self.name = "Shift-And aproximado (Wu-Manber)"
+        self.best_for = "Patrones con errores tipográficos o sustituciones"
+
+    def character_masks(self, pattern):
+        """
+        Construye las máscaras de bits de cada carácter del patrón.
+
+        Args:
+            pattern (str): El patrón de búsqueda
+
+        Returns:
+            dict: Máscara por carácter (bit i activo si pattern[i] == carácter)
+        """
+        masks = {}
+        for i, char in enumerate(pattern):
+            masks[char] = masks.get(char, 0) | (1 << i)
+        return masks
+
+    def preprocess(self, pattern):
+        """
+        Preprocesamiento reutilizable del patrón (ver CompiledPattern).
+
+        Args:
+            pattern (str): El patrón en minúsculas
+
+        Returns:
+            dict: Máscaras de bits por carácter
+        """
+        return self.character_masks(pattern)
+
+    def search(self, text, pattern, max_errors=None):
+        """
+        Busca todas las ocurrencias aproximadas del patrón en el texto.
+
+        Args:
+            text (str | PreparedText): El texto donde buscar
+            pattern (str | CompiledPattern): El patrón a buscar
+            max_errors (int): Ediciones permitidas (por defecto, las del patrón compilado)
+
+        Returns:
+            list: Lista de posiciones (en el texto original) donde se encontró el patrón
+        """
+        if not pattern or not text:
+            return []
+
+        prepared = as_prepared(text)
+        matches = self.scan(prepared.normalized, as_compiled(pattern), max_errors)
+        return [prepared.to_original(start) for start, _, _ in matches]
+
+    def scan(self, text, compiled, max_errors=None):
+        """
+        Recorre el texto ya normalizado buscando el patrón con hasta k errores.
+
+        Args:
+            text (str): El texto normalizado (en minúsculas)
+            compiled (CompiledPattern): El patrón compilado
+            max_errors (int): Ediciones permitidas (por defecto, las del patrón compilado)
+
+        Returns:
+            list: Tuplas (inicio, longitud, distancia de edición) en el texto normalizado
+        """
+        pattern = compiled.normalized
+        k = compiled.max_errors if max_errors is None else max_errors
+
+        n = len(text)
+        m = len(pattern)
+
+        if not m or not n:
+            return []
+
+        # Con tantos errores como caracteres, cualquier posición coincidiría
+        k = max(0, min(k, m - 1))
+
+        masks = compiled.tables(self)
+        full = (1 << m) - 1
+        accept = 1 << (m - 1)
+
+        # R[d]: prefijos del patrón que terminan aquí con a lo sumo d errores
+        states = [(1 << d) - 1 for d in range(k + 1)]
+
+        ends = []  # (fin, distancia)
+        for j, char in enumerate(text):
+            mask = masks.get(char, 0)
+            previous = states[0]
+            current = ((previous << 1) | 1) & mask
+            states[0] = current
+
+            for d in range(1, k + 1):
+                old = states[d]
+                # Coincidencia | inserción | sustitución | eliminación
+                current = (((old << 1) | 1) & mask) | previous | (previous << 1) | (current << 1) | 1
+                current &= full
+                previous = old
+                states[d] = current
+
+            for d in range(k + 1):
+                if states[d] & accept:
+                    ends.append((j, d))
+                    break
+
+        if k == 0:
+            # Búsqueda exacta: cada final es una ocurrencia distinta
+            return [(end - m + 1, m, 0) for end, _ in ends]
+
+        return self._collapse(text, pattern, ends)
+
+    def _collapse(self, text, pattern, ends):
+        """
+        Agrupa finales consecutivos de una misma ocurrencia y conserva el de
+        menor distancia, calculando su posición de inicio.
+
+        Args:
+            text (str): El texto normalizado
+            pattern (str): El patrón normalizado
+            ends (list): Pares (fin, distancia) en orden
+
+        Returns:
+            list: Tuplas (inicio, longitud, distancia de edición)
+        """
+        matches = []
+        best = None
+        last_end = None
+
+        for end, distance in ends:
+            if last_end is not None and end != last_end + 1:
+                matches.append(self._locate(text, pattern, *best))
+                best = None
+            if best is None or distance < best[1]:
+                best = (end, distance)
+            last_end = end
+
+        if best is not None:
+            matches.append(self._locate(text, pattern, *best))
+
+        return matches
+
+    def _locate(self, text, pattern, end, distance):
+        """
+        Calcula el inicio de una ocurrencia aproximada que termina en end.
+
+        Compara el patrón invertido con el texto anterior a end y elige la
+        ventana con menor distancia de edición (en caso de empate, la más
+        cercana a la longitud del patrón y, después, la más larga).
+
+        Args:
+            text (str): El texto normalizado
+            pattern (str): El patrón normalizado
+            end (int): Posición del último carácter de la ocurrencia
+            distance (int): Distancia de edición encontrada
+
+        Returns:
+            tuple: (inicio, longitud, distancia de edición)
+        """
+        m = len(pattern)
+        window = text[max(0, end - m - distance + 1):end + 1][::-1]
+        reversed_pattern = pattern[::-1]
+
+        # row[l]: distancia entre el patrón invertido procesado y window[:l]
+        row = list(range(len(window) + 1))
+        for i, p_char in enumerate(reversed_pattern, 1):
+            new_row = [i]
+            for l, t_char in enumerate(window, 1):
+                new_row.append(min(
+                    row[l - 1] + (p_char != t_char),
+                    row[l] + 1,
+                    new_row[l - 1] + 1
+                ))
+            row = new_row
+
+        best_length = min(range(1, len(row)), key=lambda l: (row[l], abs(l - m), -l))
+        return end - best_length + 1, best_length, row[best_length]
+
+    def find_pattern_info(self, text, pattern, max_errors=None):
+        """
+        Encuentra información detallada sobre las ocurrencias del patrón.
+
+        Args:
+            text (str | PreparedText): El texto donde buscar
+            pattern (str | CompiledPattern): El patrón a buscar
+            max_errors (int): Ediciones permitidas (por defecto, las del patrón compilado)
+
+        Returns:
+            dict: Información detallada de las coincidencias, con la distancia
+                de edición de cada una en matches_detail
+        """
+        prepared = as_prepared(text)
+        compiled = as_compiled(pattern)
+        matches = self.scan(prepared.normalized, compiled, max_errors)
+
+        return prepared.pattern_info(
+            self.name,
+            compiled.pattern,
+            len(compiled.normalized),
+            [start for start, _, _ in matches],
+            lengths=[length for _, length, _ in matches],
+            edit_distances=[distance for _, _, distance in matches]
+        )
@@ -0,0 +1,151 @@
+"""
+Análisis por lotes repartido entre varios procesos.
+Cada proceso del pool carga su propio CyberbullyingAnalyzer una sola vez, de
+modo que el trabajo de búsqueda (Python puro, limitado por el GIL) usa todos
+los núcleos disponibles.
+
+Cada proceso web crea su propio pool (al llegar el primer lote), así que con
+varios workers de gunicorn el total de procesos es WEB_CONCURRENCY por el
+tamaño del pool. Por eso el tamaño por defecto reparte los núcleos entre los
+workers: cpu_count // WEB_CONCURRENCY, con un mínimo de 1.
+SAFETEXT_BATCH_WORKERS fija el tamaño exacto.
+"""
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from .analyzer import CyberbullyingAnalyzer, SEVERITY_WEIGHTS
+
+# Configuración por defecto (se puede cambiar con variables de entorno)
+WEB_WORKERS = max(1, int(os.environ.get('WEB_CONCURRENCY') or 1))
+DEFAULT_WORKERS = int(os.environ.get('SAFETEXT_BATCH_WORKERS') or max(1, (os.cpu_count() or 1) // WEB_WORKERS))
+DEFAULT_CHUNK_SIZE = int(os.environ.get('SAFETEXT_BATCH_CHUNK_SIZE') or 64)
+
+# Analizador propio de cada proceso del pool
+_worker_analyzer = None
+
+
+def _init_worker(patterns_file, options):
+    """
+    Carga el analizador del proceso al arrancar el pool.
+
+    Args:
+        patterns_file (str): Ruta del CSV de patrones
+        options (dict): Argumentos del constructor de CyberbullyingAnalyzer
+    """
+    global _worker_analyzer
+    _worker_analyzer = CyberbullyingAnalyzer(patterns_file, **options)
+
+
+def _analyze_chunk(texts, verdict=False, threshold=SEVERITY_WEIGHTS['Critical'], compact=False, max_details=None):
+    """
+    Analiza un bloque de textos dentro de un proceso del pool.
+
+    Args:
+        texts (list): Textos del bloque
+        verdict (bool): Calcular solo el veredicto
+        threshold (int): Umbral del modo veredicto
+        compact (bool): Devolver solo posiciones
+        max_details (int): Máximo de matches_detail por patrón
+
+    Returns:
+        list: Resultados en el mismo orden que texts
+    """
+    return _analyze_all(_worker_analyzer, texts, verdict, threshold, compact, max_details)
+
+
+def _analyze_all(analyzer, texts, verdict, threshold, compact, max_details):
+    """
+    Analiza los textos con el analizador dado (ver _analyze_chunk).
+    """
+    if verdict:
+        return [analyzer.analyze_verdict(text, threshold) for text in texts]
+    return [analyzer.analyze_text(text, compact=compact, max_details=max_details) for text in texts]
+
+
+class BatchAnalyzer:
+    def __init__(self, analyzer, workers=DEFAULT_WORKERS, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Args:
+            analyzer (CyberbullyingAnalyzer): Analizador del proceso principal;
+                los procesos del pool cargan el mismo archivo con las mismas opciones
+            workers (int): Número de procesos del pool
+            chunk_size (int): Textos que recibe cada proceso por tarea
+        """
+        self.analyzer = analyzer
+        self.workers = max(1, workers)
+        self.chunk_size = max(1, chunk_size)
+        self.pool = None
+        self.pool_version = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        """
+        Devuelve el pool, recreándolo si los patrones cambiaron desde que se creó.
+
+        Returns:
+            ProcessPoolExecutor: El pool de procesos
+        """
+        with self._lock:
+            if self.pool is not None and self.pool_version == self.analyzer.patterns_version:
+                return self.pool
+
+            options = {
+                'engine': self.analyzer.engine,
+                'prefilter': self.analyzer.use_prefilter,
+                'fold': self.analyzer.fold
+            }
+            old_pool = self.pool
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.analyzer.patterns_file, options)
+            )
+            self.pool_version = self.analyzer.patterns_version
+
+            # Los lotes que ya enviaron bloques al pool anterior los terminan
+            # con él; sus procesos se cierran cuando se vacía la cola
+            if old_pool is not None:
+                old_pool.shutdown(wait=False)
+            return self.pool
+
+    def analyze(self, texts, chunk_size=None, verdict=False, threshold=SEVERITY_WEIGHTS['Critical'],
+                compact=False, max_details=None):
+        """
+        Analiza una lista de textos repartiéndolos entre los procesos del pool.
+
+        Args:
+            texts (list): Textos a analizar
+            chunk_size (int): Textos por tarea (por defecto, el configurado)
+            verdict (bool): Calcular solo el veredicto de cada texto
+            threshold (int): Umbral del modo veredicto
+            compact (bool): Devolver solo posiciones
+            max_details (int): Máximo de matches_detail por patrón
+
+        Returns:
+            list: Un resultado por texto, en el mismo orden de entrada
+        """
+        chunk_size = max(1, chunk_size or self.chunk_size)
+        options = (verdict, threshold, compact, max_details)
+
+        # Un solo bloque no compensa el envío a otro proceso
+        if self.workers == 1 or len(texts) <= chunk_size:
+            return _analyze_all(self.analyzer, texts, *options)
+
+        pool = self._get_pool()
+        chunks = [texts[start:start + chunk_size] for start in range(0, len(texts), chunk_size)]
+        futures = [pool.submit(_analyze_chunk, chunk, *options) for chunk in chunks]
+
+        # Los resultados se recogen en el orden de los bloques
+        results = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+
+    def shutdown(self):
+        """
+        Detiene el pool de procesos, si existe.
+        """
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
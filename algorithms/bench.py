@@ -0,0 +1,386 @@
+"""
+Banco de pruebas de rendimiento de los motores de búsqueda y del analizador.
+Mide KMP, Boyer-Moore, el selector y el análisis completo sobre corpus
+sintéticos de chat y entradas adversarias ("jajaja…", "aaaa…"), con varios
+tamaños de texto y de conjunto de patrones, y compara el resultado con una
+línea base guardada para detectar regresiones.
+
+Uso:
+    python -m algorithms.bench                       # medir y comparar con la línea base
+    python -m algorithms.bench --save-baseline       # guardar la medición como línea base
+    python -m algorithms.bench --quick               # solo textos pequeños
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from .calibration import load_pattern_file, sample_corpus
+from .prepared_text import PreparedText
+
+BENCH_VERSION = 1
+RESULTS_FILE = 'bench_resultados.json'
+BASELINE_FILE = 'bench_baseline.json'
+
+# Tamaños de texto (caracteres) y de conjunto de patrones por defecto
+TEXT_SIZES = [1024, 64 * 1024, 1024 * 1024]
+QUICK_TEXT_SIZES = [1024, 16 * 1024]
+PATTERN_COUNTS = [1000]
+
+# Cada caso se repite hasta sumar este tiempo (con un mínimo de llamadas)
+MIN_SECONDS = 0.5
+MIN_CALLS = 3
+MAX_CALLS = 10000
+
+# Pérdida de throughput respecto a la línea base que se considera regresión
+TOLERANCE = 0.15
+
+SYLLABLES = (
+    'ba be bi bo bu ca co cu da de di do fa fe fi fo ga go gu la le li lo lu '
+    'ma me mi mo mu na ne ni no pa pe pi po ra re ri ro sa se si so ta te ti to'
+).split()
+
+
+def chat_text(patterns, size, seed=0):
+    """
+    Genera un texto de chat en español de un tamaño dado.
+
+    Args:
+        patterns (list): Patrones (str) que se mezclan ocasionalmente
+        size (int): Número de caracteres
+        seed (int): Semilla para que el texto sea reproducible
+
+    Returns:
+        str: El texto
+    """
+    parts = []
+    length = 0
+    while length < size:
+        for message in sample_corpus(patterns, messages=50, seed=seed):
+            parts.append(message)
+            length += len(message) + 1
+        seed += 1
+    return '\n'.join(parts)[:size]
+
+
+def adversarial_texts(patterns, size):
+    """
+    Genera entradas adversarias: risas repetidas, un solo carácter repetido
+    y casi coincidencias del patrón más largo (todo menos su último carácter).
+
+    Args:
+        patterns (list): Patrones (str)
+        size (int): Número de caracteres de cada texto
+
+    Returns:
+        dict: Texto por nombre de corpus
+    """
+    longest = max(patterns, key=len) if patterns else 'idiota'
+    return {
+        'jajaja': ('ja' * (size // 2 + 1))[:size],
+        'aaaa': 'a' * size,
+        'casi': ((longest[:-1] + ' ') * (size // len(longest) + 1))[:size]
+    }
+
+
+def synthetic_patterns(base, count, seed=0):
+    """
+    Completa un conjunto de patrones hasta el tamaño pedido con frases
+    sintéticas de dos o tres palabras inventadas.
+
+    Args:
+        base (list): Patrones reales (str)
+        count (int): Tamaño del conjunto
+        seed (int): Semilla
+
+    Returns:
+        list: Patrones (str)
+    """
+    rng = random.Random(seed)
+    patterns = list(dict.fromkeys(base))[:count]
+    seen = set(patterns)
+    while len(patterns) < count:
+        words = [''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(rng.randint(2, 3))]
+        phrase = ' '.join(words)
+        if phrase not in seen:
+            seen.add(phrase)
+            patterns.append(phrase)
+    return patterns
+
+
+def percentile(sorted_values, fraction):
+    """
+    Percentil por rango más cercano de una lista ya ordenada.
+    """
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def measure(call, args_list, text_bytes):
+    """
+    Mide una función llamada repetidamente con los argumentos dados.
+
+    Args:
+        call (callable): Función a medir
+        args_list (list): Tuplas de argumentos; se recorren en ciclo
+        text_bytes (list): Bytes de texto procesados por cada tupla
+
+    Returns:
+        dict: Llamadas, throughput en MB/s y percentiles de latencia en ms
+    """
+    latencies = []
+    processed = 0
+    total = 0.0
+    index = 0
+
+    while len(latencies) < MAX_CALLS and (len(latencies) < MIN_CALLS or total < MIN_SECONDS):
+        args = args_list[index % len(args_list)]
+        start = time.perf_counter()
+        call(*args)
+        elapsed = time.perf_counter() - start
+
+        latencies.append(elapsed)
+        processed += text_bytes[index % len(args_list)]
+        total += elapsed
+        index += 1
+
+    # El throughput se calcula con la mediana: una pausa aislada (GC, otro
+    # proceso) no debe parecer una regresión
+    latencies.sort()
+    median = percentile(latencies, 0.50)
+    return {
+        'calls': len(latencies),
+        'mb_per_s': round(processed / len(latencies) / median / 1e6, 3) if median else 0.0,
+        'p50_ms': round(median * 1000, 4),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 4),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 4)
+    }
+
+
+def write_pattern_csv(patterns):
+    """
+    Escribe un CSV temporal de patrones para construir un analizador.
+
+    Args:
+        patterns (list): Patrones (str)
+
+    Returns:
+        str: Ruta del archivo (quien llama debe borrarlo)
+    """
+    levels = [20, 50, 70, 90]
+    with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(['id', 'frase', 'categorias', 'nivel_gravedad', 'descripcion'])
+        for index, pattern in enumerate(patterns, 1):
+            writer.writerow([index, pattern, 'bench', levels[index % len(levels)], ''])
+    return file.name
+
+
+def run_benchmarks(base_patterns, text_sizes, pattern_counts, engine_patterns=8):
+    """
+    Ejecuta todos los casos del banco de pruebas.
+
+    Args:
+        base_patterns (list): Patrones reales (str)
+        text_sizes (list): Tamaños de texto en caracteres
+        pattern_counts (list): Tamaños adicionales del conjunto de patrones
+            para el analizador (además del conjunto real)
+        engine_patterns (int): Patrones de muestra para los motores individuales
+
+    Returns:
+        list: Resultados (dicts) por caso
+    """
+    from .analyzer import CyberbullyingAnalyzer
+    from .selector import AlgorithmSelector
+
+    selector = AlgorithmSelector()
+    results = []
+
+    # Muestra de patrones de distintas longitudes para los motores individuales;
+    # se compilan con el selector para que el caso 'selector' mida la búsqueda
+    # con el análisis ya hecho, como dentro del analizador
+    by_length = sorted(dict.fromkeys(pattern.lower() for pattern in base_patterns), key=len)
+    step = max(1, len(by_length) // engine_patterns)
+    sample = [selector.compile_pattern(pattern) for pattern in by_length[::step][:engine_patterns]]
+
+    engines = {
+        'kmp': selector.kmp.search,
+        'boyer-moore': selector.boyer_moore.search,
+        'selector': selector.search_pattern
+    }
+
+    analyzers = []
+    for count in [len(base_patterns)] + [count for count in pattern_counts if count != len(base_patterns)]:
+        path = write_pattern_csv(synthetic_patterns(base_patterns, count))
+        try:
+            analyzers.append((count, CyberbullyingAnalyzer(path, cache=False, precompiled=False)))
+        finally:
+            os.remove(path)
+
+    for size in text_sizes:
+        corpora = {'chat': chat_text(base_patterns, size)}
+        corpora.update(adversarial_texts(base_patterns, size))
+
+        for corpus, text in corpora.items():
+            text_bytes = len(text.encode('utf-8'))
+            prepared = PreparedText(text)
+
+            # Los motores reciben el texto ya preparado y el patrón compilado,
+            # como dentro del analizador: se mide la búsqueda, no la preparación
+            for name, search in engines.items():
+                print(f"  {name:<12} {corpus:<7} {size:>8} caracteres", file=sys.stderr)
+                results.append({
+                    'name': f'{name}/{corpus}/{size}',
+                    'benchmark': name,
+                    'corpus': corpus,
+                    'text_chars': size,
+                    'patterns': len(sample),
+                    **measure(search, [(prepared, compiled) for compiled in sample], [text_bytes] * len(sample))
+                })
+
+            for count, analyzer in analyzers:
+                print(f"  {'analyzer':<12} {corpus:<7} {size:>8} caracteres, {count} patrones", file=sys.stderr)
+                results.append({
+                    'name': f'analyzer/{corpus}/{size}/{count}',
+                    'benchmark': 'analyzer',
+                    'corpus': corpus,
+                    'text_chars': size,
+                    'patterns': count,
+                    **measure(analyzer.analyze_text, [(text,)], [text_bytes])
+                })
+
+    return results
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """
+    Compara el throughput de cada caso con la línea base.
+
+    Args:
+        results (list): Resultados actuales
+        baseline (dict): Datos de la línea base (como los guardados por main)
+        tolerance (float): Pérdida relativa admitida antes de marcar regresión
+
+    Returns:
+        list: Comparaciones (dicts con name, baseline, current, ratio, regression)
+    """
+    previous = {result['name']: result for result in baseline.get('results', [])}
+    comparisons = []
+    for result in results:
+        before = previous.get(result['name'])
+        if not before or not before['mb_per_s']:
+            continue
+        ratio = result['mb_per_s'] / before['mb_per_s']
+        comparisons.append({
+            'name': result['name'],
+            'baseline_mb_per_s': before['mb_per_s'],
+            'mb_per_s': result['mb_per_s'],
+            'ratio': round(ratio, 3),
+            'regression': ratio < 1 - tolerance
+        })
+    return comparisons
+
+
+def load_results(path):
+    """
+    Carga un archivo de resultados si existe y es de esta versión.
+
+    Args:
+        path (str): Ruta del archivo
+
+    Returns:
+        dict: Datos guardados, o None
+    """
+    if not path or not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+    except Exception as e:
+        print(f"Error al cargar {path}: {e}")
+        return None
+
+    if data.get('version') != BENCH_VERSION:
+        print(f"[WARNING] Versión de resultados no soportada en {path}")
+        return None
+
+    return data
+
+
+def save_results(data, path):
+    """
+    Guarda los resultados en un archivo JSON.
+
+    Args:
+        data (dict): Resultados y metadatos
+        path (str): Ruta del archivo
+    """
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(data, file, ensure_ascii=False, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mide el rendimiento de los motores de búsqueda de SafeText')
+    parser.add_argument('--patterns', default='patrones_combinado.csv', help='CSV de patrones')
+    parser.add_argument('--sizes', help='Tamaños de texto en caracteres, separados por comas')
+    parser.add_argument('--pattern-counts', help='Tamaños adicionales del conjunto de patrones, separados por comas')
+    parser.add_argument('--quick', action='store_true', help='Solo textos pequeños (para pruebas rápidas)')
+    parser.add_argument('--output', default=RESULTS_FILE, help='Archivo de resultados a escribir')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help='Línea base con la que comparar')
+    parser.add_argument('--save-baseline', action='store_true', help='Guardar también la medición como línea base')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help='Pérdida de throughput admitida (0.15 = 15%%)')
+    args = parser.parse_args()
+
+    if args.sizes:
+        sizes = [int(size) for size in args.sizes.split(',')]
+    else:
+        sizes = QUICK_TEXT_SIZES if args.quick else TEXT_SIZES
+    counts = [int(count) for count in args.pattern_counts.split(',')] if args.pattern_counts else PATTERN_COUNTS
+
+    patterns = load_pattern_file(args.patterns)
+    results = run_benchmarks(patterns, sizes, counts)
+    data = {
+        'version': BENCH_VERSION,
+        'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': f'{platform.system()} {platform.machine()}, {os.cpu_count()} CPU',
+        'unit': 'MB/s (UTF-8), latencias en ms',
+        'results': results
+    }
+    save_results(data, args.output)
+    if args.save_baseline:
+        save_results(data, args.baseline)
+
+    print(f"{'caso':<36} {'MB/s':>9} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}")
+    for result in results:
+        print(f"{result['name']:<36} {result['mb_per_s']:>9.3f} {result['p50_ms']:>10.3f} "
+              f"{result['p95_ms']:>10.3f} {result['p99_ms']:>10.3f}")
+    print(f"Resultados guardados en {args.output}")
+
+    baseline = None if args.save_baseline else load_results(args.baseline)
+    if baseline is None:
+        return 0
+
+    comparisons = compare(results, baseline, args.tolerance)
+    regressions = [comparison for comparison in comparisons if comparison['regression']]
+    print(f"Comparación con {args.baseline} ({len(comparisons)} casos, tolerancia {args.tolerance:.0%}):")
+    for comparison in regressions:
+        print(f"  REGRESIÓN {comparison['name']}: {comparison['baseline_mb_per_s']:.3f} -> "
+              f"{comparison['mb_per_s']:.3f} MB/s ({comparison['ratio']:.2f}x)")
+    if not regressions:
+        print("  Sin regresiones")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,10 +3,16 @@ Implementación del algoritmo Boyer-Moore para búsqueda de patrones.
 Ideal para patrones largos (>10 caracteres) con baja repetición.
 """
 
+import time
+from .compiled import as_compiled
+from .prepared_text import as_prepared
+from .instrumentation import operation_summary
+
 class BoyerMooreAlgorithm:
     def __init__(self):
         self.name = "Boyer-Moore"
         self.best_for = "Patrones largos con baja repetición"
+        self.counters = None  # OperationCounters cuando la instrumentación está activa
     
     def bad_character_table(self, pattern):
         """
@@ -29,151 +35,202 @@ class BoyerMooreAlgorithm:
     
     def good_suffix_table(self, pattern):
         """
-        Construye la tabla de sufijos buenos para el algoritmo Boyer-Moore.
+        Construye la tabla de sufijos buenos (regla fuerte) en tiempo lineal.
+        
+        Usa las posiciones de borde de cada sufijo del patrón: bpos[i] es el
+        inicio del borde más largo del sufijo pattern[i:].
         
         Args:
             pattern (str): El patrón de búsqueda
             
         Returns:
-            list: Tabla de sufijos buenos
+            list: Tabla de m + 1 desplazamientos; shift[j + 1] se aplica cuando
+                falla la comparación en la posición j, y shift[0] tras una
+                coincidencia completa (es el periodo del patrón)
         """
         m = len(pattern)
-        table = [0] * m
-        last_prefix_position = m
-        
-        # Llenar la tabla desde el final hacia el inicio
-        for i in range(m - 1, -1, -1):
-            if self.is_prefix(pattern, i + 1):
-                last_prefix_position = i + 1
-            table[m - 1 - i] = last_prefix_position - i + m - 1
+        shift = [0] * (m + 1)
+        bpos = [0] * (m + 1)
+        
+        # Caso 1: el sufijo coincidente aparece en otra parte del patrón
+        i = m
+        j = m + 1
+        bpos[i] = j
+        while i > 0:
+            while j <= m and pattern[i - 1] != pattern[j - 1]:
+                if shift[j] == 0:
+                    shift[j] = j - i
+                j = bpos[j]
+            i -= 1
+            j -= 1
+            bpos[i] = j
         
-        # Buscar sufijos que coincidan con prefijos
-        for i in range(m - 1):
-            suffix_length = self.suffix_length(pattern, i)
-            table[suffix_length] = m - 1 - i + suffix_length
+        # Caso 2: solo una parte del sufijo coincide con un prefijo del patrón
+        j = bpos[0]
+        for i in range(m + 1):
+            if shift[i] == 0:
+                shift[i] = j
+            if i == j:
+                j = bpos[j]
         
-        return table
+        return shift
     
-    def is_prefix(self, pattern, p):
+    def preprocess(self, pattern):
         """
-        Verifica si el sufijo a partir de la posición p es un prefijo del patrón.
+        Preprocesamiento reutilizable del patrón (ver CompiledPattern).
         
         Args:
-            pattern (str): El patrón
-            p (int): Posición de inicio del sufijo
+            pattern (str): El patrón en minúsculas
             
         Returns:
-            bool: True si es prefijo, False en caso contrario
+            tuple: (tabla de caracteres malos, tabla de sufijos buenos)
         """
-        j = 0
-        for i in range(p, len(pattern)):
-            if pattern[i] != pattern[j]:
-                return False
-            j += 1
-        return True
+        return self.bad_character_table(pattern), self.good_suffix_table(pattern)
     
-    def suffix_length(self, pattern, p):
+    def search(self, text, pattern):
         """
-        Calcula la longitud del sufijo que termina en la posición p.
+        Busca todas las ocurrencias del patrón en el texto usando Boyer-Moore.
         
         Args:
-            pattern (str): El patrón
-            p (int): Posición final del sufijo
+            text (str | PreparedText): El texto donde buscar
+            pattern (str | CompiledPattern): El patrón a buscar
             
         Returns:
-            int: Longitud del sufijo
+            list: Lista de posiciones (en el texto original) donde se encontró el patrón
         """
-        length = 0
-        j = len(pattern) - 1
-        i = p
-        
-        while i >= 0 and pattern[i] == pattern[j]:
-            length += 1
-            i -= 1
-            j -= 1
+        if not pattern or not text:
+            return []
         
-        return length
+        prepared = as_prepared(text)
+        return [prepared.to_original(pos) for pos in self.scan(prepared.normalized, as_compiled(pattern))]
     
-    def search(self, text, pattern):
+    def scan(self, text, compiled):
         """
-        Busca todas las ocurrencias del patrón en el texto usando Boyer-Moore.
+        Recorre el texto ya normalizado buscando el patrón compilado.
         
         Args:
-            text (str): El texto donde buscar
-            pattern (str): El patrón a buscar
+            text (str): El texto normalizado (en minúsculas)
+            compiled (CompiledPattern): El patrón compilado
             
         Returns:
-            list: Lista de posiciones donde se encontró el patrón
+            list: Lista de posiciones en el texto normalizado
         """
-        if not pattern or not text:
-            return []
-        
-        # Convertir a minúsculas para búsqueda insensible a mayúsculas
-        text = text.lower()
-        pattern = pattern.lower()
+        pattern = compiled.normalized
         
         n = len(text)
         m = len(pattern)
         
-        if m > n:
+        if not m or m > n:
             return []
         
-        # Construir tablas
-        bad_char = self.bad_character_table(pattern)
-        good_suffix = self.good_suffix_table(pattern)
+        # Tablas (precalculadas si el patrón ya está compilado)
+        bad_char, good_suffix = compiled.tables(self)
         
         matches = []
+        period = good_suffix[0]
         i = 0  # Posición en el texto
+        limit = 0  # Regla de Galil: prefijo ya verificado tras una coincidencia
         
         while i <= n - m:
             j = m - 1  # Empezar desde el final del patrón
             
             # Comparar desde el final del patrón hacia el inicio
-            while j >= 0 and pattern[j] == text[i + j]:
+            while j >= limit and pattern[j] == text[i + j]:
                 j -= 1
             
-            if j < 0:
+            if j < limit:
                 # Patrón encontrado
                 matches.append(i)
-                # Mover usando la tabla de sufijos buenos
-                i += good_suffix[0] if m > 1 else 1
+                # Desplazar por el periodo: los primeros m - periodo caracteres
+                # de la siguiente ventana ya se sabe que coinciden
+                i += period
+                limit = m - period
             else:
                 # Calcular el desplazamiento usando ambas reglas
                 bad_char_shift = j - bad_char.get(text[i + j], -1)
-                good_suffix_shift = good_suffix[m - 1 - j]
+                good_suffix_shift = good_suffix[j + 1]
                 
                 # Usar el mayor desplazamiento
-                i += max(bad_char_shift, good_suffix_shift, 1)
+                i += max(bad_char_shift, good_suffix_shift)
+                limit = 0
         
         return matches
     
+    def scan_counted(self, text, compiled):
+        """
+        Igual que scan, pero contando comparaciones y desplazamientos. Es un
+        recorrido aparte para que scan no pague ningún contador.
+        
+        Args:
+            text (str): El texto normalizado (en minúsculas)
+            compiled (CompiledPattern): El patrón compilado
+            
+        Returns:
+            tuple: (posiciones en el texto normalizado, resumen de operaciones)
+        """
+        pattern = compiled.normalized
+        
+        n = len(text)
+        m = len(pattern)
+        
+        if not m or m > n:
+            return [], operation_summary(0, 0, 0, 0.0, n)
+        
+        started = time.perf_counter()
+        bad_char, good_suffix = compiled.tables(self)
+        preprocess = time.perf_counter() - started
+        
+        matches = []
+        comparisons = 0
+        shifts = 0
+        shift_distance = 0
+        period = good_suffix[0]
+        i = 0
+        limit = 0
+        
+        while i <= n - m:
+            j = m - 1
+            
+            while j >= limit:
+                comparisons += 1
+                if pattern[j] != text[i + j]:
+                    break
+                j -= 1
+            
+            if j < limit:
+                matches.append(i)
+                shift = period
+                limit = m - period
+            else:
+                shift = max(j - bad_char.get(text[i + j], -1), good_suffix[j + 1])
+                limit = 0
+            
+            i += shift
+            shifts += 1
+            shift_distance += shift
+        
+        return matches, operation_summary(comparisons, shifts, shift_distance, preprocess, n)
+    
     def find_pattern_info(self, text, pattern):
         """
         Encuentra información detallada sobre las ocurrencias del patrón.
         
         Args:
-            text (str): El texto donde buscar
-            pattern (str): El patrón a buscar
+            text (str | PreparedText): El texto donde buscar
+            pattern (str | CompiledPattern): El patrón a buscar
             
         Returns:
             dict: Información detallada de las coincidencias
         """
-        matches = self.search(text, pattern)
-        
-        return {
-            'algorithm': self.name,
-            'pattern': pattern,
-            'total_matches': len(matches),
-            'positions': matches,
-            'pattern_length': len(pattern),
-            'found': len(matches) > 0,
-            'matches_detail': [
-                {
-                    'position': pos,
-                    'context_start': max(0, pos - 10),
-                    'context_end': min(len(text), pos + len(pattern) + 10),
-                    'context': text[max(0, pos - 10):min(len(text), pos + len(pattern) + 10)]
-                }
-                for pos in matches
-            ]
-        }
+        prepared = as_prepared(text)
+        compiled = as_compiled(pattern)
+        
+        if self.counters is None:
+            matches = self.scan(prepared.normalized, compiled)
+            return prepared.pattern_info(self.name, compiled.pattern, len(compiled.normalized), matches)
+        
+        matches, operations = self.scan_counted(prepared.normalized, compiled)
+        self.counters.record(self.name, compiled.pattern, operations)
+        info = prepared.pattern_info(self.name, compiled.pattern, len(compiled.normalized), matches)
+        info['operations'] = operations
+        return info
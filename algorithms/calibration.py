@@ -0,0 +1,283 @@
+"""
+Calibración empírica del selector de algoritmos.
+Mide cada motor sobre un corpus de ejemplo con el conjunto de patrones
+cargado y guarda el ganador por patrón y por rango de longitud.
+
+Uso:
+    python -m algorithms.calibration --patterns patrones_combinado.csv --corpus mensajes.txt
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import random
+import time
+from datetime import datetime
+
+from .compiled import CompiledPattern
+from .folding import fold_text
+from .prepared_text import PreparedText
+
+CALIBRATION_FILE = 'calibracion_selector.json'
+CALIBRATION_VERSION = 1
+
+# Rangos de longitud (inclusive) usados cuando un patrón no tiene medición propia
+LENGTH_BUCKETS = [(1, 5), (6, 10), (11, 20), (21, 40), (41, None)]
+
+SAMPLE_WORDS = (
+    'hola que tal como estas hoy vamos al parque mañana con los amigos de la clase '
+    'jajaja jejeje bien gracias nos vemos luego en el recreo tengo tarea de matemáticas '
+    'quieres jugar después mi mamá dice que sí el profe no vino la próxima semana'
+).split()
+
+
+def length_bucket(length):
+    """
+    Devuelve la etiqueta del rango de longitud al que pertenece un patrón.
+
+    Args:
+        length (int): Longitud del patrón
+
+    Returns:
+        str: Etiqueta del rango (por ejemplo '6-10' o '41+')
+    """
+    for low, high in LENGTH_BUCKETS:
+        if high is None:
+            if length >= low:
+                return f'{low}+'
+        elif low <= length <= high:
+            return f'{low}-{high}'
+    return f'{LENGTH_BUCKETS[0][0]}-{LENGTH_BUCKETS[0][1]}'
+
+
+def sample_corpus(patterns, messages=300, seed=0):
+    """
+    Genera un corpus sintético de mensajes de chat en español.
+
+    Args:
+        patterns (list): Patrones (str) que se mezclan ocasionalmente en los mensajes
+        messages (int): Número de mensajes a generar
+        seed (int): Semilla para que el corpus sea reproducible
+
+    Returns:
+        list: Lista de mensajes (str)
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(messages):
+        words = []
+        for _ in range(rng.randint(5, 80)):
+            if patterns and rng.random() < 0.03:
+                words.append(rng.choice(patterns))
+            else:
+                words.append(rng.choice(SAMPLE_WORDS))
+        corpus.append(' '.join(words))
+    return corpus
+
+
+def load_corpus(path):
+    """
+    Carga un corpus desde un archivo de texto (un mensaje por línea).
+
+    Args:
+        path (str): Ruta del archivo
+
+    Returns:
+        list: Lista de mensajes no vacíos
+    """
+    with open(path, 'r', encoding='utf-8') as file:
+        return [line.rstrip('\n') for line in file if line.strip()]
+
+
+def load_pattern_file(path):
+    """
+    Lee las frases de un CSV de patrones (columna 'frase' o 'mensaje').
+
+    Args:
+        path (str): Ruta del CSV
+
+    Returns:
+        list: Lista de patrones no vacíos
+    """
+    patterns = []
+    with open(path, 'r', encoding='utf-8') as file:
+        for row in csv.DictReader(file):
+            pattern = (row.get('frase') or row.get('mensaje') or '').strip('"')
+            if pattern:
+                patterns.append(pattern)
+    return patterns
+
+
+def measure_pattern(algorithm, pattern, texts, repeat=3):
+    """
+    Mide el coste de un motor para un patrón sobre el corpus.
+
+    Args:
+        algorithm: Instancia del motor (con preprocess y scan)
+        pattern (str): El patrón a medir
+        texts (list): Textos ya normalizados
+        repeat (int): Repeticiones; se conserva la mejor
+
+    Returns:
+        float: Nanosegundos por carácter del corpus
+    """
+    compiled = CompiledPattern(pattern)
+    compiled.tables(algorithm)
+    total_chars = sum(len(text) for text in texts) or 1
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            algorithm.scan(text, compiled)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+
+    return best * 1e9 / total_chars
+
+
+def calibrate(selector, patterns, corpus, repeat=3, fold=True):
+    """
+    Mide los motores exactos del selector con cada patrón y elige ganadores
+    (Wu-Manber es para búsqueda aproximada y no compite con ellos).
+
+    Args:
+        selector (AlgorithmSelector): Selector con los motores disponibles
+        patterns (list): Patrones (str) a medir
+        corpus (list): Mensajes de ejemplo (str)
+        repeat (int): Repeticiones por medición
+        fold (bool): Medir las formas plegadas, como las compila el
+            analizador por defecto; los patrones quedan indexados por esa forma
+
+    Returns:
+        dict: Datos de calibración listos para guardar
+    """
+    texts = [PreparedText(message, fold=fold).normalized for message in corpus]
+    normalize = fold_text if fold else str.lower
+    by_pattern = {}
+    by_bucket = {}
+
+    for pattern in dict.fromkeys(normalize(pattern) for pattern in patterns if pattern):
+        costs = {
+            name: round(measure_pattern(algorithm, pattern, texts, repeat), 3)
+            for name, algorithm in selector.algorithms.items()
+            if algorithm is not selector.approximate
+        }
+        by_pattern[pattern] = {
+            'winner': min(costs, key=costs.get),
+            'costs': costs
+        }
+
+        # Acumular por rango de longitud
+        bucket = by_bucket.setdefault(length_bucket(len(pattern)), {'patterns': 0, 'costs': {}})
+        bucket['patterns'] += 1
+        for name, cost in costs.items():
+            bucket['costs'][name] = bucket['costs'].get(name, 0) + cost
+
+    for bucket in by_bucket.values():
+        bucket['costs'] = {
+            name: round(cost / bucket['patterns'], 3)
+            for name, cost in bucket['costs'].items()
+        }
+        bucket['winner'] = min(bucket['costs'], key=bucket['costs'].get)
+
+    return {
+        'version': CALIBRATION_VERSION,
+        'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'unit': 'ns/carácter',
+        'fold': fold,
+        'corpus_messages': len(corpus),
+        'corpus_chars': sum(len(text) for text in texts),
+        'patterns': by_pattern,
+        'buckets': by_bucket
+    }
+
+
+def save_calibration(data, path=CALIBRATION_FILE):
+    """
+    Guarda los datos de calibración en un archivo JSON.
+
+    Args:
+        data (dict): Datos devueltos por calibrate
+        path (str): Ruta del archivo
+    """
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(data, file, ensure_ascii=False, indent=2)
+
+
+def load_calibration(path=CALIBRATION_FILE):
+    """
+    Carga los datos de calibración si el archivo existe y es válido.
+
+    Args:
+        path (str): Ruta del archivo
+
+    Returns:
+        dict: Datos de calibración, o None si no hay calibración utilizable
+    """
+    if not path or not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+    except Exception as e:
+        print(f"Error al cargar calibración: {e}")
+        return None
+
+    if data.get('version') != CALIBRATION_VERSION:
+        print(f"[WARNING] Versión de calibración no soportada en {path}")
+        return None
+
+    return data
+
+
+def calibration_digest(data):
+    """
+    Calcula un hash de los datos de calibración, para invalidar lo que se
+    compiló con otra calibración (las instantáneas precompiladas guardan el
+    motor elegido para cada patrón).
+
+    Args:
+        data (dict): Datos de calibración, o None
+
+    Returns:
+        str: Hash en hexadecimal, o None sin calibración
+    """
+    if not data:
+        return None
+    encoded = json.dumps(data, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+def main():
+    from .selector import AlgorithmSelector
+
+    parser = argparse.ArgumentParser(description='Calibra el selector de algoritmos de SafeText')
+    parser.add_argument('--patterns', default='patrones_combinado.csv', help='CSV de patrones')
+    parser.add_argument('--corpus', help='Archivo de mensajes (uno por línea); por defecto se genera uno sintético')
+    parser.add_argument('--output', default=CALIBRATION_FILE, help='Archivo de calibración a escribir')
+    parser.add_argument('--repeat', type=int, default=3, help='Repeticiones por medición')
+    parser.add_argument('--no-fold', action='store_true', help='Medir sin plegar (para analizadores con fold=False)')
+    args = parser.parse_args()
+
+    patterns = load_pattern_file(args.patterns)
+    corpus = load_corpus(args.corpus) if args.corpus else sample_corpus(patterns)
+
+    # Medir sin calibración previa para no influir en los motores
+    selector = AlgorithmSelector(calibration_file=None)
+    data = calibrate(selector, patterns, corpus, args.repeat, fold=not args.no_fold)
+    save_calibration(data, args.output)
+
+    print(f"Calibración guardada en {args.output} ({len(data['patterns'])} patrones, "
+          f"{data['corpus_chars']} caracteres de corpus)")
+    for bucket, info in sorted(data['buckets'].items(), key=lambda item: int(item[0].split('-')[0].rstrip('+'))):
+        costs = ', '.join(f'{name} {cost:.1f}' for name, cost in info['costs'].items())
+        print(f"  {bucket:>6}: {info['winner']:<12} ({costs} {data['unit']})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Patrones precompilados.
+Guardan el patrón normalizado, las tablas de preprocesamiento de cada
+algoritmo y la decisión del selector, para no recalcularlas en cada búsqueda.
+"""
+
+class CompiledPattern:
+    def __init__(self, pattern, analysis=None, max_errors=0, normalized=None):
+        """
+        Args:
+            pattern (str): El patrón original
+            analysis (dict): Análisis del selector (opcional)
+            max_errors (int): Ediciones permitidas en la búsqueda aproximada
+            normalized (str): Forma normalizada del patrón (por defecto, en minúsculas)
+        """
+        self.pattern = pattern
+        self.normalized = pattern.lower() if normalized is None else normalized
+        self.analysis = analysis
+        self.max_errors = max_errors
+        self._tables = {}
+
+    def __len__(self):
+        return len(self.pattern)
+
+    def tables(self, algorithm):
+        """
+        Devuelve las tablas de preprocesamiento del algoritmo, calculándolas
+        solo la primera vez.
+
+        Args:
+            algorithm: Instancia del algoritmo (debe implementar preprocess)
+
+        Returns:
+            object: Tablas propias del algoritmo
+        """
+        tables = self._tables.get(algorithm.name)
+        if tables is None:
+            tables = algorithm.preprocess(self.normalized)
+            self._tables[algorithm.name] = tables
+        return tables
+
+
+def as_compiled(pattern):
+    """
+    Normaliza el argumento de búsqueda a un CompiledPattern.
+
+    Args:
+        pattern (str | CompiledPattern): Patrón en texto o ya compilado
+
+    Returns:
+        CompiledPattern: El patrón compilado
+    """
+    if isinstance(pattern, CompiledPattern):
+        return pattern
+    return CompiledPattern(pattern)
@@ -0,0 +1,213 @@
+"""
+Plegado de texto para detectar variantes ofuscadas de un mismo patrón.
+Quita acentos, traduce dígitos y símbolos "leet" a letras y colapsa letras
+alargadas, de modo que "estúpido", "3stúpido" y "ESTÚÚPIDO" se comparan igual.
+Las letras que el español escribe dobles (rr, ll, cc, ee, oo, nn) solo se
+colapsan a partir de tres, para no confundir "perra" con "pera" ni "perro"
+con "pero".
+"""
+
+import re
+import unicodedata
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # Sin NumPy se usa el recorrido en Python puro
+    np = None
+
+# Sustituciones leetspeak más comunes
+LEET_MAP = {
+    '0': 'o',
+    '1': 'i',
+    '3': 'e',
+    '4': 'a',
+    '5': 's',
+    '7': 't',
+    '@': 'a',
+    '$': 's'
+}
+
+# La ñ es una letra propia del español y no se pliega a n ("año" no es "ano")
+KEEP_ACCENTS = {'ñ', 'Ñ'}
+
+# Letras repetidas consecutivas ("idiiiota", "perrrra")
+LETTER = r'[^\W\d_]'
+REPEATED_LETTERS = re.compile(r'(' + LETTER + r')\1+')
+
+# Letras que aparecen dobles en palabras correctas: se conservan hasta dos
+DOUBLE_LETTERS = frozenset('clreon')
+
+# Rango de puntos de código cubierto por la tabla precalculada
+TABLE_LIMIT = 0x0250
+
+
+def _build_fold_table():
+    """
+    Precalcula la tabla de str.translate: minúsculas, sin acentos y sin leet.
+
+    Solo incluye sustituciones de un carácter por otro, para que el texto
+    plegado conserve la longitud del original antes de colapsar repeticiones.
+
+    Returns:
+        dict: Tabla de traducción {código: carácter}
+    """
+    table = {}
+
+    # Latin-1 y Latin Extended-A/B cubren los acentos del español y vecinos
+    for code in range(0x0041, TABLE_LIMIT):
+        char = chr(code)
+        if char in KEEP_ACCENTS:
+            table[code] = char.lower()
+            continue
+
+        base = unicodedata.normalize('NFD', char)[0].lower()
+        if len(char.lower()) == 1 and base != char:
+            table[code] = base
+
+    # 'İ' se convierte en dos caracteres con lower(): se pliega directamente a 'i'
+    table[ord('İ')] = 'i'
+
+    for char, replacement in LEET_MAP.items():
+        table[ord(char)] = replacement
+
+    return table
+
+
+FOLD_TABLE = _build_fold_table()
+
+if np is not None:
+    # Las mismas tablas como vectores, indexadas por punto de código
+    FOLD_LUT = np.arange(TABLE_LIMIT, dtype=np.uint32)
+    for _code, _char in FOLD_TABLE.items():
+        if _code < TABLE_LIMIT:
+            FOLD_LUT[_code] = ord(_char)
+    LETTER_LUT = np.array([bool(re.fullmatch(LETTER, chr(code))) for code in range(TABLE_LIMIT)])
+    # Repeticiones que se conservan de cada letra
+    KEEP_LUT = np.ones(TABLE_LIMIT, dtype=np.int64)
+    for _char in DOUBLE_LETTERS:
+        KEEP_LUT[ord(_char)] = 2
+
+
+def fold_text(text):
+    """
+    Pliega un texto sin conservar el mapa de posiciones (para patrones).
+
+    Args:
+        text (str): El texto a plegar
+
+    Returns:
+        str: El texto plegado
+    """
+    return fold_with_offsets(text)[0]
+
+
+def fold_with_offsets(text):
+    """
+    Pliega el texto en una pasada lineal conservando el origen de cada carácter.
+
+    Args:
+        text (str): El texto original
+
+    Returns:
+        tuple: (texto plegado, mapa de posiciones o None si es identidad)
+    """
+    if np is not None:
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            return _fold_vectorized(lowered)
+
+    return _fold_python(text)
+
+
+def _fold_vectorized(lowered):
+    """
+    Plegado con NumPy de un texto ya en minúsculas y de la misma longitud
+    que el original.
+
+    Args:
+        lowered (str): El texto en minúsculas
+
+    Returns:
+        tuple: (texto plegado, mapa de posiciones o None si es identidad)
+    """
+    codes = np.frombuffer(lowered.encode('utf-32-le'), dtype=np.uint32)
+    if not len(codes):
+        return lowered, None
+
+    in_table = codes < TABLE_LIMIT
+    folded = np.where(in_table, FOLD_LUT[np.where(in_table, codes, 0)], codes)
+
+    # Letras: tabla para el rango común y expresión regular para el resto
+    is_letter = LETTER_LUT[np.where(in_table, folded, 0)]
+    if not in_table.all():
+        outside = ~in_table
+        extra = np.unique(folded[outside])
+        letters = np.array([bool(re.fullmatch(LETTER, chr(code))) for code in extra.tolist()])
+        is_letter[outside] = letters[np.searchsorted(extra, folded[outside])]
+
+    # Conservar las primeras letras de cada grupo de letras repetidas: una,
+    # o dos si es una letra que se escribe doble
+    repeated = np.zeros(len(folded), dtype=bool)
+    repeated[1:] = (folded[1:] == folded[:-1]) & is_letter[1:]
+    positions = np.arange(len(folded))
+    run_start = np.maximum.accumulate(np.where(repeated, 0, positions))
+    allowed = KEEP_LUT[np.where(folded < TABLE_LIMIT, folded, 0)]
+    keep = positions - run_start < allowed
+
+    if keep.all():
+        return folded.tobytes().decode('utf-32-le'), None
+
+    offsets = array('i')
+    offsets.frombytes(np.flatnonzero(keep).astype(np.int32).tobytes())
+    return folded[keep].tobytes().decode('utf-32-le'), offsets
+
+
+def _fold_python(text):
+    """
+    Plegado en Python puro (sin NumPy o cuando lower() cambia la longitud).
+
+    Args:
+        text (str): El texto original
+
+    Returns:
+        tuple: (texto plegado, mapa de posiciones o None si es identidad)
+    """
+    # La tabla precalculada sustituye carácter por carácter
+    folded = text.lower()
+    offsets = None
+
+    if len(folded) == len(text):
+        folded = folded.translate(FOLD_TABLE)
+    else:
+        # Algunos caracteres crecen con lower() (por ejemplo 'İ')
+        parts = []
+        offsets = array('i')
+        for i, char in enumerate(text):
+            folded_char = char.translate(FOLD_TABLE).lower()
+            parts.append(folded_char)
+            offsets.extend([i] * len(folded_char))
+        folded = ''.join(parts)
+
+    # Colapsar letras repetidas conservando la primera de cada grupo (las
+    # dos primeras si es una letra que se escribe doble)
+    runs = [
+        (run, 2 if run.group(1) in DOUBLE_LETTERS else 1)
+        for run in REPEATED_LETTERS.finditer(folded)
+        if run.end() - run.start() > (2 if run.group(1) in DOUBLE_LETTERS else 1)
+    ]
+    if not runs:
+        return folded, offsets
+
+    pieces = []
+    collapsed_offsets = array('i')
+    last = 0
+    for run, keep in runs:
+        keep_end = run.start() + keep
+        pieces.append(folded[last:keep_end])
+        collapsed_offsets.extend(range(last, keep_end) if offsets is None else offsets[last:keep_end])
+        last = run.end()
+    pieces.append(folded[last:])
+    collapsed_offsets.extend(range(last, len(folded)) if offsets is None else offsets[last:])
+
+    return ''.join(pieces), collapsed_offsets
@@ -0,0 +1,115 @@
+"""
+Implementación del algoritmo Boyer-Moore-Horspool para búsqueda de patrones.
+Simplificación de Boyer-Moore que solo usa la tabla de caracteres malos
+sobre el último carácter de la ventana.
+"""
+
+from .compiled import as_compiled
+from .prepared_text import as_prepared
+
+class HorspoolAlgorithm:
+    def __init__(self):
+        self.name = "Horspool"
+        self.best_for = "Patrones medianos y largos en alfabetos amplios"
+    
+    def shift_table(self, pattern):
+        """
+        Construye la tabla de desplazamientos de Horspool.
+        
+        Args:
+            pattern (str): El patrón de búsqueda
+            
+        Returns:
+            dict: Desplazamiento por carácter (m para los que no aparecen)
+        """
+        m = len(pattern)
+        table = {}
+        
+        # Distancia desde la última aparición de cada carácter hasta el final
+        # (sin contar el último carácter del patrón)
+        for i in range(m - 1):
+            table[pattern[i]] = m - 1 - i
+        
+        return table
+    
+    def preprocess(self, pattern):
+        """
+        Preprocesamiento reutilizable del patrón (ver CompiledPattern).
+        
+        Args:
+            pattern (str): El patrón en minúsculas
+            
+        Returns:
+            dict: Tabla de desplazamientos
+        """
+        return self.shift_table(pattern)
+    
+    def search(self, text, pattern):
+        """
+        Busca todas las ocurrencias del patrón en el texto usando Horspool.
+        
+        Args:
+            text (str | PreparedText): El texto donde buscar
+            pattern (str | CompiledPattern): El patrón a buscar
+            
+        Returns:
+            list: Lista de posiciones (en el texto original) donde se encontró el patrón
+        """
+        if not pattern or not text:
+            return []
+        
+        prepared = as_prepared(text)
+        return [prepared.to_original(pos) for pos in self.scan(prepared.normalized, as_compiled(pattern))]
+    
+    def scan(self, text, compiled):
+        """
+        Recorre el texto ya normalizado buscando el patrón compilado.
+        
+        Args:
+            text (str): El texto normalizado (en minúsculas)
+            compiled (CompiledPattern): El patrón compilado
+            
+        Returns:
+            list: Lista de posiciones en el texto normalizado
+        """
+        pattern = compiled.normalized
+        
+        n = len(text)
+        m = len(pattern)
+        
+        if not m or m > n:
+            return []
+        
+        shift = compiled.tables(self)
+        last = pattern[m - 1]
+        
+        matches = []
+        i = 0  # Posición en el texto
+        
+        while i <= n - m:
+            char = text[i + m - 1]
+            
+            # Comparar primero el último carácter y luego la ventana completa
+            if char == last and text.startswith(pattern, i):
+                matches.append(i)
+            
+            i += shift.get(char, m)
+        
+        return matches
+    
+    def find_pattern_info(self, text, pattern):
+        """
+        Encuentra información detallada sobre las ocurrencias del patrón.
+        
+        Args:
+            text (str | PreparedText): El texto donde buscar
+            pattern (str | CompiledPattern): El patrón a buscar
+            
+        Returns:
+            dict: Información detallada de las coincidencias
+        """
+        prepared = as_prepared(text)
+        compiled = as_compiled(pattern)
+        matches = self.scan(prepared.normalized, compiled)
+        
+        return prepared.pattern_info(self.name, compiled.pattern, len(compiled.normalized), matches)
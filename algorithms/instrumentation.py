@@ -0,0 +1,93 @@
+"""
+Contadores de operaciones de los motores KMP y Boyer-Moore.
+Con la instrumentación activada (AlgorithmSelector.enable_instrumentation)
+los motores usan una variante de su recorrido que cuenta comparaciones de
+caracteres y desplazamientos, y el resultado se acumula por patrón. Así se
+ve qué patrones cuestan más de lo esperado con el motor elegido sobre el
+tráfico real. Desactivada, los motores usan su recorrido normal sin
+ningún contador.
+"""
+
+import threading
+
+
+def operation_summary(comparisons, shifts, shift_distance, preprocess_seconds, text_length):
+    """
+    Construye el resumen de operaciones de una búsqueda.
+
+    Args:
+        comparisons (int): Comparaciones de caracteres
+        shifts (int): Desplazamientos del patrón sobre el texto
+        shift_distance (int): Suma de las distancias desplazadas
+        preprocess_seconds (float): Tiempo en obtener las tablas del patrón
+        text_length (int): Longitud del texto normalizado
+
+    Returns:
+        dict: Operaciones de la búsqueda
+    """
+    return {
+        'comparisons': comparisons,
+        'shifts': shifts,
+        'average_shift': round(shift_distance / shifts, 3) if shifts else 0.0,
+        'shift_distance': shift_distance,
+        'preprocess_ms': round(preprocess_seconds * 1000, 4),
+        'text_length': text_length
+    }
+
+
+class OperationCounters:
+    def __init__(self):
+        self.patterns = {}  # (motor, patrón) -> totales
+        self._lock = threading.Lock()
+
+    def record(self, algorithm, pattern, operations):
+        """
+        Acumula las operaciones de una búsqueda.
+
+        Args:
+            algorithm (str): Nombre del motor
+            pattern (str): El patrón buscado
+            operations (dict): Resumen devuelto por operation_summary
+        """
+        key = (algorithm, pattern)
+        with self._lock:
+            totals = self.patterns.get(key)
+            if totals is None:
+                totals = self.patterns[key] = {
+                    'searches': 0, 'comparisons': 0, 'shifts': 0,
+                    'shift_distance': 0, 'preprocess_ms': 0.0, 'text_length': 0
+                }
+            totals['searches'] += 1
+            for field in ('comparisons', 'shifts', 'shift_distance', 'preprocess_ms', 'text_length'):
+                totals[field] += operations[field]
+
+    def report(self):
+        """
+        Obtiene los totales por patrón, del más costoso al más barato
+        (comparaciones por carácter de texto).
+
+        Returns:
+            list: Totales por patrón y motor
+        """
+        with self._lock:
+            items = [(key, dict(totals)) for key, totals in self.patterns.items()]
+
+        report = []
+        for (algorithm, pattern), totals in items:
+            totals['preprocess_ms'] = round(totals['preprocess_ms'], 4)
+            report.append({
+                'pattern': pattern,
+                'algorithm': algorithm,
+                **totals,
+                'comparisons_per_char': round(totals['comparisons'] / totals['text_length'], 4) if totals['text_length'] else 0.0,
+                'average_shift': round(totals['shift_distance'] / totals['shifts'], 3) if totals['shifts'] else 0.0
+            })
+        report.sort(key=lambda item: item['comparisons_per_char'], reverse=True)
+        return report
+
+    def reset(self):
+        """
+        Descarta los totales acumulados.
+        """
+        with self._lock:
+            self.patterns.clear()
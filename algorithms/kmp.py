@@ -3,10 +3,16 @@ Implementación del algoritmo Knuth-Morris-Pratt (KMP) para búsqueda de patrone
 Ideal para patrones cortos o con caracteres repetidos.
 """
 
+import time
+from .compiled import as_compiled
+from .prepared_text import as_prepared
+from .instrumentation import operation_summary
+
 class KMPAlgorithm:
     def __init__(self):
         self.name = "KMP (Knuth-Morris-Pratt)"
         self.best_for = "Patrones cortos o con repeticiones"
+        self.counters = None  # OperationCounters cuando la instrumentación está activa
     
     def compute_lps(self, pattern):
         """
@@ -39,29 +45,56 @@ class KMPAlgorithm:
         
         return lps
     
+    def preprocess(self, pattern):
+        """
+        Preprocesamiento reutilizable del patrón (ver CompiledPattern).
+        
+        Args:
+            pattern (str): El patrón en minúsculas
+            
+        Returns:
+            list: Tabla LPS
+        """
+        return self.compute_lps(pattern)
+    
     def search(self, text, pattern):
         """
         Busca todas las ocurrencias del patrón en el texto usando KMP.
         
         Args:
-            text (str): El texto donde buscar
-            pattern (str): El patrón a buscar
+            text (str | PreparedText): El texto donde buscar
+            pattern (str | CompiledPattern): El patrón a buscar
             
         Returns:
-            list: Lista de posiciones donde se encontró el patrón
+            list: Lista de posiciones (en el texto original) donde se encontró el patrón
         """
         if not pattern or not text:
             return []
         
-        # Convertir a minúsculas para búsqueda insensible a mayúsculas
-        text = text.lower()
-        pattern = pattern.lower()
+        prepared = as_prepared(text)
+        return [prepared.to_original(pos) for pos in self.scan(prepared.normalized, as_compiled(pattern))]
+    
+    def scan(self, text, compiled):
+        """
+        Recorre el texto ya normalizado buscando el patrón compilado.
+        
+        Args:
+            text (str): El texto normalizado (en minúsculas)
+            compiled (CompiledPattern): El patrón compilado
+            
+        Returns:
+            list: Lista de posiciones en el texto normalizado
+        """
+        pattern = compiled.normalized
         
         n = len(text)
         m = len(pattern)
         
-        # Crear tabla LPS
-        lps = self.compute_lps(pattern)
+        if not m or not n:
+            return []
+        
+        # Tabla LPS (precalculada si el patrón ya está compilado)
+        lps = compiled.tables(self)
         
         matches = []
         i = 0  # Índice para el texto
@@ -83,33 +116,78 @@ class KMPAlgorithm:
         
         return matches
     
+    def scan_counted(self, text, compiled):
+        """
+        Igual que scan, pero contando comparaciones y desplazamientos. Es un
+        recorrido aparte para que scan no pague ningún contador.
+        
+        Args:
+            text (str): El texto normalizado (en minúsculas)
+            compiled (CompiledPattern): El patrón compilado
+            
+        Returns:
+            tuple: (posiciones en el texto normalizado, resumen de operaciones)
+        """
+        pattern = compiled.normalized
+        
+        n = len(text)
+        m = len(pattern)
+        
+        started = time.perf_counter()
+        lps = compiled.tables(self) if m and n else None
+        preprocess = time.perf_counter() - started
+        
+        matches = []
+        comparisons = 0
+        shifts = 0
+        shift_distance = 0
+        i = 0
+        j = 0
+        
+        while m and i < n:
+            comparisons += 1
+            if pattern[j] == text[i]:
+                i += 1
+                j += 1
+            
+            if j == m:
+                matches.append(i - j)
+                shifts += 1
+                shift_distance += j - lps[j - 1]
+                j = lps[j - 1]
+            elif i < n:
+                comparisons += 1
+                if pattern[j] != text[i]:
+                    shifts += 1
+                    if j != 0:
+                        shift_distance += j - lps[j - 1]
+                        j = lps[j - 1]
+                    else:
+                        shift_distance += 1
+                        i += 1
+        
+        return matches, operation_summary(comparisons, shifts, shift_distance, preprocess, n)
+    
     def find_pattern_info(self, text, pattern):
         """
         Encuentra información detallada sobre las ocurrencias del patrón.
         
         Args:
-            text (str): El texto donde buscar
-            pattern (str): El patrón a buscar
+            text (str | PreparedText): El texto donde buscar
+            pattern (str | CompiledPattern): El patrón a buscar
             
         Returns:
             dict: Información detallada de las coincidencias
         """
-        matches = self.search(text, pattern)
-        
-        return {
-            'algorithm': self.name,
-            'pattern': pattern,
-            'total_matches': len(matches),
-            'positions': matches,
-            'pattern_length': len(pattern),
-            'found': len(matches) > 0,
-            'matches_detail': [
-                {
-                    'position': pos,
-                    'context_start': max(0, pos - 10),
-                    'context_end': min(len(text), pos + len(pattern) + 10),
-                    'context': text[max(0, pos - 10):min(len(text), pos + len(pattern) + 10)]
-                }
-                for pos in matches
-            ]
-        }
+        prepared = as_prepared(text)
+        compiled = as_compiled(pattern)
+        
+        if self.counters is None:
+            matches = self.scan(prepared.normalized, compiled)
+            return prepared.pattern_info(self.name, compiled.pattern, len(compiled.normalized), matches)
+        
+        matches, operations = self.scan_counted(prepared.normalized, compiled)
+        self.counters.record(self.name, compiled.pattern, operations)
+        info = prepared.pattern_info(self.name, compiled.pattern, len(compiled.normalized), matches)
+        info['operations'] = operations
+        return info
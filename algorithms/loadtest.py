@@ -0,0 +1,486 @@
+"""
+Prueba de carga local de la API de SafeText.
+Levanta la aplicación (servidor de Flask o gunicorn) en un directorio de
+trabajo temporal con una copia de los patrones, envía un corpus de textos a
+/api/analyze, /api/search-pattern y /api/recommendations con la concurrencia
+pedida e informa del throughput y de los percentiles de latencia por
+endpoint. Opcionalmente recarga o añade patrones durante la prueba y separa
+las latencias de las peticiones que coincidieron con esas recargas.
+
+Uso:
+    python -m algorithms.loadtest                                  # Flask, 8 clientes, 30 s
+    python -m algorithms.loadtest --server gunicorn --workers 4 --concurrency 32
+    python -m algorithms.loadtest --disrupt reload --disrupt-interval 5
+    python -m algorithms.loadtest --url http://localhost:5000      # servidor ya iniciado
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from .bench import percentile
+from .calibration import load_corpus, load_pattern_file, sample_corpus
+
+RESULTS_FILE = 'carga_resultados.json'
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PATTERN_FILE = 'patrones_combinado.csv'
+
+DEFAULT_MIX = 'analyze=6,search=3,recommendations=1'
+READY_TIMEOUT = 180  # Segundos de espera a que el servidor cargue los patrones
+REQUEST_TIMEOUT = 60
+ADDED_ID_START = 900000  # Ids de los patrones añadidos (fuera de los protegidos)
+
+DISRUPTIONS = ('none', 'reload', 'reload-background', 'add-pattern')
+
+
+class ApiClient:
+    def __init__(self, base_url):
+        """
+        Cliente HTTP con conexión persistente (un cliente por hilo).
+
+        Args:
+            base_url (str): URL base del servidor, p. ej. http://127.0.0.1:5000
+        """
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.connection = None
+
+    def request(self, method, path, payload=None):
+        """
+        Envía una petición, reconectando una vez si el servidor cerró la conexión.
+
+        Returns:
+            tuple: (código de estado, cuerpo en bytes)
+        """
+        body = None if payload is None else json.dumps(payload).encode('utf-8')
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        for attempt in (0, 1):
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=REQUEST_TIMEOUT)
+            try:
+                self.connection.request(method, path, body=body, headers=headers)
+                response = self.connection.getresponse()
+                data = response.read()
+            except (http.client.HTTPException, OSError):
+                self.close()
+                if attempt:
+                    raise
+                continue
+            if response.will_close:
+                self.close()
+            return response.status, data
+
+    def post(self, path, payload):
+        return self.request('POST', path, payload)
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(kind, port, workers):
+    """
+    Inicia la aplicación en un directorio temporal con una copia de los
+    patrones, para que las escrituras de la prueba no toquen los del proyecto.
+
+    Args:
+        kind (str): 'flask' o 'gunicorn'
+        port (int): Puerto en el que escuchar
+        workers (int): Workers de gunicorn
+
+    Returns:
+        tuple: (proceso, directorio de trabajo)
+    """
+    workdir = tempfile.mkdtemp(prefix='safetext-carga-')
+    shutil.copy(os.path.join(ROOT, PATTERN_FILE), workdir)
+
+    env = dict(os.environ, PORT=str(port), WEB_CONCURRENCY=str(workers))
+    if kind == 'gunicorn':
+        command = ['gunicorn', '-c', os.path.join(ROOT, 'gunicorn.conf.py'), '--pythonpath', ROOT, 'app:app']
+    else:
+        command = [sys.executable, os.path.join(ROOT, 'main.py')]
+
+    log = open(os.path.join(workdir, 'servidor.log'), 'wb')
+    process = subprocess.Popen(command, cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+    log.close()
+    return process, workdir
+
+
+def stop_server(process, workdir):
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+def wait_ready(base_url, process=None, timeout=READY_TIMEOUT):
+    """
+    Espera a que /api/test responda.
+
+    Returns:
+        dict: Respuesta de /api/test
+
+    Raises:
+        RuntimeError: Si el servidor termina o no responde a tiempo
+    """
+    client = ApiClient(base_url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f'El servidor terminó con código {process.returncode}')
+        try:
+            status, body = client.request('GET', '/api/test')
+            if status == 200:
+                return json.loads(body)
+        except (http.client.HTTPException, OSError):
+            pass
+        finally:
+            client.close()
+        time.sleep(0.25)
+    raise RuntimeError(f'El servidor no respondió en {timeout} s')
+
+
+def parse_mix(text):
+    """
+    Convierte 'analyze=6,search=3' en pesos por endpoint.
+
+    Returns:
+        dict: Peso por endpoint
+    """
+    mix = {}
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in ('analyze', 'search', 'recommendations'):
+            raise ValueError(f'Endpoint desconocido en --mix: {name}')
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise ValueError('--mix necesita algún peso mayor que cero')
+    return mix
+
+
+class Workload:
+    def __init__(self, texts, patterns, analyses, mix, seed=0):
+        """
+        Genera las peticiones de la prueba.
+
+        Args:
+            texts (list): Textos a enviar
+            patterns (list): Patrones (str) para /api/search-pattern
+            analyses (list): Resultados de análisis para /api/recommendations
+            mix (dict): Peso por endpoint
+            seed (int): Semilla
+        """
+        self.texts = texts
+        self.patterns = patterns or ['idiota']
+        self.analyses = analyses
+        self.names = [name for name, weight in mix.items() if weight > 0]
+        self.weights = [mix[name] for name in self.names]
+        self.seed = seed
+
+    def generator(self, index):
+        """
+        Devuelve una función que produce peticiones (endpoint, ruta, cuerpo),
+        con su propio generador aleatorio para cada hilo.
+        """
+        rng = random.Random(self.seed + index)
+
+        def next_request():
+            name = rng.choices(self.names, self.weights)[0]
+            if name == 'analyze':
+                return name, '/api/analyze', {'text': rng.choice(self.texts)}
+            if name == 'search':
+                return name, '/api/search-pattern', {'text': rng.choice(self.texts), 'pattern': rng.choice(self.patterns)}
+            return name, '/api/recommendations', rng.choice(self.analyses)
+
+        return next_request
+
+
+def warm_up(base_url, texts, count=20):
+    """
+    Analiza algunos textos antes de medir y guarda sus resultados para
+    usarlos como cuerpo de /api/recommendations.
+
+    Returns:
+        list: Resultados de análisis
+    """
+    client = ApiClient(base_url)
+    analyses = []
+    for text in texts[:count]:
+        status, body = client.post('/api/analyze', {'text': text})
+        if status == 200:
+            analyses.append(json.loads(body)['result'])
+    client.close()
+    if not analyses:
+        raise RuntimeError('El servidor no analizó ningún texto de calentamiento')
+    return analyses
+
+
+def disrupt(base_url, kind, interval, stop, windows, added_ids):
+    """
+    Recarga o añade patrones cada cierto tiempo hasta que se pide parar.
+
+    Args:
+        base_url (str): URL base del servidor
+        kind (str): 'reload', 'reload-background' o 'add-pattern'
+        interval (float): Segundos entre recargas
+        stop (threading.Event): Señal de fin de la prueba
+        windows (list): Recibe (inicio, fin, código de estado) de cada recarga
+        added_ids (list): Recibe los ids de los patrones añadidos
+    """
+    client = ApiClient(base_url)
+    count = 0
+    while not stop.wait(interval):
+        if kind == 'add-pattern':
+            pattern_id = str(ADDED_ID_START + count)
+            path, payload = '/api/add-pattern', {
+                'id': pattern_id, 'frase': f'patron de carga {count}', 'categorias': 'Carga',
+                'nivel_gravedad': 50, 'descripcion': 'Añadido por la prueba de carga'
+            }
+        else:
+            path, payload = '/api/patterns/reload', {'background': kind == 'reload-background'}
+        count += 1
+
+        start = time.perf_counter()
+        try:
+            status, _ = client.post(path, payload)
+        except (http.client.HTTPException, OSError):
+            status = 0
+        windows.append((start, time.perf_counter(), status))
+        if kind == 'add-pattern' and status == 200:
+            added_ids.append(payload['id'])
+    client.close()
+
+
+def remove_added(base_url, added_ids):
+    client = ApiClient(base_url)
+    for pattern_id in added_ids:
+        try:
+            client.post('/api/delete-pattern', {'id': pattern_id})
+        except (http.client.HTTPException, OSError):
+            pass
+    client.close()
+
+
+def run_load(base_url, workload, concurrency, duration, disruption='none', interval=5.0):
+    """
+    Ejecuta la prueba de carga.
+
+    Args:
+        base_url (str): URL base del servidor
+        workload (Workload): Generador de peticiones
+        concurrency (int): Clientes simultáneos
+        duration (float): Segundos de prueba
+        disruption (str): Recarga a provocar durante la prueba (ver DISRUPTIONS)
+        interval (float): Segundos entre recargas
+
+    Returns:
+        tuple: (registros (endpoint, inicio, duración, correcta), ventanas de
+            recarga, segundos transcurridos)
+    """
+    records = []
+    windows = []
+    added_ids = []
+    lock = threading.Lock()
+    stop = threading.Event()
+    started = time.perf_counter()
+    deadline = started + duration
+
+    def client_loop(index):
+        client = ApiClient(base_url)
+        next_request = workload.generator(index)
+        local = []
+        while time.perf_counter() < deadline:
+            name, path, payload = next_request()
+            start = time.perf_counter()
+            try:
+                status, _ = client.post(path, payload)
+                ok = status == 200
+            except (http.client.HTTPException, OSError):
+                ok = False
+            local.append((name, start, time.perf_counter() - start, ok))
+        client.close()
+        with lock:
+            records.extend(local)
+
+    threads = [threading.Thread(target=client_loop, args=(index,)) for index in range(concurrency)]
+    disruptor = None
+    if disruption != 'none':
+        disruptor = threading.Thread(target=disrupt, args=(base_url, disruption, interval, stop, windows, added_ids))
+        disruptor.start()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    if disruptor is not None:
+        disruptor.join()
+    remove_added(base_url, added_ids)
+    return records, windows, elapsed
+
+
+def latency_stats(records, elapsed):
+    """
+    Resume un grupo de registros.
+
+    Returns:
+        dict: Peticiones, errores, throughput y percentiles en ms
+    """
+    latencies = sorted(duration for _, _, duration, ok in records if ok)
+    return {
+        'requests': len(records),
+        'errors': sum(1 for record in records if not record[3]),
+        'requests_per_s': round(len(records) / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'max_ms': round(latencies[-1] * 1000, 3) if latencies else 0.0
+    }
+
+
+def summarize(records, windows, elapsed):
+    """
+    Agrupa los registros por endpoint y, si hubo recargas, separa las
+    peticiones que se solaparon con alguna.
+
+    Returns:
+        dict: Estadísticas totales, por endpoint y por fase
+    """
+    summary = {
+        'elapsed_s': round(elapsed, 3),
+        'total': latency_stats(records, elapsed),
+        'endpoints': {}
+    }
+    for name in sorted({record[0] for record in records}):
+        summary['endpoints'][name] = latency_stats([record for record in records if record[0] == name], elapsed)
+
+    if windows:
+        def overlaps(record):
+            start, end = record[1], record[1] + record[2]
+            return any(start < window_end and end > window_start for window_start, window_end, _ in windows)
+
+        during = [record for record in records if overlaps(record)]
+        steady = [record for record in records if not overlaps(record)]
+        summary['during_disruption'] = latency_stats(during, elapsed)
+        summary['steady'] = latency_stats(steady, elapsed)
+        durations = sorted(end - start for start, end, _ in windows)
+        summary['disruptions'] = {
+            'count': len(windows),
+            'failed': sum(1 for _, _, status in windows if status != 200),
+            'p50_ms': round(percentile(durations, 0.50) * 1000, 3),
+            'max_ms': round(durations[-1] * 1000, 3)
+        }
+    return summary
+
+
+def print_summary(summary):
+    print(f"{'grupo':<22} {'peticiones':>10} {'errores':>8} {'req/s':>9} "
+          f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'máx ms':>9}")
+    rows = [('total', summary['total'])] + list(summary['endpoints'].items())
+    if 'steady' in summary:
+        rows += [('sin recarga', summary['steady']), ('durante recarga', summary['during_disruption'])]
+    for name, stats in rows:
+        print(f"{name:<22} {stats['requests']:>10} {stats['errors']:>8} {stats['requests_per_s']:>9.2f} "
+              f"{stats['p50_ms']:>9.3f} {stats['p95_ms']:>9.3f} {stats['p99_ms']:>9.3f} {stats['max_ms']:>9.3f}")
+    if 'disruptions' in summary:
+        disruptions = summary['disruptions']
+        print(f"Recargas: {disruptions['count']} ({disruptions['failed']} fallidas), "
+              f"p50 {disruptions['p50_ms']:.1f} ms, máx {disruptions['max_ms']:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prueba de carga local de la API de SafeText')
+    parser.add_argument('--url', help='Servidor ya iniciado (si no se indica, se inicia uno)')
+    parser.add_argument('--server', choices=('flask', 'gunicorn'), default='flask', help='Servidor a iniciar')
+    parser.add_argument('--workers', type=int, default=2, help='Workers de gunicorn')
+    parser.add_argument('--port', type=int, help='Puerto del servidor iniciado (por defecto uno libre)')
+    parser.add_argument('--concurrency', type=int, default=8, help='Clientes simultáneos')
+    parser.add_argument('--duration', type=float, default=30, help='Segundos de prueba')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='Pesos por endpoint (analyze, search, recommendations)')
+    parser.add_argument('--corpus', help='Archivo de textos, uno por línea (por defecto, corpus sintético)')
+    parser.add_argument('--patterns', default=os.path.join(ROOT, PATTERN_FILE), help='CSV de patrones para el corpus y las búsquedas')
+    parser.add_argument('--disrupt', choices=DISRUPTIONS, default='none', help='Recargar o añadir patrones durante la prueba')
+    parser.add_argument('--disrupt-interval', type=float, default=5.0, help='Segundos entre recargas')
+    parser.add_argument('--seed', type=int, default=0, help='Semilla del corpus y de la mezcla')
+    parser.add_argument('--output', default=RESULTS_FILE, help='Archivo de resultados a escribir')
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    patterns = load_pattern_file(args.patterns)
+    texts = load_corpus(args.corpus) if args.corpus else sample_corpus(patterns, messages=500, seed=args.seed)
+
+    process = workdir = None
+    base_url = args.url.rstrip('/') if args.url else None
+    if base_url is None:
+        port = args.port or free_port()
+        base_url = f'http://127.0.0.1:{port}'
+        print(f"Iniciando {args.server} en {base_url}...")
+        process, workdir = start_server(args.server, port, args.workers)
+
+    try:
+        info = wait_ready(base_url, process)
+        print(f"Servidor listo con {info.get('total_patterns')} patrones; "
+              f"{args.concurrency} clientes durante {args.duration:g} s")
+        workload = Workload(texts, patterns, warm_up(base_url, texts), mix, args.seed)
+        records, windows, elapsed = run_load(base_url, workload, args.concurrency, args.duration,
+                                             args.disrupt, args.disrupt_interval)
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        if workdir is not None:
+            with open(os.path.join(workdir, 'servidor.log'), 'r', encoding='utf-8', errors='replace') as log:
+                print(log.read()[-2000:])
+        return 1
+    finally:
+        if process is not None:
+            stop_server(process, workdir)
+
+    summary = summarize(records, windows, elapsed)
+    data = {
+        'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'server': 'externo' if args.url else args.server,
+        'workers': args.workers if args.server == 'gunicorn' and not args.url else None,
+        'concurrency': args.concurrency,
+        'mix': mix,
+        'disrupt': args.disrupt,
+        'disrupt_interval_s': args.disrupt_interval if args.disrupt != 'none' else None,
+        'texts': len(texts),
+        **summary
+    }
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(data, file, ensure_ascii=False, indent=2)
+
+    print_summary(summary)
+    print(f"Resultados guardados en {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,318 @@
+"""
+Métricas de la aplicación en formato de texto de Prometheus.
+Contadores, histogramas y medidores mínimos, sin dependencias: registrar
+un valor es una búsqueda en un dict y una suma bajo un lock, así que se
+puede hacer en cada petición sin coste apreciable.
+
+Con varios workers (gunicorn), cada scrape llega a un proceso cualquiera.
+Si el registro tiene un directorio compartido (SAFETEXT_METRICS_DIR, que
+gunicorn.conf.py prepara), cada proceso vuelca ahí sus valores como mucho
+cada FLUSH_INTERVAL segundos (desde un hilo propio) y /metrics suma los de todos: los contadores e
+histogramas son los del servicio entero (los de workers ya terminados se
+conservan, así que nunca retroceden) y los medidores se exportan por
+proceso con la etiqueta worker.
+"""
+
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Segundos máximos entre volcados de un proceso al directorio compartido
+FLUSH_INTERVAL = 1.0
+
+# Límites de los histogramas de latencia, en segundos
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help_text, labelnames=()):
+        """
+        Args:
+            name (str): Nombre de la métrica
+            help_text (str): Descripción
+            labelnames (tuple): Nombres de las etiquetas
+        """
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        """
+        Suma al contador con los valores de etiqueta dados.
+        """
+        with self._lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def state(self):
+        with self._lock:
+            return [[list(labels), value] for labels, value in self.values.items()]
+
+    def render(self, values=None):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        if values is None:
+            with self._lock:
+                values = dict(self.values)
+        items = sorted(values.items())
+        for labels, value in items:
+            lines.append(f'{self.name}{_labels(self.labelnames, labels)} {_number(value)}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS, labelnames=()):
+        """
+        Args:
+            name (str): Nombre de la métrica
+            help_text (str): Descripción
+            buckets (tuple): Límites superiores de los intervalos, crecientes
+            labelnames (tuple): Nombres de las etiquetas
+        """
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.labelnames = tuple(labelnames)
+        self.series = {}  # etiquetas -> [conteos por intervalo..., suma, total]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        """
+        Registra una observación con los valores de etiqueta dados.
+        """
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def state(self):
+        with self._lock:
+            return [[list(labels), list(series)] for labels, series in self.series.items()]
+
+    def render(self, series=None):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        if series is None:
+            with self._lock:
+                series = {labels: list(values) for labels, values in self.series.items()}
+        items = sorted(series.items())
+        for labels, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series):
+                cumulative += count
+                le = f'le="{_number(float(bound))}"'
+                lines.append(f'{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.labelnames, labels)} {_number(series[-2])}')
+            lines.append(f'{self.name}_count{_labels(self.labelnames, labels)} {series[-1]}')
+        return lines
+
+
+class Gauge:
+    def __init__(self, name, help_text, function):
+        """
+        Args:
+            name (str): Nombre de la métrica
+            help_text (str): Descripción
+            function (callable): Devuelve el valor actual al exportar
+        """
+        self.name = name
+        self.help_text = help_text
+        self.function = function
+
+    def render(self, workers=None):
+        """
+        Args:
+            workers (dict): Valor de cada proceso (pid -> valor); sin él, el
+                valor actual de este proceso sin etiquetas
+        """
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} gauge']
+        if workers is None:
+            lines.append(f'{self.name} {_number(self.function())}')
+            return lines
+        for pid, value in sorted(workers.items()):
+            lines.append(f'{self.name}{_labels(("worker",), (pid,))} {_number(value)}')
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self, directory=None):
+        """
+        Args:
+            directory (str): Directorio compartido por los workers para sumar
+                sus métricas (None: solo las de este proceso)
+        """
+        self.metrics = []
+        self.directory = directory
+        self._dirty = False
+        self._flusher_pid = None
+        self._flush_lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, buckets=LATENCY_BUCKETS, labelnames=()):
+        return self._register(Histogram(name, help_text, buckets, labelnames))
+
+    def gauge(self, name, help_text, function):
+        return self._register(Gauge(name, help_text, function))
+
+    def _register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def reset(self):
+        """
+        Descarta los valores registrados (en un worker recién creado, que
+        hereda los del proceso maestro).
+        """
+        for metric in self.metrics:
+            if isinstance(metric, Counter):
+                with metric._lock:
+                    metric.values.clear()
+            elif isinstance(metric, Histogram):
+                with metric._lock:
+                    metric.series.clear()
+
+    def _path(self, pid):
+        return os.path.join(self.directory, f'metricas-{pid}.json')
+
+    def flush(self):
+        """
+        Vuelca los valores de este proceso al directorio compartido.
+        """
+        if not self.directory:
+            return
+        state = {'counters': {}, 'histograms': {}, 'gauges': {}}
+        for metric in self.metrics:
+            if isinstance(metric, Counter):
+                state['counters'][metric.name] = metric.state()
+            elif isinstance(metric, Histogram):
+                state['histograms'][metric.name] = metric.state()
+            else:
+                state['gauges'][metric.name] = metric.function()
+
+        path = self._path(os.getpid())
+        temporary = f'{path}.tmp'
+        with self._flush_lock:
+            with open(temporary, 'w', encoding='utf-8') as file:
+                json.dump(state, file)
+            os.replace(temporary, path)
+
+    def changed(self):
+        """
+        Indica que hay valores nuevos que volcar (se llama tras cada
+        petición). El volcado lo hace un hilo del proceso cada FLUSH_INTERVAL,
+        así que los valores de un worker inactivo tampoco se quedan atrás.
+        """
+        if not self.directory:
+            return
+        self._dirty = True
+        if self._flusher_pid != os.getpid():
+            # Primer uso en este proceso (los hilos no sobreviven al fork)
+            self._flusher_pid = os.getpid()
+            threading.Thread(target=self._flush_loop, name='safetext-metricas', daemon=True).start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(FLUSH_INTERVAL)
+            if self._dirty:
+                self._dirty = False
+                try:
+                    self.flush()
+                except OSError as e:
+                    print(f"Error al volcar las métricas: {e}")
+
+    def render(self):
+        """
+        Exporta todas las métricas en formato de texto de Prometheus (las de
+        todos los procesos si hay directorio compartido).
+
+        Returns:
+            str: El texto de exposición
+        """
+        if not self.directory:
+            lines = []
+            for metric in self.metrics:
+                lines.extend(metric.render())
+            return '\n'.join(lines) + '\n'
+
+        self.flush()
+        counters, histograms, gauges = {}, {}, {}
+        for path in glob.glob(os.path.join(self.directory, 'metricas-*.json')):
+            try:
+                with open(path, 'r', encoding='utf-8') as file:
+                    state = json.load(file)
+            except (OSError, ValueError):
+                continue
+            pid = os.path.basename(path)[len('metricas-'):-len('.json')]
+            for name, items in state.get('counters', {}).items():
+                totals = counters.setdefault(name, {})
+                for labels, value in items:
+                    totals[tuple(labels)] = totals.get(tuple(labels), 0) + value
+            for name, items in state.get('histograms', {}).items():
+                totals = histograms.setdefault(name, {})
+                for labels, series in items:
+                    current = totals.get(tuple(labels))
+                    totals[tuple(labels)] = series if current is None else [a + b for a, b in zip(current, series)]
+            for name, value in state.get('gauges', {}).items():
+                gauges.setdefault(name, {})[pid] = value
+
+        lines = []
+        for metric in self.metrics:
+            if isinstance(metric, Counter):
+                lines.extend(metric.render(counters.get(metric.name, {})))
+            elif isinstance(metric, Histogram):
+                lines.extend(metric.render(histograms.get(metric.name, {})))
+            else:
+                lines.extend(metric.render(gauges.get(metric.name, {})))
+        return '\n'.join(lines) + '\n'
+
+
+def mark_process_dead(directory, pid):
+    """
+    Quita los medidores de un proceso terminado; sus contadores e
+    histogramas se conservan para que los totales no retrocedan.
+
+    Args:
+        directory (str): Directorio compartido de métricas
+        pid (int): Proceso terminado
+    """
+    path = os.path.join(directory, f'metricas-{pid}.json')
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            state = json.load(file)
+    except (OSError, ValueError):
+        return
+    state['gauges'] = {}
+    with open(f'{path}.tmp', 'w', encoding='utf-8') as file:
+        json.dump(state, file)
+    os.replace(f'{path}.tmp', path)
@@ -0,0 +1,92 @@
+"""
+Coordinación de recargas de patrones entre procesos.
+Con varios workers (gunicorn) cada proceso tiene su propio analizador. El
+proceso que cambia los patrones escribe un token nuevo en un archivo de
+versión compartido; los demás lo comprueban antes de atender cada petición
+y, cuando cambió, recargan desde el CSV en segundo plano (siguen sirviendo
+la instantánea actual mientras tanto), así que todos acaban sirviendo el
+mismo conjunto de patrones.
+"""
+
+import os
+import threading
+import uuid
+
+
+class PatternVersionFile:
+    def __init__(self, path, analyzer):
+        """
+        Args:
+            path (str): Ruta del archivo de versión compartido
+            analyzer (CyberbullyingAnalyzer): Analizador de este proceso
+        """
+        self.path = path
+        self.analyzer = analyzer
+        self._lock = threading.Lock()
+        self._stat = self._file_stat()
+        self.token = self._read_token()
+
+    def _file_stat(self):
+        try:
+            return self._signature(os.stat(self.path))
+        except OSError:
+            return None
+
+    @staticmethod
+    def _signature(info):
+        return info.st_mtime_ns, info.st_size, info.st_ino
+
+    def _read_token(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                return file.read().strip()
+        except OSError:
+            return None
+
+    def publish(self):
+        """
+        Anuncia a los demás procesos que los patrones cambiaron (se llama
+        después de actualizar el CSV y el analizador de este proceso).
+        """
+        token = f'{os.getpid()}-{uuid.uuid4().hex}'
+        temporary = f'{self.path}.{os.getpid()}.tmp'
+        with self._lock:
+            try:
+                with open(temporary, 'w', encoding='utf-8') as file:
+                    file.write(token)
+                    file.flush()
+                    # El stat se toma del archivo propio antes de renombrarlo
+                    # (el renombrado conserva inodo y mtime): un stat después
+                    # podría ver ya la publicación de otro proceso
+                    stat = self._signature(os.fstat(file.fileno()))
+                os.replace(temporary, self.path)
+            except OSError as e:
+                print(f"Error al publicar la versión de los patrones: {e}")
+                return
+            self.token = token
+            self._stat = stat
+
+    def check(self):
+        """
+        Recarga los patrones en segundo plano si otro proceso publicó
+        cambios. Mientras el archivo no cambie solo cuesta un stat.
+
+        Returns:
+            bool: True si se inició una recarga
+        """
+        stat = self._file_stat()
+        if stat == self._stat:
+            return False
+
+        with self._lock:
+            stat = self._file_stat()
+            if stat == self._stat:
+                return False
+            self._stat = stat
+            token = self._read_token()
+            if token == self.token:
+                return False
+            self.token = token
+
+            self.analyzer.reload_in_background()
+            return True
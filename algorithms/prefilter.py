@@ -0,0 +1,147 @@
+"""
+Prefiltro vectorizado de q-gramas.
+Descarta en bloque los patrones que no pueden aparecer en el texto antes de
+la verificación exacta, para que los mensajes limpios salgan casi gratis.
+"""
+
+try:
+    import numpy as np
+except ImportError:  # Sin NumPy el prefiltro queda desactivado
+    np = None
+
+# Los puntos de código Unicode caben en 21 bits, así que un trigrama se
+# empaqueta sin colisiones en un entero de 63 bits
+CODE_BITS = 21
+
+class QGramPrefilter:
+    def __init__(self, q=3):
+        """
+        Args:
+            q (int): Tamaño de los q-gramas (2 o 3)
+        """
+        self.name = "Prefiltro de q-gramas"
+        self.q = q
+        self.signature = None
+        self.pattern_grams = []
+        self.anchors = {}
+        self.short_patterns = []
+        self.fuzzy_patterns = []
+        self.always = []
+
+    @property
+    def available(self):
+        """
+        Indica si el prefiltro puede usarse (requiere NumPy).
+        """
+        return np is not None
+
+    def _gram_hashes(self, text):
+        """
+        Calcula en un solo paso vectorizado el hash de cada q-grama del texto.
+
+        Args:
+            text (str): Texto normalizado
+
+        Returns:
+            numpy.ndarray: Hashes (uint64) de todos los q-gramas, en orden
+        """
+        codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+        count = len(codes) - self.q + 1
+        if count <= 0:
+            return np.empty(0, dtype=np.uint64)
+
+        hashes = codes[:count].copy()
+        for offset in range(1, self.q):
+            hashes <<= np.uint64(CODE_BITS)
+            hashes |= codes[offset:offset + count]
+        return hashes
+
+    def build(self, patterns, max_errors=None):
+        """
+        Precalcula la firma de q-gramas del conjunto de patrones.
+
+        Args:
+            patterns (list): Patrones ya normalizados (str); los vacíos se ignoran
+                pero conservan su índice
+            max_errors (list): Ediciones permitidas por patrón (opcional)
+        """
+        self.pattern_grams = []
+        self.anchors = {}
+        self.short_patterns = []
+        self.fuzzy_patterns = []
+        self.always = []
+        self.signature = None
+
+        if not self.available:
+            return
+
+        frequency = {}
+        for index, pattern in enumerate(patterns):
+            errors = max_errors[index] if max_errors else 0
+
+            if errors and len(pattern) - self.q + 1 <= errors * self.q:
+                # Con tantos errores ningún q-grama es obligatorio
+                self.pattern_grams.append(None)
+                self.always.append(index)
+                continue
+
+            if not pattern or len(pattern) < self.q:
+                self.pattern_grams.append(None)
+                if pattern:
+                    self.short_patterns.append((index, pattern))
+                continue
+
+            grams = frozenset(self._gram_hashes(pattern).tolist())
+            self.pattern_grams.append(grams)
+            for gram in grams:
+                frequency[gram] = frequency.get(gram, 0) + 1
+
+            if errors:
+                # Cada edición destruye como mucho q de los q-gramas del patrón
+                self.fuzzy_patterns.append((index, grams, errors * self.q))
+
+        # Cada patrón exacto se indexa por su q-grama menos común: solo se
+        # revisa cuando ese q-grama aparece en el texto
+        fuzzy = {index for index, _, _ in self.fuzzy_patterns}
+        for index, grams in enumerate(self.pattern_grams):
+            if grams and index not in fuzzy:
+                anchor = min(grams, key=frequency.get)
+                self.anchors.setdefault(anchor, []).append(index)
+
+        self.signature = np.array(sorted(frequency), dtype=np.uint64)
+
+    def candidates(self, text):
+        """
+        Obtiene los patrones que podrían aparecer en el texto.
+
+        Un patrón exacto solo puede aparecer si todos sus q-gramas aparecen en
+        el texto, y uno con k errores si faltan como mucho k * q, así que el
+        resultado nunca omite una coincidencia real.
+
+        Args:
+            text (str): Texto normalizado
+
+        Returns:
+            list: Índices de patrones candidatos en orden, o None si el
+                prefiltro no está disponible
+        """
+        if self.signature is None:
+            return None
+
+        candidates = list(self.always)
+        candidates.extend(index for index, pattern in self.short_patterns if pattern in text)
+
+        if len(self.signature):
+            present = set(np.intersect1d(self._gram_hashes(text), self.signature).tolist())
+            pattern_grams = self.pattern_grams
+            for gram in present:
+                for index in self.anchors.get(gram, ()):
+                    if pattern_grams[index] <= present:
+                        candidates.append(index)
+
+            for index, grams, allowed_missing in self.fuzzy_patterns:
+                if len(grams - present) <= allowed_missing:
+                    candidates.append(index)
+
+        candidates.sort()
+        return candidates
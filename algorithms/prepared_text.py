@@ -0,0 +1,167 @@
+"""
+Vista normalizada del texto a analizar.
+Se construye una sola vez por análisis y la comparten todos los algoritmos,
+con un mapa de posiciones para volver al texto original.
+"""
+
+from array import array
+from .folding import fold_with_offsets
+
+class PreparedText:
+    def __init__(self, text, fold=False, compact=False, max_details=None):
+        """
+        Args:
+            text (str): El texto original
+            fold (bool): Plegar acentos, leetspeak y letras repetidas además
+                de pasar a minúsculas
+            compact (bool): Devolver solo las posiciones de cada patrón, en un
+                array('i') y sin matches_detail
+            max_details (int): Máximo de entradas de matches_detail por patrón
+                (None para todas); total_matches y positions siguen completos
+        """
+        self.original = text
+        self.fold = fold
+        self.compact = compact
+        self.max_details = max_details
+        if fold:
+            self.normalized, self.offsets = fold_with_offsets(text)
+        else:
+            self.normalized, self.offsets = self._normalize(text)
+
+    def __len__(self):
+        return len(self.normalized)
+
+    def _normalize(self, text):
+        """
+        Convierte el texto a minúsculas conservando el origen de cada carácter.
+
+        Args:
+            text (str): El texto original
+
+        Returns:
+            tuple: (texto normalizado, mapa de posiciones o None si es identidad)
+        """
+        lowered = text.lower()
+
+        # lower() nunca acorta un carácter: si la longitud no cambia,
+        # cada posición corresponde a la misma del original
+        if len(lowered) == len(text):
+            return lowered, None
+
+        # Algunos caracteres crecen al pasar a minúsculas (por ejemplo 'İ')
+        parts = []
+        offsets = array('i')
+        for i, char in enumerate(text):
+            lower_char = char.lower()
+            parts.append(lower_char)
+            offsets.extend([i] * len(lower_char))
+
+        return ''.join(parts), offsets
+
+    def to_original(self, position):
+        """
+        Traduce una posición del texto normalizado al texto original.
+
+        Args:
+            position (int): Posición en el texto normalizado
+
+        Returns:
+            int: Posición en el texto original
+        """
+        if self.offsets is None:
+            return position
+        return self.offsets[position]
+
+    def span(self, position, length):
+        """
+        Traduce una coincidencia del texto normalizado a un rango del original.
+
+        Args:
+            position (int): Inicio en el texto normalizado
+            length (int): Longitud de la coincidencia en el texto normalizado
+
+        Returns:
+            tuple: (inicio, fin) en el texto original, fin exclusivo
+        """
+        if self.offsets is None:
+            return position, position + length
+
+        # El fin llega hasta el siguiente carácter conservado, para cubrir
+        # las letras repetidas que se colapsaron
+        last = position + length - 1
+        if last + 1 < len(self.offsets):
+            end = max(self.offsets[last] + 1, self.offsets[last + 1])
+        else:
+            end = len(self.original)
+        return self.offsets[position], end
+
+    def pattern_info(self, algorithm_name, pattern, length, positions, lengths=None, edit_distances=None):
+        """
+        Construye el resultado detallado de una búsqueda sobre este texto.
+
+        Args:
+            algorithm_name (str): Nombre del algoritmo usado
+            pattern (str): El patrón original
+            length (int): Longitud del patrón normalizado
+            positions (list): Posiciones en el texto normalizado
+            lengths (list): Longitud de cada coincidencia, si varía (búsqueda aproximada)
+            edit_distances (list): Distancia de edición de cada coincidencia (opcional)
+
+        Returns:
+            dict: Información detallada de las coincidencias, con posiciones
+                y contexto referidos al texto original (según compact y max_details)
+        """
+        if self.offsets is None:
+            starts = array('i', positions)
+        else:
+            offsets = self.offsets
+            starts = array('i', [offsets[pos] for pos in positions])
+
+        result = {
+            'algorithm': algorithm_name,
+            'pattern': pattern,
+            'total_matches': len(starts),
+            'positions': starts if self.compact else starts.tolist(),
+            'pattern_length': len(pattern),
+            'found': len(starts) > 0
+        }
+        if self.compact:
+            return result
+
+        # El contexto solo se construye para las coincidencias que se devuelven
+        text = self.original
+        n = len(text)
+        shown = len(starts) if self.max_details is None else min(self.max_details, len(starts))
+        details = []
+
+        for index in range(shown):
+            start, end = self.span(positions[index], lengths[index] if lengths else length)
+            detail = {
+                'position': start,
+                'context_start': max(0, start - 10),
+                'context_end': min(n, end + 10),
+                'context': text[max(0, start - 10):min(n, end + 10)]
+            }
+            if edit_distances is not None:
+                detail['edit_distance'] = edit_distances[index]
+            details.append(detail)
+
+        result['matches_detail'] = details
+        if self.max_details is not None:
+            result['details_truncated'] = shown < len(starts)
+        return result
+
+
+def as_prepared(text):
+    """
+    Normaliza el argumento de búsqueda a un PreparedText (sin plegado).
+
+    Args:
+        text (str | PreparedText): Texto original o ya preparado
+
+    Returns:
+        PreparedText: El texto preparado
+    """
+    if isinstance(text, PreparedText):
+        return text
+    return PreparedText(text)
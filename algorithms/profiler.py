@@ -0,0 +1,179 @@
+"""
+Perfilado de peticiones con cProfile, activable en caliente.
+Perfila una muestra aleatoria de las peticiones; con un umbral de latencia
+solo se conservan las perfiladas que lo superan. Perfilar cuesta varias
+veces el tiempo de la petición, así que el umbral no perfila todo: sin una
+muestra explícita usa THRESHOLD_SAMPLE_RATE.
+Los perfiles conservados se acumulan en un único pstats por proceso, que se
+guarda periódicamente (y a demanda) en un directorio local para abrirlo con
+pstats o snakeviz. Desactivado, cada petición solo paga una comprobación.
+"""
+
+import cProfile
+import os
+import pstats
+import random
+import threading
+
+DEFAULT_DIRECTORY = os.environ.get('SAFETEXT_PROFILE_DIR') or 'perfiles'
+DUMP_EVERY = 50  # Perfiles conservados entre guardados automáticos
+THRESHOLD_SAMPLE_RATE = 0.1  # Muestra con umbral si no se indica otra
+
+
+class RequestProfiler:
+    def __init__(self, directory=DEFAULT_DIRECTORY, sample_rate=0.0, threshold_ms=None):
+        """
+        Args:
+            directory (str): Directorio donde se guardan los pstats
+            sample_rate (float): Fracción de peticiones a perfilar (0 a 1)
+            threshold_ms (float): Conservar solo las peticiones perfiladas más
+                lentas que esto
+        """
+        self.directory = directory
+        self.sample_rate = 0.0
+        self.threshold_ms = None
+        self.enabled = False
+        self.stats = None
+        self.profiled = 0
+        self.kept = 0
+        self._since_dump = 0
+        self._lock = threading.Lock()
+        self.configure(sample_rate=sample_rate, threshold_ms=threshold_ms)
+
+    def configure(self, enabled=None, sample_rate=None, threshold_ms=None):
+        """
+        Cambia la configuración en caliente. Sin 'enabled', el perfilado queda
+        activo si hay una muestra o un umbral.
+
+        Args:
+            enabled (bool): Activar o desactivar el perfilado
+            sample_rate (float): Fracción de peticiones a perfilar (0 a 1)
+            threshold_ms (float): Umbral de latencia (0 o None para no usarlo)
+        """
+        if sample_rate is not None:
+            self.sample_rate = min(1.0, max(0.0, float(sample_rate)))
+        if threshold_ms is not None:
+            self.threshold_ms = float(threshold_ms) or None
+        if self.threshold_ms is not None and self.sample_rate == 0:
+            self.sample_rate = THRESHOLD_SAMPLE_RATE
+        if enabled is None:
+            enabled = self.sample_rate > 0
+        self.enabled = bool(enabled)
+
+    def start(self):
+        """
+        Empieza a perfilar la petición actual si le toca.
+
+        Returns:
+            cProfile.Profile: El perfil en curso, o None si no se perfila
+        """
+        if not self.enabled or random.random() >= self.sample_rate:
+            return None
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Solo puede haber un perfilador activo a la vez (Python 3.12+)
+            return None
+        return profile
+
+    def finish(self, profile, elapsed):
+        """
+        Termina el perfil de una petición y lo acumula si se conserva.
+
+        Args:
+            profile (cProfile.Profile): Perfil devuelto por start
+            elapsed (float): Duración de la petición en segundos
+        """
+        profile.disable()
+        threshold_ms = self.threshold_ms
+        keep = threshold_ms is None or elapsed * 1000 >= threshold_ms
+
+        with self._lock:
+            self.profiled += 1
+            if not keep:
+                return
+
+            if self.stats is None:
+                self.stats = pstats.Stats(profile)
+            else:
+                self.stats.add(profile)
+            self.kept += 1
+            self._since_dump += 1
+            dump = self._since_dump >= DUMP_EVERY
+
+        if dump:
+            self.dump()
+
+    def dump(self):
+        """
+        Guarda los perfiles acumulados de este proceso.
+
+        Returns:
+            str: Ruta del archivo pstats, o None si aún no hay perfiles
+        """
+        path = os.path.join(self.directory, f'perfil-{os.getpid()}.pstats')
+        with self._lock:
+            if self.stats is None:
+                return None
+            os.makedirs(self.directory, exist_ok=True)
+            self.stats.dump_stats(path)
+            self._since_dump = 0
+        return path
+
+    def summary(self, limit=20, sort='cumulative'):
+        """
+        Obtiene las funciones más costosas de los perfiles acumulados.
+
+        Args:
+            limit (int): Número de funciones
+            sort (str): 'cumulative' (con lo que llaman) o 'tottime' (propio)
+
+        Returns:
+            list: Funciones con llamadas y tiempos en ms
+        """
+        with self._lock:
+            if self.stats is None:
+                return []
+            entries = list(self.stats.stats.items())
+
+        column = 3 if sort == 'cumulative' else 2
+        entries.sort(key=lambda entry: entry[1][column], reverse=True)
+
+        functions = []
+        for (filename, line, name), (primitive_calls, calls, total, cumulative, _) in entries[:limit]:
+            functions.append({
+                'function': name,
+                'file': filename,
+                'line': line,
+                'calls': calls,
+                'primitive_calls': primitive_calls,
+                'tottime_ms': round(total * 1000, 3),
+                'cumulative_ms': round(cumulative * 1000, 3)
+            })
+        return functions
+
+    def status(self):
+        """
+        Returns:
+            dict: Configuración actual y número de perfiles tomados
+        """
+        return {
+            'enabled': self.enabled,
+            'sample_rate': self.sample_rate,
+            'threshold_ms': self.threshold_ms,
+            'profiled_requests': self.profiled,
+            'kept_requests': self.kept,
+            'directory': self.directory
+        }
+
+    def reset(self):
+        """
+        Descarta los perfiles acumulados.
+        """
+        with self._lock:
+            self.stats = None
+            self.profiled = 0
+            self.kept = 0
+            self._since_dump = 0
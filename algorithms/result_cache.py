@@ -0,0 +1,129 @@
+"""
+Caché de resultados de análisis direccionada por contenido.
+La clave es el hash del texto junto con la versión del conjunto de patrones,
+así que un texto repetido (mensajes reenviados, reintentos) se resuelve sin
+volver a analizarlo y un cambio de patrones nunca devuelve resultados viejos.
+"""
+
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+# Configuración por defecto (se puede cambiar con variables de entorno)
+DEFAULT_MAX_BYTES = int(os.environ.get('SAFETEXT_CACHE_MAX_BYTES') or 64 * 1024 * 1024)
+DEFAULT_TTL = float(os.environ.get('SAFETEXT_CACHE_TTL') or 3600)
+
+
+def text_digest(text):
+    """
+    Calcula el hash de contenido de un texto.
+
+    Args:
+        text (str): El texto
+
+    Returns:
+        bytes: Hash de 16 bytes
+    """
+    return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+
+class ResultCache:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, ttl=DEFAULT_TTL):
+        """
+        Args:
+            max_bytes (int): Memoria máxima ocupada por los resultados guardados
+            ttl (float): Segundos que un resultado sigue siendo válido
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.entries = OrderedDict()  # clave -> (caduca_en, resultado serializado)
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Busca un resultado guardado.
+
+        Args:
+            key (tuple): Clave del resultado
+
+        Returns:
+            dict: Copia del resultado, o None si no está o ya caducó
+        """
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                self._remove(key)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            data = entry[1]
+
+        # Se guarda serializado: cada acierto recibe su propia copia y el
+        # tamaño en memoria es exacto
+        return pickle.loads(data)
+
+    def put(self, key, result):
+        """
+        Guarda un resultado, descartando los menos usados si no cabe.
+
+        Args:
+            key (tuple): Clave del resultado
+            result (dict): Resultado del análisis
+        """
+        data = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (time.monotonic() + self.ttl, data)
+            self.size += len(data)
+
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        _, data = self.entries.pop(key)
+        self.size -= len(data)
+
+    def clear(self):
+        """
+        Vacía la caché (por ejemplo, al recargar los patrones).
+        """
+        with self._lock:
+            self.entries.clear()
+            self.size = 0
+
+    def stats(self):
+        """
+        Obtiene las estadísticas de uso de la caché.
+
+        Returns:
+            dict: Aciertos, fallos, entradas y memoria ocupada
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self.entries),
+                'size_bytes': self.size,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl
+            }
@@ -1,23 +1,81 @@
 """
 Selector automático de algoritmo para búsqueda de patrones.
-Decide entre KMP y Boyer-Moore según las características del patrón.
+Decide entre KMP y Boyer-Moore según las características del patrón, o según
+una calibración empírica si existe, y permite forzar cualquiera de los motores
+disponibles.
 """
 
 from .kmp import KMPAlgorithm
 from .boyer_moore import BoyerMooreAlgorithm
+from .horspool import HorspoolAlgorithm
+from .sunday import SundayAlgorithm
+from .two_way import TwoWayAlgorithm
+from .approximate import ApproximateAlgorithm
+from .compiled import CompiledPattern
+from .calibration import CALIBRATION_FILE, calibration_digest, load_calibration, length_bucket
 import re
 
 class AlgorithmSelector:
-    def __init__(self):
+    def __init__(self, calibration_file=CALIBRATION_FILE):
+        """
+        Args:
+            calibration_file (str): Archivo de calibración generado con
+                python -m algorithms.calibration (None para no usarlo)
+        """
         self.kmp = KMPAlgorithm()
         self.boyer_moore = BoyerMooreAlgorithm()
+        self.horspool = HorspoolAlgorithm()
+        self.sunday = SundayAlgorithm()
+        self.two_way = TwoWayAlgorithm()
+        self.approximate = ApproximateAlgorithm()
+        
+        # Motores disponibles por nombre corto
+        self.algorithms = {
+            'KMP': self.kmp,
+            'Boyer-Moore': self.boyer_moore,
+            'Horspool': self.horspool,
+            'Sunday': self.sunday,
+            'Two-Way': self.two_way,
+            'Wu-Manber': self.approximate
+        }
+        
+        # Ganadores medidos por patrón y por rango de longitud
+        self.calibration_file = calibration_file
+        self.calibration = None
+        self.calibration_digest = None
+        self.reload_calibration()
+    
+    def reload_calibration(self):
+        """
+        Vuelve a leer el archivo de calibración (tras recalibrar).
+        
+        Returns:
+            str: Hash de la calibración cargada, o None si no hay
+        """
+        calibration = load_calibration(self.calibration_file)
+        self.calibration = calibration
+        self.calibration_digest = calibration_digest(calibration)
+        return self.calibration_digest
     
-    def analyze_pattern(self, pattern):
+    def enable_instrumentation(self, counters):
+        """
+        Activa el conteo de operaciones de KMP y Boyer-Moore.
+        
+        Args:
+            counters (OperationCounters): Donde se acumulan las operaciones
+                por patrón (None para desactivar el conteo)
+        """
+        self.kmp.counters = counters
+        self.boyer_moore.counters = counters
+    
+    def analyze_pattern(self, pattern, normalized=None):
         """
         Analiza las características del patrón para decidir qué algoritmo usar.
         
         Args:
             pattern (str): El patrón a analizar
+            normalized (str): Forma con la que se compara el patrón (plegada o
+                en minúsculas); es la clave de la calibración por patrón
             
         Returns:
             dict: Información del análisis del patrón
@@ -28,7 +86,8 @@ class AlgorithmSelector:
                 'has_repetitions': False,
                 'repetition_ratio': 0,
                 'recommended_algorithm': 'KMP',
-                'reason': 'Patrón vacío'
+                'reason': 'Patrón vacío',
+                'measured_costs': None
             }
         
         length = len(pattern)
@@ -56,15 +115,50 @@ class AlgorithmSelector:
             algorithm = 'Boyer-Moore'
             reason = f'Patrón largo ({length} caracteres) con baja repetición'
         
+        # Si hay calibración, la medición manda sobre la heurística
+        measured_costs = None
+        calibrated = self._calibrated_choice(normalized or pattern.lower())
+        if calibrated:
+            algorithm, measured_costs, source = calibrated
+            costs = ', '.join(f'{name} {cost:.1f}' for name, cost in sorted(measured_costs.items(), key=lambda item: item[1]))
+            reason = f'Calibración empírica ({source}): {costs} {self.calibration.get("unit", "ns/carácter")}'
+        
         return {
             'length': length,
             'has_repetitions': has_repetitions,
             'repetition_ratio': repetition_ratio,
             'recommended_algorithm': algorithm,
             'reason': reason,
+            'measured_costs': measured_costs,
             'char_distribution': char_count
         }
     
+    def _calibrated_choice(self, pattern):
+        """
+        Busca el motor ganador en la calibración, primero por patrón y luego
+        por rango de longitud.
+        
+        Args:
+            pattern (str): El patrón normalizado
+            
+        Returns:
+            tuple: (algoritmo, costes medidos, origen) o None si no hay medición
+        """
+        if not self.calibration:
+            return None
+        
+        entry = self.calibration.get('patterns', {}).get(pattern)
+        source = 'medición del patrón'
+        if entry is None:
+            bucket = length_bucket(len(pattern))
+            entry = self.calibration.get('buckets', {}).get(bucket)
+            source = f'longitud {bucket}'
+        
+        if not entry or entry.get('winner') not in self.algorithms:
+            return None
+        
+        return entry['winner'], entry['costs'], source
+    
     def _has_repetitive_patterns(self, pattern):
         """
         Detecta patrones repetitivos comunes en el texto.
@@ -88,35 +182,76 @@ class AlgorithmSelector:
         
         return False
     
-    def select_algorithm(self, pattern):
+    def select_algorithm(self, pattern, algorithm=None):
         """
         Selecciona el algoritmo más apropiado para el patrón dado.
         
+        Los patrones compilados con errores permitidos (max_errors > 0) usan
+        la búsqueda aproximada salvo que se fuerce otro motor.
+        
         Args:
-            pattern (str): El patrón de búsqueda
+            pattern (str | CompiledPattern): El patrón de búsqueda
+            algorithm (str): Nombre de un motor para forzar la elección (opcional)
             
         Returns:
             tuple: (algoritmo_seleccionado, información_del_análisis)
         """
-        analysis = self.analyze_pattern(pattern)
-        
-        if analysis['recommended_algorithm'] == 'KMP':
-            return self.kmp, analysis
+        if isinstance(pattern, CompiledPattern) and pattern.analysis is not None:
+            # Decisión ya tomada al compilar el patrón
+            analysis = pattern.analysis
+        elif isinstance(pattern, CompiledPattern):
+            analysis = self.analyze_pattern(pattern.pattern, pattern.normalized)
+            if pattern.max_errors > 0:
+                analysis['recommended_algorithm'] = 'Wu-Manber'
+                analysis['reason'] = f'Búsqueda aproximada (hasta {pattern.max_errors} errores de edición)'
         else:
-            return self.boyer_moore, analysis
+            analysis = self.analyze_pattern(pattern)
+        
+        if algorithm is not None:
+            if algorithm not in self.algorithms:
+                raise ValueError(f'Algoritmo desconocido: {algorithm}')
+            analysis = dict(analysis)
+            analysis['recommended_algorithm'] = algorithm
+            analysis['reason'] = 'Algoritmo forzado por el usuario'
+        
+        return self.algorithms[analysis['recommended_algorithm']], analysis
+    
+    def compile_pattern(self, pattern, algorithm=None, max_errors=0, normalized=None):
+        """
+        Precompila un patrón: guarda su análisis y las tablas del algoritmo
+        elegido para que las búsquedas posteriores no repitan ese trabajo.
+        
+        Args:
+            pattern (str): El patrón de búsqueda
+            algorithm (str): Nombre de un motor para forzar la elección (opcional)
+            max_errors (int): Ediciones permitidas (búsqueda aproximada si es > 0)
+            normalized (str): Forma normalizada del patrón (por defecto, en minúsculas)
+            
+        Returns:
+            CompiledPattern: El patrón compilado
+        """
+        compiled = CompiledPattern(pattern, max_errors=max_errors, normalized=normalized)
+        engine, compiled.analysis = self.select_algorithm(compiled, algorithm)
+        compiled.tables(engine)
+        return compiled
     
-    def search_pattern(self, text, pattern):
+    def search_pattern(self, text, pattern, algorithm=None, max_errors=0):
         """
         Busca un patrón en el texto usando el algoritmo más apropiado.
         
         Args:
-            text (str): El texto donde buscar
-            pattern (str): El patrón a buscar
+            text (str | PreparedText): El texto donde buscar
+            pattern (str | CompiledPattern): El patrón a buscar
+            algorithm (str): Nombre de un motor para forzar la elección (opcional)
+            max_errors (int): Ediciones permitidas para un patrón sin compilar
             
         Returns:
             dict: Resultados de la búsqueda con información del algoritmo usado
         """
-        algorithm, analysis = self.select_algorithm(pattern)
+        if max_errors and not isinstance(pattern, CompiledPattern):
+            pattern = CompiledPattern(pattern, max_errors=max_errors)
+        
+        algorithm, analysis = self.select_algorithm(pattern, algorithm)
         
         # Realizar la búsqueda
         result = algorithm.find_pattern_info(text, pattern)
@@ -0,0 +1,513 @@
+"""
+Instantánea inmutable del conjunto de patrones cargado.
+Reúne los patrones, sus formas normalizadas y todos los índices derivados
+(autómata, índice de tokens, prefiltro, grupos por severidad). Se construye
+completa fuera del camino de las peticiones y se publica con un único
+cambio de referencia, así que cada análisis trabaja de principio a fin con
+la misma instantánea aunque haya una recarga en curso.
+"""
+
+import copy
+import hashlib
+from .aho_corasick import AhoCorasickAutomaton
+from .token_index import TokenNgramIndex
+from .prefilter import QGramPrefilter
+from .folding import fold_text
+
+# Pesos de cada nivel de severidad en la puntuación de riesgo
+SEVERITY_WEIGHTS = {'Low': 1, 'Medium': 3, 'High': 7, 'Critical': 15}
+
+# Los cambios incrementales se acumulan en índices delta hasta que superan
+# este tamaño (o una fracción del total); entonces se reconstruye todo
+COMPACT_MIN = 256
+COMPACT_RATIO = 10
+
+class PatternSnapshot:
+    def __init__(self, patterns, selector, engine='aho-corasick', fold=True, prefilter=True, version=0):
+        """
+        Args:
+            patterns (list): Patrones leídos del CSV (dicts con pattern, severity, ...)
+            selector (AlgorithmSelector): Selector con el que se compilan los patrones
+            engine (str): 'aho-corasick' o 'selector'
+            fold (bool): Plegar los patrones igual que el texto
+            prefilter (bool): Construir el prefiltro de q-gramas
+            version (int): Número de versión de la instantánea
+        """
+        self.patterns = tuple(patterns)
+        self.selector = selector
+        self.engine = engine
+        self.fold = fold
+        self.version = version
+        self.automaton = AhoCorasickAutomaton()
+        self.token_index = TokenNgramIndex()
+        self.prefilter = QGramPrefilter() if prefilter else None
+
+        # Los patrones se normalizan igual que el texto (plegados o en minúsculas)
+        normalize = fold_text if fold else str.lower
+        self.normalized = tuple(normalize(pattern_info['pattern']) for pattern_info in self.patterns)
+        max_errors = [pattern_info.get('max_errors', 0) for pattern_info in self.patterns]
+
+        # Precompilar cada patrón (tablas y decisión del selector)
+        self.compiled_patterns = tuple(
+            selector.compile_pattern(pattern_info['pattern'], max_errors=errors, normalized=form)
+            if pattern_info['pattern'] else None
+            for pattern_info, errors, form in zip(self.patterns, max_errors, self.normalized)
+        )
+
+        # Los patrones de palabra completa van al índice de tokens; los que no
+        # tienen ningún token siguen buscándose como subcadena
+        self.token_index.build(
+            [pattern_info['pattern'] if pattern_info.get('mode') == 'palabra' else '' for pattern_info in self.patterns],
+            self.normalized
+        )
+        self.word_indices = frozenset(self.token_index.indexed())
+        self.max_word_tokens = self.token_index.max_tokens
+
+        # Los patrones aproximados no caben en el autómata exacto: se buscan aparte
+        self.approximate_indices = tuple(
+            index for index, errors in enumerate(max_errors)
+            if errors > 0 and index not in self.word_indices
+        )
+        self.automaton.build(
+            [
+                '' if errors > 0 or index in self.word_indices else pattern_info['pattern']
+                for index, (pattern_info, errors) in enumerate(zip(self.patterns, max_errors))
+            ],
+            self.normalized
+        )
+        if self.prefilter:
+            self.prefilter.build(
+                ['' if index in self.word_indices else form for index, form in enumerate(self.normalized)],
+                max_errors
+            )
+
+        self.severity_tiers = self._build_severity_tiers()
+
+        # Cambios incrementales (ver apply_changes): patrones base que se
+        # ignoran y patrones que viven en los índices delta
+        self.base_size = len(self.patterns)
+        self.active_patterns = self.patterns
+        self.overridden = frozenset()
+        self.delta_indices = ()
+        self.delta_automaton = None
+        self.delta_token_index = None
+        self.delta_approximate = ()
+
+        # Los resultados guardados en caché dependen del conjunto de patrones
+        self.patterns_hash = hashlib.blake2b(
+            repr((engine, fold, self.patterns)).encode('utf-8'),
+            digest_size=8
+        ).hexdigest()
+
+    def apply_changes(self, added=(), removed=(), severities=None, version=0):
+        """
+        Crea una instantánea nueva con patrones añadidos, eliminados o con otra
+        severidad, sin reconstruir los índices base.
+
+        Los patrones base afectados se marcan para ignorarse y los nuevos o
+        modificados se compilan en un autómata e índice de tokens delta, que
+        solo contienen esos pocos patrones. Cuando el delta crece demasiado se
+        reconstruye la instantánea completa.
+
+        Args:
+            added (list): Patrones nuevos (dicts con pattern, severity, ...)
+            removed (iterable): Índices de los patrones a eliminar
+            severities (dict): Nueva severidad por índice de patrón
+            version (int): Número de versión de la nueva instantánea
+
+        Returns:
+            PatternSnapshot: La nueva instantánea (esta no se modifica)
+        """
+        severities = severities or {}
+        patterns = list(self.patterns)
+        normalized = list(self.normalized)
+        compiled = list(self.compiled_patterns)
+        overridden = set(self.overridden)
+        delta = set(self.delta_indices)
+
+        # Los índices se conservan para que los índices base sigan alineados
+        for index in removed:
+            patterns[index] = None
+            normalized[index] = ''
+            compiled[index] = None
+            delta.discard(index)
+            if index < self.base_size:
+                overridden.add(index)
+
+        for index, severity in severities.items():
+            if patterns[index] is None:
+                continue
+            patterns[index] = dict(patterns[index], severity=severity)
+            delta.add(index)
+            if index < self.base_size:
+                overridden.add(index)
+
+        normalize = fold_text if self.fold else str.lower
+        for pattern_info in added:
+            form = normalize(pattern_info['pattern'])
+            patterns.append(pattern_info)
+            normalized.append(form)
+            compiled.append(
+                self.selector.compile_pattern(
+                    pattern_info['pattern'], max_errors=pattern_info.get('max_errors', 0), normalized=form
+                ) if pattern_info['pattern'] else None
+            )
+            delta.add(len(patterns) - 1)
+
+        active = tuple(pattern_info for pattern_info in patterns if pattern_info is not None)
+        if len(delta) + len(overridden) > max(COMPACT_MIN, len(active) // COMPACT_RATIO):
+            return PatternSnapshot(
+                active, self.selector, engine=self.engine, fold=self.fold,
+                prefilter=self.prefilter is not None, version=version
+            )
+
+        # Los índices base se comparten con la instantánea anterior
+        snapshot = copy.copy(self)
+        snapshot.patterns = tuple(patterns)
+        snapshot.normalized = tuple(normalized)
+        snapshot.compiled_patterns = tuple(compiled)
+        snapshot.active_patterns = active
+        snapshot.overridden = frozenset(overridden)
+        snapshot.version = version
+        snapshot._build_delta(sorted(delta))
+        snapshot.patterns_hash = hashlib.blake2b(
+            repr((self.patterns_hash, added, sorted(removed), sorted(severities.items()))).encode('utf-8'),
+            digest_size=8
+        ).hexdigest()
+        return snapshot
+
+    def _build_delta(self, delta_indices):
+        """
+        Construye los índices delta con los patrones añadidos o modificados.
+
+        Args:
+            delta_indices (list): Índices de los patrones del delta
+        """
+        members = set(delta_indices)
+        self.delta_indices = tuple(delta_indices)
+
+        self.delta_token_index = TokenNgramIndex()
+        self.delta_token_index.build(
+            [
+                pattern_info['pattern'] if index in members and pattern_info.get('mode') == 'palabra' else ''
+                for index, pattern_info in enumerate(self.patterns)
+            ] if members else [],
+            self.normalized if members else []
+        )
+        delta_words = self.delta_token_index.indexed()
+
+        self.delta_approximate = tuple(
+            index for index in delta_indices
+            if self.patterns[index].get('max_errors', 0) > 0 and index not in delta_words
+        )
+        exact = members - delta_words - set(self.delta_approximate)
+        self.delta_automaton = AhoCorasickAutomaton()
+        self.delta_automaton.build(
+            [
+                pattern_info['pattern'] if index in exact else ''
+                for index, pattern_info in enumerate(self.patterns)
+            ] if exact else [],
+            self.normalized if exact else []
+        )
+
+        # Palabras completas vigentes: las base que no se ignoran y las del delta
+        self.word_indices = frozenset(self.word_indices - self.overridden) | delta_words
+        self.max_word_tokens = max(self.token_index.max_tokens, self.delta_token_index.max_tokens)
+
+    def _live(self, found):
+        """
+        Descarta de unos resultados los patrones base eliminados o modificados.
+
+        Args:
+            found (dict): Resultados por índice de patrón
+
+        Returns:
+            dict: Los resultados de los patrones vigentes
+        """
+        if not self.overridden:
+            return found
+        return {index: result for index, result in found.items() if index not in self.overridden}
+
+    def _build_severity_tiers(self):
+        """
+        Agrupa los patrones por severidad, de mayor a menor, con un autómata y
+        un índice de tokens propios para el modo veredicto.
+
+        Returns:
+            tuple: Grupos de severidad (dicts)
+        """
+        tiers = []
+        approximate = set(self.approximate_indices)
+
+        for severity in sorted(SEVERITY_WEIGHTS, key=SEVERITY_WEIGHTS.get, reverse=True):
+            members = [
+                index for index, pattern_info in enumerate(self.patterns)
+                if pattern_info['severity'] == severity and self.compiled_patterns[index] is not None
+            ]
+            if not members:
+                continue
+
+            member_set = set(members)
+            automaton = AhoCorasickAutomaton()
+            automaton.build(
+                [pattern if index in member_set else '' for index, pattern in enumerate(self.automaton.patterns)],
+                self.normalized
+            )
+            token_index = TokenNgramIndex()
+            token_index.build(
+                [pattern if index in member_set else '' for index, pattern in enumerate(self.token_index.patterns)],
+                self.normalized
+            )
+
+            tiers.append({
+                'severity': severity,
+                'substring': [index for index in members if index not in self.word_indices],
+                'approximate': [index for index in members if index in approximate],
+                'automaton': automaton,
+                'token_index': token_index
+            })
+
+        return tuple(tiers)
+
+    def candidates(self, normalized):
+        """
+        Aplica el prefiltro de q-gramas, si está activo.
+
+        Args:
+            normalized (str): El texto normalizado
+
+        Returns:
+            list: Índices de patrones candidatos, o None para buscarlos todos
+        """
+        if not self.prefilter:
+            return None
+
+        candidates = self.prefilter.candidates(normalized)
+        if self.overridden or self.delta_indices:
+            # El prefiltro solo conoce los patrones base: los del delta siempre
+            # son candidatos
+            candidates = sorted(
+                {index for index in candidates if index not in self.overridden} | set(self.delta_indices)
+            )
+        return candidates
+
+    def search_patterns(self, text, candidates=None):
+        """
+        Busca todos los patrones en el texto con el motor configurado.
+
+        Args:
+            text (PreparedText): El texto ya normalizado
+            candidates (list): Índices de patrones que pueden aparecer según el
+                prefiltro (None para buscarlos todos)
+
+        Returns:
+            generator: Pares (pattern_info, resultado) en el orden de self.patterns
+        """
+        found = self._search_substrings(text, candidates)
+
+        # Los patrones de palabra completa se buscan en el índice de tokens,
+        # cuyo costo no depende de cuántos patrones haya
+        if self.word_indices:
+            words = self._live(self.token_index.find_patterns_info(text))
+            if self.delta_indices:
+                words.update(self.delta_token_index.find_patterns_info(text))
+            for index, result in words.items():
+                result['algorithm_analysis'] = self.compiled_patterns[index].analysis
+                result['algorithm_used'] = self.token_index.name
+                result['selection_reason'] = 'Coincidencia de palabras completas por tokens'
+                found[index] = result
+
+        for index in sorted(found):
+            yield self.patterns[index], found[index]
+
+    def _search_substrings(self, text, candidates=None):
+        """
+        Busca los patrones de subcadena con el motor configurado.
+
+        Args:
+            text (PreparedText): El texto ya normalizado
+            candidates (list): Índices de patrones que pueden aparecer según el
+                prefiltro (None para buscarlos todos)
+
+        Returns:
+            dict: Resultados encontrados por índice de patrón
+        """
+        found = {}
+        if candidates is not None and not candidates:
+            # Ningún patrón comparte sus q-gramas con el texto
+            return found
+
+        if self.engine == 'aho-corasick':
+            # Una sola pasada sobre el texto para todo el conjunto de patrones
+            found = self._live(self.automaton.find_patterns_info(text))
+            if self.delta_indices:
+                found.update(self.delta_automaton.find_patterns_info(text))
+            for index, result in found.items():
+                result['algorithm_analysis'] = self.compiled_patterns[index].analysis
+                result['algorithm_used'] = self.automaton.name
+                result['selection_reason'] = 'Búsqueda multipatrón en una sola pasada'
+
+            # Los patrones con errores permitidos se buscan con el motor aproximado
+            allowed = None if candidates is None else set(candidates)
+            for index in self._approximate():
+                if allowed is None or index in allowed:
+                    result = self.selector.search_pattern(text, self.compiled_patterns[index])
+                    if result['found']:
+                        found[index] = result
+        else:
+            indices = range(len(self.patterns)) if candidates is None else candidates
+            for index in indices:
+                compiled = self.compiled_patterns[index]
+                if compiled is None or index in self.word_indices:
+                    continue
+
+                # Buscar el patrón precompilado en el texto
+                result = self.selector.search_pattern(text, compiled)
+                if result['found']:
+                    found[index] = result
+
+        return found
+
+    def iter_severity_matches(self, text, allowed=None):
+        """
+        Busca los patrones de mayor a menor severidad, entregando las
+        coincidencias a medida que aparecen.
+
+        Args:
+            text (PreparedText): El texto ya normalizado
+            allowed (set): Índices de patrones de subcadena que pueden aparecer
+                según el prefiltro (None para buscarlos todos)
+
+        Yields:
+            tuple: (severidad, número de coincidencias)
+        """
+        normalized = text.normalized
+        overridden = self.overridden
+        tiers = {tier['severity']: tier for tier in self.severity_tiers}
+        delta_counts = self._delta_counts(text, allowed)
+
+        for severity in sorted(SEVERITY_WEIGHTS, key=SEVERITY_WEIGHTS.get, reverse=True):
+            tier = tiers.get(severity)
+            if tier is not None:
+                substring = [
+                    index for index in tier['substring']
+                    if (allowed is None or index in allowed) and index not in overridden
+                ]
+
+                if substring and self.engine == 'aho-corasick':
+                    for index, _ in tier['automaton'].iter_matches(normalized):
+                        if index not in overridden:
+                            yield severity, 1
+
+                    for index in tier['approximate']:
+                        if (allowed is None or index in allowed) and index not in overridden:
+                            yield severity, self.selector.search_pattern(text, self.compiled_patterns[index])['total_matches']
+                else:
+                    for index in substring:
+                        yield severity, self.selector.search_pattern(text, self.compiled_patterns[index])['total_matches']
+
+                for index, matches in tier['token_index'].scan(normalized).items():
+                    if index not in overridden:
+                        yield severity, len(matches)
+
+            if delta_counts.get(severity):
+                yield severity, delta_counts[severity]
+
+    def _delta_counts(self, text, allowed=None):
+        """
+        Cuenta las coincidencias de los patrones del delta por severidad.
+
+        Args:
+            text (PreparedText): El texto ya normalizado
+            allowed (set): Índices de patrones de subcadena que pueden aparecer
+                según el prefiltro (None para buscarlos todos)
+
+        Returns:
+            dict: Número de coincidencias por severidad
+        """
+        counts = {}
+        if not self.delta_indices:
+            return counts
+
+        def add(index, count):
+            severity = self.patterns[index]['severity']
+            counts[severity] = counts.get(severity, 0) + count
+
+        normalized = text.normalized
+        if self.engine == 'aho-corasick':
+            for index, starts in self.delta_automaton.scan(normalized).items():
+                add(index, len(starts))
+            remaining = self.delta_approximate
+        else:
+            remaining = [index for index in self.delta_indices if index not in self.word_indices]
+
+        for index in remaining:
+            if allowed is None or index in allowed:
+                add(index, self.selector.search_pattern(text, self.compiled_patterns[index])['total_matches'])
+
+        for index, matches in self.delta_token_index.scan(normalized).items():
+            add(index, len(matches))
+
+        return counts
+
+    def _approximate(self):
+        """
+        Returns:
+            list: Índices de los patrones aproximados vigentes (base y delta)
+        """
+        if not self.delta_indices and not self.overridden:
+            return self.approximate_indices
+        return [
+            index for index in self.approximate_indices if index not in self.overridden
+        ] + list(self.delta_approximate)
+
+    def scan_matches(self, normalized, candidates=None):
+        """
+        Busca todos los patrones en un texto ya normalizado y devuelve las
+        coincidencias en bruto, sin construir posiciones originales ni contexto.
+
+        Args:
+            normalized (str): El texto normalizado
+            candidates (list): Índices de patrones que pueden aparecer según el
+                prefiltro (None para buscarlos todos)
+
+        Returns:
+            dict: {índice de patrón: [(inicio, longitud, distancia de edición), ...]}
+                en el texto normalizado
+        """
+        found = {}
+
+        if candidates is None or candidates:
+            allowed = None if candidates is None else set(candidates)
+
+            if self.engine == 'aho-corasick':
+                found = self._live(self.automaton.scan(normalized))
+                if self.delta_indices:
+                    found.update(self.delta_automaton.scan(normalized))
+                found = {
+                    index: [(start, len(self.normalized[index]), 0) for start in starts]
+                    for index, starts in found.items()
+                }
+                remaining = self._approximate()
+            else:
+                remaining = range(len(self.patterns))
+
+            for index in remaining:
+                compiled = self.compiled_patterns[index]
+                if compiled is None or index in self.word_indices or (allowed is not None and index not in allowed):
+                    continue
+
+                algorithm, _ = self.selector.select_algorithm(compiled)
+                matches = algorithm.scan(normalized, compiled)
+                if matches and algorithm is not self.selector.approximate:
+                    matches = [(start, len(compiled.normalized), 0) for start in matches]
+                if matches:
+                    found[index] = matches
+
+        words = self._live(self.token_index.scan(normalized))
+        if self.delta_indices:
+            words.update(self.delta_token_index.scan(normalized))
+        for index, matches in words.items():
+            found[index] = [(start, length, 0) for start, length in matches]
+
+        return found
@@ -0,0 +1,136 @@
+"""
+Instantánea precompilada de los patrones guardada en disco.
+Junto al CSV se escribe un archivo binario con la instantánea ya compilada
+(patrones normalizados, autómatas, índices y prefiltro). En el siguiente
+arranque se lee y se deserializa en lugar de volver a interpretar el CSV y
+compilarlo todo; solo se reconstruye cuando cambia el hash del CSV, la
+calibración del selector o el código del paquete algorithms (las clases y
+tablas guardadas dependen de él).
+
+El archivo es un pickle: solo debe cargarse si lo escribió esta aplicación.
+"""
+
+import glob
+import hashlib
+import os
+import pickle
+from .snapshot import PatternSnapshot
+
+MAGIC = b'SAFETEXT-SNAPSHOT'
+
+
+def code_version():
+    """
+    Calcula un hash del código fuente del paquete algorithms, para descartar
+    instantáneas escritas por otra versión del código sin tener que acordarse
+    de subir un número de versión a mano.
+
+    Returns:
+        str: Hash en hexadecimal
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for path in sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), '*.py'))):
+        digest.update(os.path.basename(path).encode('utf-8'))
+        with open(path, 'rb') as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+CODE_VERSION = code_version()
+
+
+def snapshot_path(patterns_file):
+    """
+    Args:
+        patterns_file (str): Ruta del CSV de patrones
+
+    Returns:
+        str: Ruta de la instantánea precompilada de ese CSV
+    """
+    return patterns_file + '.snapshot'
+
+
+def source_digest(patterns_file, options):
+    """
+    Calcula el hash del CSV junto con las opciones de compilación.
+
+    Args:
+        patterns_file (str): Ruta del CSV de patrones
+        options (tuple): Opciones que cambian la instantánea (motor, plegado, ...);
+            también entra CODE_VERSION
+
+    Returns:
+        str: Hash en hexadecimal, o None si el CSV no existe
+    """
+    digest = hashlib.blake2b(repr((CODE_VERSION, options)).encode('utf-8'), digest_size=16)
+    try:
+        with open(patterns_file, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b''):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def _header(digest):
+    return b'%s %s\n' % (MAGIC, digest.encode('ascii'))
+
+
+def save_snapshot(snapshot, path, digest):
+    """
+    Guarda la instantánea en disco. Se escribe en un archivo temporal y se
+    renombra, así que nadie llega a leer un archivo a medio escribir.
+
+    Args:
+        snapshot (PatternSnapshot): La instantánea compilada
+        path (str): Ruta del archivo
+        digest (str): Hash del CSV del que sale la instantánea
+    """
+    # El selector no se guarda: al cargar se usa el del analizador
+    state = dict(vars(snapshot))
+    del state['selector']
+
+    temporary = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(temporary, 'wb') as file:
+            file.write(_header(digest))
+            pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+    except OSError as e:
+        print(f"Error al guardar la instantánea de patrones: {e}")
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+
+
+def load_snapshot(path, digest, selector):
+    """
+    Carga la instantánea guardada si corresponde al CSV actual.
+
+    Args:
+        path (str): Ruta del archivo
+        digest (str): Hash del CSV actual
+        selector (AlgorithmSelector): Selector del analizador
+
+    Returns:
+        PatternSnapshot: La instantánea, o None si no existe, es de otro CSV
+            o de otra versión del código
+    """
+    if not os.path.exists(path):
+        return None
+
+    header = _header(digest)
+    try:
+        with open(path, 'rb') as file:
+            if file.read(len(header)) != header:
+                return None
+            state = pickle.loads(file.read())
+    except (OSError, ValueError, EOFError, pickle.UnpicklingError, AttributeError, ImportError) as e:
+        print(f"No se pudo cargar la instantánea de patrones: {e}")
+        return None
+
+    snapshot = PatternSnapshot.__new__(PatternSnapshot)
+    snapshot.__dict__.update(state)
+    snapshot.selector = selector
+    return snapshot
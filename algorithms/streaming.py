@@ -0,0 +1,211 @@
+"""
+Análisis en flujo de documentos grandes.
+El texto llega por bloques y se analiza por ventanas que se solapan lo
+suficiente para no perder coincidencias en las fronteras, de modo que la
+memoria no depende del tamaño del documento y los primeros hallazgos se
+entregan antes de terminar de recibirlo.
+"""
+
+from .prepared_text import PreparedText
+from .token_index import TOKEN
+
+# Caracteres (del texto normalizado) que se analizan por ventana
+DEFAULT_WINDOW_SIZE = 65536
+
+# Caracteres de contexto a cada lado de una coincidencia (como en pattern_info)
+CONTEXT = 10
+
+# Separación máxima entre dos palabras de una frase que se conserva entre
+# ventanas; acota el texto arrastrado aunque el documento no tenga espacios
+MAX_WORD_GAP = 64
+
+class StreamingAnalyzer:
+    def __init__(self, analyzer, window_size=DEFAULT_WINDOW_SIZE):
+        """
+        Args:
+            analyzer (CyberbullyingAnalyzer): Analizador con los patrones cargados
+            window_size (int): Caracteres que se acumulan antes de analizar una ventana
+        """
+        self.analyzer = analyzer
+        self.window_size = window_size
+
+    def _margins(self, snapshot):
+        """
+        Calcula cuánto texto normalizado hay que conservar entre ventanas.
+
+        Args:
+            snapshot (PatternSnapshot): Patrones con los que se analiza
+
+        Returns:
+            tuple: (margen derecho, solape izquierdo, solape máximo de frases).
+                Una coincidencia solo se informa si termina antes del margen
+                derecho, para que el motor haya visto lo que viene después (fin
+                de palabra, coincidencias aproximadas más largas); la ventana
+                siguiente empieza lo bastante atrás para contener entera
+                cualquier coincidencia que termine después. Las frases de
+                palabra completa se conservan hasta el tercer valor, su
+                longitud con hasta MAX_WORD_GAP caracteres entre palabras.
+        """
+        longest = 0
+        max_errors = 0
+        phrase = 0
+        for index, compiled in enumerate(snapshot.compiled_patterns):
+            if compiled is None:
+                continue
+            longest = max(longest, len(compiled.normalized) + compiled.max_errors)
+            max_errors = max(max_errors, compiled.max_errors)
+            if index in snapshot.word_indices:
+                words = len(TOKEN.findall(compiled.normalized))
+                phrase = max(phrase, len(compiled.normalized) + max(0, words - 1) * MAX_WORD_GAP)
+
+        right = 2 * max_errors + 1 + CONTEXT
+        left = longest + CONTEXT
+        return right, left, max(left, phrase + CONTEXT)
+
+    def analyze_chunks(self, chunks):
+        """
+        Analiza un texto que llega por bloques.
+
+        Args:
+            chunks (iterable): Bloques de texto (str) en orden
+
+        Yields:
+            dict: Eventos del análisis:
+                {'type': 'matches', ...} con las coincidencias de cada ventana,
+                {'type': 'progress', ...} con los conteos acumulados, y al final
+                {'type': 'summary', ...} con el mismo resumen que analyze_text
+        """
+        analyzer = self.analyzer
+        # Todo el documento se analiza con la misma instantánea de patrones,
+        # aunque haya una recarga mientras llega
+        snapshot = analyzer.snapshot
+        right, left, phrase = self._margins(snapshot)
+        word_patterns = snapshot.max_word_tokens
+
+        severity_counts = {'Low': 0, 'Medium': 0, 'High': 0, 'Critical': 0}
+        category_counts = {}
+        patterns_found = set()
+
+        carry = ''
+        base = 0      # Posición absoluta (en el original) del inicio de la ventana
+        reported = 0  # Las coincidencias que terminan antes de aquí ya se informaron
+        processed = 0
+
+        pending = []
+        pending_size = 0
+        for chunk, final in self._with_final(chunks):
+            pending.append(chunk)
+            pending_size += len(chunk)
+            processed += len(chunk)
+            if not final and len(carry) + pending_size < self.window_size:
+                continue
+
+            window = carry + ''.join(pending)
+            pending = []
+            pending_size = 0
+            prepared = PreparedText(window, fold=snapshot.fold)
+            normalized = prepared.normalized
+
+            if final:
+                boundary = len(normalized)
+            else:
+                boundary = len(normalized) - right
+                if boundary <= left:
+                    # Ventana demasiado corta: se espera al siguiente bloque
+                    carry = window
+                    continue
+
+            found = snapshot.scan_matches(normalized, snapshot.candidates(normalized))
+
+            matches = []
+            for index in sorted(found):
+                pattern_info = snapshot.patterns[index]
+                for start, length, distance in found[index]:
+                    # Cada coincidencia la informa la ventana en la que termina
+                    end = start + length - 1
+                    absolute_end = base + prepared.to_original(end)
+                    if end >= boundary or absolute_end < reported:
+                        continue
+
+                    span_start, span_end = prepared.span(start, length)
+                    match = {
+                        'pattern_id': pattern_info['id'],
+                        'pattern': pattern_info['pattern'],
+                        'category': pattern_info['category'],
+                        'severity': pattern_info['severity'],
+                        'position': base + span_start,
+                        'context': window[max(0, span_start - CONTEXT):span_end + CONTEXT]
+                    }
+                    if distance:
+                        match['edit_distance'] = distance
+                    matches.append(match)
+
+                    patterns_found.add(index)
+                    severity_counts[pattern_info['severity']] += 1
+                    category = pattern_info['category']
+                    category_counts[category] = category_counts.get(category, 0) + 1
+
+            if matches:
+                matches.sort(key=lambda match: match['position'])
+                yield {'type': 'matches', 'matches': matches}
+
+            if final:
+                break
+
+            # La siguiente ventana empieza lo bastante atrás para contener
+            # cualquier coincidencia que termine a partir de la frontera
+            next_start = boundary - left
+            if word_patterns:
+                # Una frase puede separar sus palabras con cualquier cantidad
+                # de espacios: se conservan sus posibles primeras palabras, sin
+                # arrastrar más que la frase más larga (un texto sin separadores
+                # es un único token y no debe crecer con el documento)
+                limit = boundary - phrase
+                starts = [token.start() for token in TOKEN.finditer(normalized, max(0, limit), boundary)]
+                if starts:
+                    word_start = starts[max(0, len(starts) - word_patterns)] - 1
+                    next_start = min(next_start, max(limit, word_start))
+            next_start = max(0, next_start)
+
+            reported = base + prepared.to_original(boundary)
+            carry_start = prepared.to_original(next_start)
+            carry = window[carry_start:]
+            base += carry_start
+
+            yield {
+                'type': 'progress',
+                'chars_processed': reported,
+                'total_matches': sum(severity_counts.values()),
+                'severity_summary': dict(severity_counts),
+                'category_summary': dict(category_counts)
+            }
+
+        total_matches = sum(severity_counts.values())
+        risk_level = analyzer._calculate_risk_level(severity_counts, total_matches)
+        yield {
+            'type': 'summary',
+            'text_length': processed,
+            'total_patterns_found': len(patterns_found),
+            'total_matches': total_matches,
+            'severity_summary': severity_counts,
+            'category_summary': category_counts,
+            'is_cyberbullying': total_matches > 0,
+            'risk_level': risk_level
+        }
+
+    def _with_final(self, chunks):
+        """
+        Recorre los bloques indicando cuál es el último.
+
+        Args:
+            chunks (iterable): Bloques de texto (str)
+
+        Yields:
+            tuple: (bloque, es_el_último)
+        """
+        previous = None
+        for chunk in chunks:
+            if previous is not None:
+                yield previous, False
+            previous = chunk
+        yield previous or '', True
@@ -0,0 +1,113 @@
+"""
+Implementación del algoritmo Sunday (Quick Search) para búsqueda de patrones.
+Decide el desplazamiento con el carácter que sigue a la ventana actual.
+"""
+
+from .compiled import as_compiled
+from .prepared_text import as_prepared
+
+class SundayAlgorithm:
+    def __init__(self):
+        self.name = "Sunday (Quick Search)"
+        self.best_for = "Patrones cortos y medianos con pocos caracteres repetidos"
+    
+    def shift_table(self, pattern):
+        """
+        Construye la tabla de desplazamientos de Sunday.
+        
+        Args:
+            pattern (str): El patrón de búsqueda
+            
+        Returns:
+            dict: Desplazamiento por carácter (m + 1 para los que no aparecen)
+        """
+        m = len(pattern)
+        table = {}
+        
+        # Distancia desde la última aparición de cada carácter hasta
+        # la posición siguiente a la ventana
+        for i in range(m):
+            table[pattern[i]] = m - i
+        
+        return table
+    
+    def preprocess(self, pattern):
+        """
+        Preprocesamiento reutilizable del patrón (ver CompiledPattern).
+        
+        Args:
+            pattern (str): El patrón en minúsculas
+            
+        Returns:
+            dict: Tabla de desplazamientos
+        """
+        return self.shift_table(pattern)
+    
+    def search(self, text, pattern):
+        """
+        Busca todas las ocurrencias del patrón en el texto usando Sunday.
+        
+        Args:
+            text (str | PreparedText): El texto donde buscar
+            pattern (str | CompiledPattern): El patrón a buscar
+            
+        Returns:
+            list: Lista de posiciones (en el texto original) donde se encontró el patrón
+        """
+        if not pattern or not text:
+            return []
+        
+        prepared = as_prepared(text)
+        return [prepared.to_original(pos) for pos in self.scan(prepared.normalized, as_compiled(pattern))]
+    
+    def scan(self, text, compiled):
+        """
+        Recorre el texto ya normalizado buscando el patrón compilado.
+        
+        Args:
+            text (str): El texto normalizado (en minúsculas)
+            compiled (CompiledPattern): El patrón compilado
+            
+        Returns:
+            list: Lista de posiciones en el texto normalizado
+        """
+        pattern = compiled.normalized
+        
+        n = len(text)
+        m = len(pattern)
+        
+        if not m or m > n:
+            return []
+        
+        shift = compiled.tables(self)
+        
+        matches = []
+        i = 0  # Posición en el texto
+        
+        while i <= n - m:
+            if text.startswith(pattern, i):
+                matches.append(i)
+            
+            # El carácter siguiente a la ventana decide el salto
+            if i + m >= n:
+                break
+            i += shift.get(text[i + m], m + 1)
+        
+        return matches
+    
+    def find_pattern_info(self, text, pattern):
+        """
+        Encuentra información detallada sobre las ocurrencias del patrón.
+        
+        Args:
+            text (str | PreparedText): El texto donde buscar
+            pattern (str | CompiledPattern): El patrón a buscar
+            
+        Returns:
+            dict: Información detallada de las coincidencias
+        """
+        prepared = as_prepared(text)
+        compiled = as_compiled(pattern)
+        matches = self.scan(prepared.normalized, compiled)
+        
+        return prepared.pattern_info(self.name, compiled.pattern, len(compiled.normalized), matches)
@@ -0,0 +1,133 @@
+"""
+Índice hash de n-gramas de tokens para patrones de palabra completa.
+Tokeniza el texto una sola vez y busca cada ventana de 1..N tokens en un
+diccionario indexado por la tupla de tokens del patrón, de modo que "feo" no
+coincide dentro de "feote" y el costo depende del número de tokens del texto,
+no del número de patrones cargados.
+"""
+
+import re
+from .prepared_text import as_prepared
+
+# Un token es una secuencia de letras, dígitos o guiones bajos
+TOKEN = re.compile(r'\w+')
+
+class TokenNgramIndex:
+    def __init__(self):
+        self.name = "Índice de n-gramas de tokens"
+        self.best_for = "Palabras y frases completas, con cualquier cantidad de patrones"
+        self.patterns = []
+        self.index = {}
+        self.prefixes = set()
+        self.max_tokens = 0
+
+    def tokenize(self, text):
+        """
+        Divide el texto en tokens.
+
+        Args:
+            text (str): Texto normalizado
+
+        Returns:
+            list: Tokens del texto (str)
+        """
+        return TOKEN.findall(text)
+
+    def build(self, patterns, normalized=None):
+        """
+        Indexa cada patrón por la tupla de sus tokens.
+
+        Args:
+            patterns (list): Lista de patrones (str). Los patrones vacíos o sin
+                tokens se ignoran, pero conservan su índice.
+            normalized (list): Forma normalizada de cada patrón, la que se
+                compara con el texto (por defecto, en minúsculas)
+        """
+        self.patterns = [pattern or '' for pattern in patterns]
+        if normalized is None:
+            normalized = [pattern.lower() for pattern in self.patterns]
+        self.index = {}
+        self.prefixes = set()
+        self.max_tokens = 0
+
+        for index, pattern in enumerate(normalized):
+            if not self.patterns[index]:
+                continue
+            tokens = tuple(self.tokenize(pattern))
+            if not tokens:
+                continue
+
+            self.index.setdefault(tokens, []).append(index)
+            self.max_tokens = max(self.max_tokens, len(tokens))
+
+            # Los prefijos permiten cortar la ventana en cuanto deja de
+            # coincidir con algún patrón
+            for size in range(1, len(tokens) + 1):
+                self.prefixes.add(tokens[:size])
+
+    def indexed(self):
+        """
+        Obtiene los índices de los patrones que quedaron en el índice.
+
+        Returns:
+            set: Índices de patrones indexados
+        """
+        return {index for indices in self.index.values() for index in indices}
+
+    def scan(self, normalized_text):
+        """
+        Recorre las ventanas de tokens del texto ya normalizado.
+
+        Args:
+            normalized_text (str): El texto normalizado
+
+        Returns:
+            dict: {índice de patrón: [(inicio, longitud), ...]} en el texto normalizado
+        """
+        found = {}
+        if not self.index or not normalized_text:
+            return found
+
+        spans = [(token.start(), token.end()) for token in TOKEN.finditer(normalized_text)]
+        tokens = [normalized_text[start:end] for start, end in spans]
+        index = self.index
+        prefixes = self.prefixes
+        max_tokens = self.max_tokens
+
+        for i in range(len(tokens)):
+            start = spans[i][0]
+            for j in range(i + 1, min(i + max_tokens, len(tokens)) + 1):
+                window = tuple(tokens[i:j])
+                if window not in prefixes:
+                    break
+                for pattern_index in index.get(window, ()):
+                    # La coincidencia cubre desde el primer token hasta el último,
+                    # con los separadores que tenga el texto
+                    found.setdefault(pattern_index, []).append((start, spans[j - 1][1] - start))
+
+        return found
+
+    def find_patterns_info(self, text):
+        """
+        Encuentra información detallada de todos los patrones presentes en el texto.
+
+        Args:
+            text (str | PreparedText): El texto donde buscar
+
+        Returns:
+            dict: Información por índice de patrón, con el mismo formato que
+                find_pattern_info de KMP y Boyer-Moore
+        """
+        prepared = as_prepared(text)
+
+        results = {}
+        for index, matches in self.scan(prepared.normalized).items():
+            pattern = self.patterns[index]
+            results[index] = prepared.pattern_info(
+                self.name,
+                pattern,
+                len(pattern),
+                [start for start, _ in matches],
+                lengths=[length for _, length in matches]
+            )
+        return results
@@ -0,0 +1,184 @@
+"""
+Implementación del algoritmo Two-Way (Crochemore-Perrin) para búsqueda de patrones.
+Divide el patrón en su factorización crítica y garantiza tiempo lineal
+con memoria constante, incluso con textos muy repetitivos.
+"""
+
+from .compiled import as_compiled
+from .prepared_text import as_prepared
+
+class TwoWayAlgorithm:
+    def __init__(self):
+        self.name = "Two-Way (Crochemore-Perrin)"
+        self.best_for = "Patrones largos o periódicos en textos adversos"
+    
+    def maximal_suffix(self, pattern, reverse=False):
+        """
+        Calcula el sufijo máximo del patrón para un orden del alfabeto.
+        
+        Args:
+            pattern (str): El patrón
+            reverse (bool): Usar el orden inverso del alfabeto
+            
+        Returns:
+            tuple: (posición anterior al inicio del sufijo máximo, su periodo)
+        """
+        m = len(pattern)
+        ms = -1
+        j = 0
+        k = 1
+        period = 1
+        
+        while j + k < m:
+            a = pattern[j + k]
+            b = pattern[ms + k]
+            if (a > b) if reverse else (a < b):
+                j += k
+                k = 1
+                period = j - ms
+            elif a == b:
+                if k != period:
+                    k += 1
+                else:
+                    j += period
+                    k = 1
+            else:
+                ms = j
+                j = ms + 1
+                k = 1
+                period = 1
+        
+        return ms, period
+    
+    def critical_factorization(self, pattern):
+        """
+        Obtiene la factorización crítica del patrón.
+        
+        Args:
+            pattern (str): El patrón de búsqueda
+            
+        Returns:
+            tuple: (ell, periodo, es_periódico) donde el patrón se divide en
+                pattern[:ell + 1] y pattern[ell + 1:]
+        """
+        i, p = self.maximal_suffix(pattern)
+        j, q = self.maximal_suffix(pattern, reverse=True)
+        
+        if i > j:
+            ell, period = i, p
+        else:
+            ell, period = j, q
+        
+        # El prefijo izquierdo se repite con el periodo: el patrón es periódico
+        if pattern[:ell + 1] == pattern[period:period + ell + 1]:
+            return ell, period, True
+        
+        return ell, max(ell + 1, len(pattern) - ell - 1) + 1, False
+    
+    def preprocess(self, pattern):
+        """
+        Preprocesamiento reutilizable del patrón (ver CompiledPattern).
+        
+        Args:
+            pattern (str): El patrón en minúsculas
+            
+        Returns:
+            tuple: Factorización crítica (ell, periodo, es_periódico)
+        """
+        return self.critical_factorization(pattern)
+    
+    def search(self, text, pattern):
+        """
+        Busca todas las ocurrencias del patrón en el texto usando Two-Way.
+        
+        Args:
+            text (str | PreparedText): El texto donde buscar
+            pattern (str | CompiledPattern): El patrón a buscar
+            
+        Returns:
+            list: Lista de posiciones (en el texto original) donde se encontró el patrón
+        """
+        if not pattern or not text:
+            return []
+        
+        prepared = as_prepared(text)
+        return [prepared.to_original(pos) for pos in self.scan(prepared.normalized, as_compiled(pattern))]
+    
+    def scan(self, text, compiled):
+        """
+        Recorre el texto ya normalizado buscando el patrón compilado.
+        
+        Args:
+            text (str): El texto normalizado (en minúsculas)
+            compiled (CompiledPattern): El patrón compilado
+            
+        Returns:
+            list: Lista de posiciones en el texto normalizado
+        """
+        pattern = compiled.normalized
+        
+        n = len(text)
+        m = len(pattern)
+        
+        if not m or m > n:
+            return []
+        
+        ell, period, periodic = compiled.tables(self)
+        
+        matches = []
+        j = 0  # Posición de la ventana en el texto
+        
+        if periodic:
+            memory = -1  # Prefijo ya verificado en la ventana anterior
+            while j <= n - m:
+                # Mitad derecha, de izquierda a derecha
+                i = max(ell, memory) + 1
+                while i < m and pattern[i] == text[i + j]:
+                    i += 1
+                
+                if i >= m:
+                    # Mitad izquierda, de derecha a izquierda
+                    i = ell
+                    while i > memory and pattern[i] == text[i + j]:
+                        i -= 1
+                    if i <= memory:
+                        matches.append(j)
+                    j += period
+                    memory = m - period - 1
+                else:
+                    j += i - ell
+                    memory = -1
+        else:
+            while j <= n - m:
+                i = ell + 1
+                while i < m and pattern[i] == text[i + j]:
+                    i += 1
+                
+                if i >= m:
+                    i = ell
+                    while i >= 0 and pattern[i] == text[i + j]:
+                        i -= 1
+                    if i < 0:
+                        matches.append(j)
+                    j += period
+                else:
+                    j += i - ell
+        
+        return matches
+    
+    def find_pattern_info(self, text, pattern):
+        """
+        Encuentra información detallada sobre las ocurrencias del patrón.
+        
+        Args:
+            text (str | PreparedText): El texto donde buscar
+            pattern (str | CompiledPattern): El patrón a buscar
+            
+        Returns:
+            dict: Información detallada de las coincidencias
+        """
+        prepared = as_prepared(text)
+        compiled = as_compiled(pattern)
+        matches = self.scan(prepared.normalized, compiled)
+        
+        return prepared.pattern_info(self.name, compiled.pattern, len(compiled.normalized), matches)
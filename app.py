@@ -3,19 +3,31 @@ API Flask para el sistema de detección de ciberacoso.
 Conecta el frontend con los algoritmos de backend.
 """
 
-from flask import Flask, request, jsonify, render_template, send_from_directory
+from flask import Flask, Response, g, request, jsonify, render_template, send_from_directory, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import os
 import csv
+import codecs
+import hashlib
+import json
 import sys
+import threading
 import time
+from array import array
 from datetime import datetime
 from werkzeug.utils import secure_filename
 # Agregar el directorio actual al path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from algorithms.analyzer import CyberbullyingAnalyzer
+from algorithms.analyzer import CyberbullyingAnalyzer, SEVERITY_WEIGHTS
 from algorithms.selector import AlgorithmSelector
+from algorithms.batch import BatchAnalyzer
+from algorithms.streaming import StreamingAnalyzer
+from algorithms.pattern_sync import PatternVersionFile
+from algorithms.metrics import MetricsRegistry, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from algorithms.instrumentation import OperationCounters
+from algorithms.profiler import RequestProfiler
 from recommendations_engine import get_recommendations_for_analysis
 ##Comentario Harry
 
@@ -24,9 +36,23 @@ BASE_FILE = 'patrones_combinado.csv'  # Usar el archivo combinado como base
 ALLOWED_EXTENSIONS = {'csv', 'txt'}
 MAX_FILES = 5
 TIEMPO_MAXIMO = 86400
+MAX_BATCH_TEXTS = 10000
+STREAM_READ_SIZE = 65536  # Bytes leídos del cuerpo por bloque en /api/analyze-stream
+
+class SafeTextJSONProvider(DefaultJSONProvider):
+    """
+    Serializador JSON que además admite los array('i') de posiciones
+    devueltos en modo compacto.
+    """
+    @staticmethod
+    def default(o):
+        if isinstance(o, array):
+            return o.tolist()
+        return DefaultJSONProvider.default(o)
 
 # Crear la instancia de Flask
 app = Flask(__name__)
+app.json = SafeTextJSONProvider(app)
 CORS(app)  # habilitar CORS si lo necesitas
 
 if not os.path.exists(UPLOAD_FOLDER):
@@ -47,7 +73,7 @@ def generar_archivo_combinado():
         print("[WARNING] No se encontraron patrones para generar archivo combinado")
         return
 
-    fieldnames = ['id', 'frase', 'categorias', 'nivel_gravedad', 'descripcion']
+    fieldnames = ['id', 'frase', 'categorias', 'nivel_gravedad', 'descripcion', 'max_errores', 'modo']
     severity_map = {
         'Muy Alto': 90,
         'Alto': 70,
@@ -66,7 +92,9 @@ def generar_archivo_combinado():
                 'frase': p.get('pattern', ''),
                 'categorias': p.get('category', ''),
                 'nivel_gravedad': sev_num,
-                'descripcion': p.get('description', '')
+                'descripcion': p.get('description', ''),
+                'max_errores': p.get('max_errors', 0),
+                'modo': p.get('mode', 'subcadena')
             })
     print(f"[INFO] Archivo combinado generado con {len(patrones)} patrones.")
 
@@ -115,7 +143,7 @@ PATRONES_RESPALDO = [
     {'id': '10', 'pattern': 'eres un perdedor', 'category': 'desprecio', 'severity': 'Alto', 'description': 'Desprecio general'}
 ]
 
-def cargar_todos_los_patrones():
+def leer_todos_los_patrones():
     patrones_dict = {}  # clave: texto normalizado, valor: patrón con más gravedad
     
     print(f"[DEBUG] Intentando cargar patrones...")
@@ -132,6 +160,10 @@ def cargar_todos_los_patrones():
             gravedad_num = int(gravedad_valor)
         except:
             gravedad_num = 0
+        try:
+            max_errores = max(0, int(row.get('max_errores') or 0))
+        except ValueError:
+            max_errores = 0
 
         nuevo_patron = {
             'id': row.get('id', ''),
@@ -139,7 +171,9 @@ def cargar_todos_los_patrones():
             'category': row.get('categorias') or row.get('categoria', ''),
             'severity': map_severity(gravedad_valor),
             'severity_num': gravedad_num,  # campo auxiliar para comparar
-            'description': row.get('descripcion') or row.get('etiqueta', '')
+            'description': row.get('descripcion') or row.get('etiqueta', ''),
+            'max_errors': max_errores,
+            'mode': 'palabra' if (row.get('modo') or '').strip().lower() == 'palabra' else 'subcadena'
         }
 
         # Mantener solo el de mayor gravedad
@@ -196,6 +230,57 @@ def cargar_todos_los_patrones():
     return patrones_final
 
 
+# Última lista de patrones leída, con la firma de los archivos de origen
+_patrones_cache = {'firma': None, 'patrones': None, 'etag': None}
+_patrones_lock = threading.Lock()
+
+def firma_archivos_patrones():
+    """
+    Obtiene la firma (ruta, fecha de modificación y tamaño) de los archivos
+    de los que salen los patrones: el archivo base y los subidos.
+    """
+    rutas = [BASE_FILE]
+    if os.path.exists(UPLOAD_FOLDER):
+        rutas += sorted(
+            os.path.join(UPLOAD_FOLDER, archivo) for archivo in os.listdir(UPLOAD_FOLDER)
+            if allowed_file(archivo)
+        )
+
+    firma = []
+    for ruta in rutas:
+        try:
+            info = os.stat(ruta)
+        except OSError:
+            continue
+        if os.path.isfile(ruta):
+            firma.append((ruta, info.st_mtime_ns, info.st_size))
+    return tuple(firma)
+
+def cargar_todos_los_patrones_con_etag():
+    """
+    Devuelve los patrones de todos los archivos y su ETag. Los archivos solo
+    se vuelven a leer cuando cambia la firma de alguno de ellos.
+
+    Returns:
+        tuple: (lista de patrones, ETag). La lista es compartida: no modificarla.
+    """
+    firma = firma_archivos_patrones()
+    with _patrones_lock:
+        if _patrones_cache['firma'] != firma:
+            patrones = leer_todos_los_patrones()
+            contenido = json.dumps(patrones, sort_keys=True, ensure_ascii=False)
+            _patrones_cache['firma'] = firma
+            _patrones_cache['patrones'] = patrones
+            _patrones_cache['etag'] = hashlib.blake2b(contenido.encode('utf-8'), digest_size=16).hexdigest()
+        return _patrones_cache['patrones'], _patrones_cache['etag']
+
+def cargar_todos_los_patrones():
+    """
+    Devuelve los patrones de todos los archivos (ver cargar_todos_los_patrones_con_etag).
+    """
+    return cargar_todos_los_patrones_con_etag()[0]
+
+
 def limpiar_archivos():
     ahora = time.time()
     for archivo in os.listdir(UPLOAD_FOLDER):
@@ -271,6 +356,7 @@ def upload_patterns():
             # validar columnasgenerar_archivo_combinado()
             generar_archivo_combinado()
             analyzer.load_patterns()
+            patterns_sync.publish()
 
             return jsonify({'success': True, 'message': f'{filename} subido correctamente.'})
         else:
@@ -294,6 +380,7 @@ def delete_file():
             os.remove(filepath)
             generar_archivo_combinado()
             analyzer.load_patterns()
+            patterns_sync.publish()
 
             return jsonify({'success': True, 'message': f'{filename} eliminado correctamente'})
         else:
@@ -334,8 +421,9 @@ def delete_pattern():
                 writer.writeheader()
                 writer.writerows(nuevos_registros)
 
-            generar_archivo_combinado()
-            analyzer.load_patterns()
+            # Quitar el patrón en memoria sin releer el archivo
+            analyzer.remove_patterns([pattern_id])
+            patterns_sync.publish()
 
             return jsonify({'success': True, 'message': f'Patrón con ID {pattern_id} eliminado correctamente'})
         else:
@@ -345,6 +433,62 @@ def delete_pattern():
         return jsonify({'success': False, 'error': f'Error al eliminar patrón: {str(e)}'}), 500
 
 
+@app.route('/api/update-pattern', methods=['POST'])
+def update_pattern():
+    """
+    Cambia el nivel de gravedad de un patrón en el archivo base y en memoria.
+    Espera un JSON con:
+    {
+        "id": "120",
+        "nivel_gravedad": 80
+    }
+    """
+    try:
+        data = request.get_json()
+        if not data or 'id' not in data or 'nivel_gravedad' not in data:
+            return jsonify({'success': False, 'error': 'Se requieren id y nivel_gravedad'}), 400
+
+        pattern_id = str(data['id'])
+        try:
+            nivel = int(data['nivel_gravedad'])
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'nivel_gravedad debe ser un número entero'}), 400
+        if not 0 <= nivel <= 100:
+            return jsonify({'success': False, 'error': 'nivel_gravedad debe estar entre 0 y 100'}), 400
+
+        # leer y actualizar el CSV
+        registros = []
+        actualizado = False
+        headers = ['id','frase','categorias','nivel_gravedad','descripcion']
+
+        if os.path.exists(BASE_FILE):
+            with open(BASE_FILE, 'r', encoding='utf-8') as f:
+                reader = csv.DictReader(f)
+                headers = reader.fieldnames
+                for row in reader:
+                    if row['id'] == pattern_id:
+                        row['nivel_gravedad'] = str(nivel)
+                        actualizado = True
+                    registros.append(row)
+
+        if actualizado:
+            with open(BASE_FILE, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=headers)
+                writer.writeheader()
+                writer.writerows(registros)
+
+            # Actualizar solo ese patrón en memoria
+            analyzer.update_severity(pattern_id, nivel)
+            patterns_sync.publish()
+
+            return jsonify({'success': True, 'message': f'Patrón con ID {pattern_id} actualizado correctamente'})
+        else:
+            return jsonify({'success': False, 'error': 'No se encontró el patrón a actualizar'}), 404
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'Error al actualizar patrón: {str(e)}'}), 500
+
+
 # Configuración
 app.config['SECRET_KEY'] = 'safetext-cyberbullying-detection-2025'
 
@@ -357,10 +501,88 @@ selector = AlgorithmSelector()
 print("[INIT] Generando archivo combinado...")
 generar_archivo_combinado()
 print("[INIT] Inicializando analizador...")
-analyzer = CyberbullyingAnalyzer(patterns_file=COMBINED_FILE)
-print("[INIT] Cargando patrones...")
-analyzer.load_patterns()
-print(f"[INIT] Patrones cargados en analyzer: {len(analyzer.patterns) if hasattr(analyzer, 'patterns') else 'No disponible'}")
+inicio_carga = time.perf_counter()
+analyzer = CyberbullyingAnalyzer(patterns_file=COMBINED_FILE)  # Carga los patrones una sola vez
+duracion_carga = time.perf_counter() - inicio_carga
+print(f"[INIT] Patrones cargados en analyzer: {len(analyzer.patterns)} "
+      f"(desde {analyzer.loaded_from}, {duracion_carga * 1000:.1f} ms)")
+# Con varios workers, los cambios de patrones de uno se propagan a los demás
+patterns_sync = PatternVersionFile(COMBINED_FILE + '.version', analyzer)
+
+@app.before_request
+def sincronizar_patrones():
+    patterns_sync.check()
+
+# Métricas expuestas en /metrics (formato de Prometheus). Con varios workers,
+# SAFETEXT_METRICS_DIR (ver gunicorn.conf.py) reúne las de todos los procesos
+metrics = MetricsRegistry(os.environ.get('SAFETEXT_METRICS_DIR') or None)
+REQUESTS_TOTAL = metrics.counter(
+    'safetext_http_requests_total', 'Peticiones atendidas por endpoint', ('endpoint', 'method', 'status'))
+STAGE_SECONDS = metrics.histogram(
+    'safetext_analyze_stage_seconds', 'Duración de cada etapa de /api/analyze', labelnames=('stage',))
+TEXT_LENGTH = metrics.histogram(
+    'safetext_analyze_text_chars', 'Longitud de los textos analizados',
+    buckets=(100, 1000, 10000, 100000, 1000000, 10000000))
+MATCHES_PER_REQUEST = metrics.histogram(
+    'safetext_analyze_matches', 'Coincidencias encontradas por análisis',
+    buckets=(0, 1, 2, 5, 10, 25, 50, 100, 250, 1000))
+RELOAD_SECONDS = metrics.histogram(
+    'safetext_pattern_reload_seconds', 'Duración de las cargas de patrones', labelnames=('kind',))
+metrics.gauge('safetext_patterns', 'Patrones cargados', lambda: len(analyzer.patterns))
+metrics.gauge('safetext_patterns_version', 'Versión del conjunto de patrones', lambda: analyzer.patterns_version)
+
+# Conteo de operaciones de KMP y Boyer-Moore (opcional, ver /api/algorithm-stats)
+operation_counters = OperationCounters()
+
+def activar_instrumentacion(activar):
+    counters = operation_counters if activar else None
+    selector.enable_instrumentation(counters)
+    analyzer.selector.enable_instrumentation(counters)
+
+activar_instrumentacion(os.environ.get('SAFETEXT_INSTRUMENT', '').lower() in ('1', 'true', 'yes'))
+
+analyzer.stage_seconds = STAGE_SECONDS
+analyzer.reload_seconds = RELOAD_SECONDS
+RELOAD_SECONDS.observe(duracion_carga, 'completa')
+
+# Perfilado de peticiones con cProfile; /api/profiler solo existe con
+# SAFETEXT_PROFILER_ADMIN porque cambia la configuración de todo el proceso
+profiler = RequestProfiler(
+    sample_rate=float(os.environ.get('SAFETEXT_PROFILE_SAMPLE') or 0),
+    threshold_ms=float(os.environ.get('SAFETEXT_PROFILE_THRESHOLD_MS') or 0)
+)
+PERFILADOR_ADMIN = os.environ.get('SAFETEXT_PROFILER_ADMIN', '').lower() in ('1', 'true', 'yes')
+RUTAS_SIN_PERFIL = {'/api/profiler', '/metrics'}
+
+@app.before_request
+def iniciar_perfil():
+    if profiler.enabled and request.path not in RUTAS_SIN_PERFIL:
+        g.profile_started = time.perf_counter()
+        g.profile = profiler.start()
+
+@app.teardown_request
+def terminar_perfil(exception=None):
+    # teardown_request se ejecuta también cuando la vista lanza una excepción
+    profile = g.pop('profile', None)
+    if profile is not None:
+        profiler.finish(profile, time.perf_counter() - g.profile_started)
+
+@app.after_request
+def contar_peticion(response):
+    endpoint = request.url_rule.rule if request.url_rule else 'desconocido'
+    REQUESTS_TOTAL.inc(endpoint, request.method, str(response.status_code))
+    metrics.changed()
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """
+    Métricas en formato de texto de Prometheus: las de este proceso o, con
+    SAFETEXT_METRICS_DIR, las de todos los workers.
+    """
+    return Response(metrics.render(), content_type=METRICS_CONTENT_TYPE)
+
+batch_analyzer = BatchAnalyzer(analyzer)  # El pool se crea con el primer lote grande
 print("[INIT] Inicialización completada.")
   
             # Cargar patrones desde el archivo combinado
@@ -394,12 +616,48 @@ def serve_static(filename):
     """Sirve archivos estáticos."""
     return send_from_directory('static', filename)
 
+def leer_umbral(data):
+    """
+    Lee el umbral del modo veredicto de una petición.
+    
+    Args:
+        data (dict): Cuerpo JSON de la petición
+        
+    Returns:
+        int: El umbral indicado, o el peso de una coincidencia crítica si no se indicó
+        
+    Raises:
+        ValueError: Si el umbral no es un entero mayor o igual que 1
+    """
+    valor = data.get('threshold')
+    if valor is None:
+        return SEVERITY_WEIGHTS['Critical']
+    if isinstance(valor, bool) or (isinstance(valor, float) and not valor.is_integer()):
+        raise ValueError('threshold debe ser un número entero')
+    try:
+        threshold = int(valor)
+    except (TypeError, ValueError):
+        raise ValueError('threshold debe ser un número entero')
+    if threshold < 1:
+        raise ValueError('threshold debe ser mayor o igual que 1')
+    return threshold
+
 @app.route('/api/analyze', methods=['POST'])
 def analyze_text():
     """
     Analiza un texto para detectar ciberacoso.
+    
+    Request JSON:
+    {
+        "text": "texto a analizar",
+        "compact": true,  (opcional: solo posiciones, sin contexto)
+        "max_details": 20,  (opcional: máximo de matches_detail por patrón)
+        "verdict": true,  (opcional: solo risk_level e is_cyberbullying)
+        "threshold": 15  (opcional, con verdict: puntuación a la que se deja de buscar)
+    }
     """
     try:
+        started = time.perf_counter()
         data = request.get_json()
 
         if not data or 'text' not in data:
@@ -416,13 +674,46 @@ def analyze_text():
                 'error': 'El texto no puede estar vacío'
             }), 400
 
+        if data.get('verdict'):
+            try:
+                threshold = leer_umbral(data)
+            except ValueError as e:
+                return jsonify({
+                    'success': False,
+                    'error': str(e)
+                }), 400
+            
+            STAGE_SECONDS.observe(time.perf_counter() - started, 'parse')
+            TEXT_LENGTH.observe(len(text))
+            return jsonify({
+                'success': True,
+                'result': analyzer.analyze_verdict(text, threshold)
+            })
+
+        compact = bool(data.get('compact', False))
+        try:
+            max_details = data.get('max_details')
+            max_details = None if max_details is None else max(0, int(max_details))
+        except (TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'error': 'max_details debe ser un número entero'
+            }), 400
+
+        STAGE_SECONDS.observe(time.perf_counter() - started, 'parse')
+        TEXT_LENGTH.observe(len(text))
+
         # ✅ Usar directamente el analizador sin recargar patrones
-        result = analyzer.analyze_text(text)
+        result = analyzer.analyze_text(text, compact=compact, max_details=max_details)
+        MATCHES_PER_REQUEST.observe(result.get('total_matches', 0))
 
-        return jsonify({
+        started = time.perf_counter()
+        response = jsonify({
             'success': True,
             'result': result
         })
+        STAGE_SECONDS.observe(time.perf_counter() - started, 'serialize')
+        return response
 
     except Exception as e:
         return jsonify({
@@ -431,6 +722,117 @@ def analyze_text():
         }), 500
 
 
+@app.route('/api/analyze-batch', methods=['POST'])
+def analyze_batch():
+    """
+    Analiza una lista de textos repartiéndola entre varios procesos.
+    
+    Request JSON:
+    {
+        "texts": ["texto 1", "texto 2", ...],
+        "chunk_size": 64,  (opcional: textos por tarea del pool)
+        "verdict": true,  (opcional: solo el veredicto de cada texto)
+        "threshold": 15,  (opcional, con verdict)
+        "compact": true,  (opcional: solo posiciones, sin contexto)
+        "max_details": 20  (opcional: máximo de matches_detail por patrón)
+    }
+    
+    Los resultados se devuelven en el mismo orden que los textos.
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({
+                'success': False,
+                'error': 'Se esperaba un objeto JSON con texts'
+            }), 400
+
+        texts = data.get('texts')
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            return jsonify({
+                'success': False,
+                'error': 'texts debe ser una lista de textos'
+            }), 400
+
+        if len(texts) > MAX_BATCH_TEXTS:
+            return jsonify({
+                'success': False,
+                'error': f'Se admiten como máximo {MAX_BATCH_TEXTS} textos por lote'
+            }), 400
+
+        try:
+            threshold = leer_umbral(data)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+
+        try:
+            chunk_size = int(data.get('chunk_size') or 0) or None
+            max_details = data.get('max_details')
+            max_details = None if max_details is None else max(0, int(max_details))
+        except (TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'error': 'chunk_size y max_details deben ser números enteros'
+            }), 400
+
+        start_time = time.time()
+        results = batch_analyzer.analyze(
+            texts,
+            chunk_size=chunk_size,
+            verdict=bool(data.get('verdict', False)),
+            threshold=threshold,
+            compact=bool(data.get('compact', False)),
+            max_details=max_details
+        )
+
+        return jsonify({
+            'success': True,
+            'total_texts': len(results),
+            'processing_time_ms': round((time.time() - start_time) * 1000, 2),
+            'results': results
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Error en el análisis por lotes: {str(e)}'
+        }), 500
+
+
+@app.route('/api/analyze-stream', methods=['POST'])
+def analyze_stream():
+    """
+    Analiza un documento grande enviado como cuerpo de texto plano (UTF-8),
+    leyéndolo por bloques.
+    
+    La respuesta es NDJSON: un objeto por línea con las coincidencias de cada
+    ventana ("matches"), los conteos acumulados ("progress") y, al final, el
+    resumen completo ("summary").
+    """
+    stream = request.stream
+
+    def read_chunks():
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        while True:
+            data = stream.read(STREAM_READ_SIZE)
+            if not data:
+                break
+            yield decoder.decode(data)
+        yield decoder.decode(b'', final=True)
+
+    def generate():
+        try:
+            for event in StreamingAnalyzer(analyzer).analyze_chunks(read_chunks()):
+                yield json.dumps(event, ensure_ascii=False) + '\n'
+        except Exception as e:
+            yield json.dumps({'type': 'error', 'success': False, 'error': f'Error en el análisis: {str(e)}'}) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
 @app.route('/api/analyze-pattern', methods=['POST'])
 
 def analyze_pattern():
@@ -481,7 +883,9 @@ def search_pattern():
     Request JSON:
     {
         "text": "Texto donde buscar",
-        "pattern": "Patrón a buscar"
+        "pattern": "Patrón a buscar",
+        "algorithm": "KMP",  (opcional: KMP, Boyer-Moore, Horspool, Sunday, Two-Way, Wu-Manber)
+        "max_errors": 1  (opcional: ediciones permitidas, usa Wu-Manber)
     }
     
     Response JSON:
@@ -508,8 +912,23 @@ def search_pattern():
                 'error': 'El texto y el patrón no pueden estar vacíos'
             }), 400
         
+        algorithm = data.get('algorithm')
+        if algorithm and algorithm not in selector.algorithms:
+            return jsonify({
+                'success': False,
+                'error': f'Algoritmo desconocido: {algorithm}'
+            }), 400
+        
+        try:
+            max_errors = int(data.get('max_errors') or 0)
+        except (TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'error': 'max_errors debe ser un número entero'
+            }), 400
+        
         # Buscar el patrón
-        result = selector.search_pattern(text, pattern)
+        result = selector.search_pattern(text, pattern, algorithm, max_errors)
         
         return jsonify({
             'success': True,
@@ -553,22 +972,128 @@ def debug_info():
 @app.route('/api/patterns', methods=['GET'])
 def get_patterns():
     try:
-        print("[API] Llamando a get_patterns")
-        patterns = cargar_todos_los_patrones()
-        print(f"[API] Patrones obtenidos: {len(patterns)}")
-        if len(patterns) > 0:
-            print(f"[API] Primer patrón: {patterns[0]}")
-        return jsonify({'success': True, 'patterns': patterns})
+        patterns, etag = cargar_todos_los_patrones_con_etag()
+
+        # Si el cliente ya tiene esta versión de la lista, responder 304 sin cuerpo
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+        else:
+            response = jsonify({'success': True, 'patterns': patterns})
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
     except Exception as e:
         print(f"[API ERROR] Error al obtener patrones: {str(e)}")
         return jsonify({'success': False, 'error': f'Error al obtener patrones: {str(e)}'}), 500
 
 
+@app.route('/api/algorithm-stats', methods=['GET', 'POST'])
+def algorithm_stats():
+    """
+    Operaciones acumuladas por patrón de KMP y Boyer-Moore (comparaciones,
+    desplazamientos, desplazamiento medio y preprocesamiento).
+    
+    Request JSON (POST, opcional):
+    {
+        "enabled": true,  (activar o desactivar el conteo)
+        "reset": true  (descartar los totales acumulados)
+    }
+    """
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        if 'enabled' in data:
+            activar_instrumentacion(bool(data['enabled']))
+        if data.get('reset'):
+            operation_counters.reset()
+
+    return jsonify({
+        'success': True,
+        'enabled': selector.kmp.counters is not None,
+        'patterns': operation_counters.report()
+    })
+
+
+@app.route('/api/profiler', methods=['GET', 'POST'])
+def profiler_admin():
+    """
+    Estado del perfilador y funciones más costosas de las peticiones perfiladas.
+    Solo disponible con SAFETEXT_PROFILER_ADMIN=1 (responde 404 si no).
+    
+    Query (GET): limit (por defecto 20), sort ('cumulative' o 'tottime')
+    
+    Request JSON (POST, todo opcional):
+    {
+        "enabled": true,
+        "sample_rate": 0.05,  (fracción de peticiones a perfilar)
+        "threshold_ms": 200,  (de las perfiladas, conservar solo las más lentas; 0 para quitarlo)
+        "reset": true,  (descartar los perfiles acumulados)
+        "dump": true  (guardar ya el pstats acumulado)
+    }
+    """
+    if not PERFILADOR_ADMIN:
+        return jsonify({'success': False, 'error': 'Perfilador no habilitado (SAFETEXT_PROFILER_ADMIN)'}), 404
+    
+    try:
+        dump_path = None
+        if request.method == 'POST':
+            data = request.get_json(silent=True) or {}
+            try:
+                profiler.configure(
+                    enabled=data.get('enabled'),
+                    sample_rate=data.get('sample_rate'),
+                    threshold_ms=data.get('threshold_ms')
+                )
+            except (TypeError, ValueError):
+                return jsonify({'success': False, 'error': 'sample_rate y threshold_ms deben ser números'}), 400
+            if data.get('reset'):
+                profiler.reset()
+            if data.get('dump'):
+                dump_path = profiler.dump()
+
+        try:
+            limit = max(1, int(request.args.get('limit', 20)))
+        except ValueError:
+            return jsonify({'success': False, 'error': 'limit debe ser un número entero'}), 400
+        sort = request.args.get('sort', 'cumulative')
+        if sort not in ('cumulative', 'tottime'):
+            return jsonify({'success': False, 'error': 'sort debe ser "cumulative" o "tottime"'}), 400
+
+        return jsonify({
+            'success': True,
+            'profiler': profiler.status(),
+            'dump_file': dump_path,
+            'top_functions': profiler.summary(limit, sort)
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'Error en el perfilador: {str(e)}'}), 500
+
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """
+    Estadísticas de la caché de resultados de análisis.
+    """
+    if analyzer.cache is None:
+        return jsonify({'success': True, 'enabled': False})
+
+    return jsonify({
+        'success': True,
+        'enabled': True,
+        'patterns_version': analyzer.patterns_hash,
+        'cache': analyzer.cache.stats()
+    })
+
+
 @app.route('/api/patterns/reload', methods=['POST'])
 def reload_patterns():
     """
     Recarga los patrones desde el archivo CSV.
     
+    Request JSON (opcional):
+    {
+        "background": true  (recargar en segundo plano y responder de inmediato)
+    }
+    
     Response JSON:
     {
         "success": true,
@@ -578,7 +1103,20 @@ def reload_patterns():
     """
     try:
         generar_archivo_combinado()        
+        
+        data = request.get_json(silent=True) or {}
+        if data.get('background'):
+            # Los análisis siguen con la instantánea actual hasta que la nueva esté lista
+            analyzer.reload_in_background()
+            patterns_sync.publish()
+            return jsonify({
+                'success': True,
+                'message': 'Recarga de patrones en curso',
+                'patterns_version': analyzer.patterns_version
+            }), 202
+        
         analyzer.load_patterns()
+        patterns_sync.publish()
         
         return jsonify({
             'success': True,
@@ -601,7 +1139,7 @@ def test_api():
         'success': True,
         'message': 'API de SafeText funcionando correctamente',
         'version': '1.0.0',
-        'algorithms': ['KMP', 'Boyer-Moore'],
+        'algorithms': list(selector.algorithms),
         'total_patterns': len(analyzer.patterns)
     })
 
@@ -668,18 +1206,22 @@ def internal_error(error):
 @app.route('/api/add-pattern', methods=['POST'])
 def add_pattern():
     """
-    Añade un nuevo patrón al archivo base y recarga los patrones en memoria.
+    Añade un nuevo patrón al archivo base y a los patrones en memoria.
     Espera un JSON con:
     {
         "id": "11",
         "frase": "nuevo patrón",
         "categorias": "Insulto",
         "nivel_gravedad": 50,
+        "max_errores": 1,  (opcional: ediciones permitidas en la búsqueda aproximada)
+        "modo": "palabra",  (opcional: "subcadena" o "palabra" para palabras completas)
         "descripcion": "Descripción del patrón"
     }
     """
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'success': False, 'error': 'Se esperaba un objeto JSON con el patrón'}), 400
 
         # Validar campos requeridos
         required = ['id', 'frase', 'categorias', 'nivel_gravedad', 'descripcion']
@@ -687,20 +1229,47 @@ def add_pattern():
             if campo not in data or data[campo] == '':
                 return jsonify({'success': False, 'error': f'Campo faltante o vacío: {campo}'}), 400
 
-        # Añadir al archivo base
-        with open(BASE_FILE, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                data['id'],
-                data['frase'],
-                data['categorias'],
-                data['nivel_gravedad'],
-                data['descripcion']
-            ])
-
-        # Recargar en memoria       
-        generar_archivo_combinado()
-        analyzer.load_patterns()  # actualizar archivo combinado
+        # Validar antes de escribir: una fila inválida en el CSV haría fallar
+        # la siguiente carga completa
+        try:
+            nivel = int(data['nivel_gravedad'])
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'nivel_gravedad debe ser un número entero'}), 400
+        if not 0 <= nivel <= 100:
+            return jsonify({'success': False, 'error': 'nivel_gravedad debe estar entre 0 y 100'}), 400
+
+        max_errores = data.get('max_errores')
+        if max_errores not in (None, ''):
+            try:
+                max_errores = int(max_errores)
+            except (TypeError, ValueError):
+                max_errores = -1
+            if max_errores < 0:
+                return jsonify({'success': False, 'error': 'max_errores debe ser un entero no negativo'}), 400
+
+        # Añadir al archivo base respetando el orden de sus columnas
+        with open(BASE_FILE, 'r', encoding='utf-8') as f:
+            headers = next(csv.reader(f), None) or required
+        if max_errores and 'max_errores' not in headers:
+            return jsonify({'success': False, 'error': f'{BASE_FILE} no tiene la columna max_errores'}), 400
+        if data.get('modo'):
+            if data['modo'] not in ('subcadena', 'palabra'):
+                return jsonify({'success': False, 'error': 'modo debe ser "subcadena" o "palabra"'}), 400
+            if 'modo' not in headers:
+                return jsonify({'success': False, 'error': f'{BASE_FILE} no tiene la columna modo'}), 400
+
+        data = dict(data, nivel_gravedad=nivel, max_errores=max_errores)
+        fila = {campo: '' if data.get(campo) is None else str(data[campo]) for campo in headers}
+
+        def guardar_fila():
+            with open(BASE_FILE, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=headers)
+                writer.writerow(fila)
+
+        # Escribir la fila y añadirla en memoria (sin releer el archivo) sin
+        # que una recarga en segundo plano se cuele entre los dos pasos
+        analyzer.add_patterns([fila], persist=guardar_fila)
+        patterns_sync.publish()
         return jsonify({'success': True, 'message': 'Patrón añadido correctamente', 'total_patterns': len(analyzer.patterns)})
 
     except Exception as e:
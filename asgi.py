@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+"""
+Punto de entrada ASGI para la API de análisis.
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+
+El bucle de eventos solo se ocupa de la entrada y salida: recibe el cuerpo
+completo de cada petición sin ocupar un hilo (los clientes lentos ya no
+bloquean a nadie) y delega el análisis, que es puro cálculo, a un pool de
+hilos acotado. Las peticiones se atienden con las mismas vistas de Flask,
+así que /api/analyze, /api/search-pattern y /api/recommendations mantienen
+exactamente el mismo contrato.
+"""
+
+import asyncio
+import io
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from app import app as flask_app
+
+# Hilos que ejecutan el análisis y peticiones admitidas a la vez (el resto
+# recibe 503 en lugar de acumularse sin límite)
+ASGI_WORKERS = int(os.environ.get('SAFETEXT_ASGI_WORKERS') or 4)
+ASGI_MAX_PENDING = int(os.environ.get('SAFETEXT_ASGI_MAX_PENDING') or 256)
+MAX_BODY_BYTES = int(os.environ.get('SAFETEXT_MAX_BODY_BYTES') or 10 * 1024 * 1024)
+
+# Endpoints servidos en modo ASGI
+ROUTES = {'/api/analyze', '/api/search-pattern', '/api/recommendations'}
+
+
+class ClientDisconnected(Exception):
+    """El cliente se desconectó antes de enviar el cuerpo completo."""
+
+
+class SafeTextASGI:
+    def __init__(self, wsgi_app, workers=ASGI_WORKERS, max_pending=ASGI_MAX_PENDING):
+        """
+        Args:
+            wsgi_app: Aplicación Flask con las vistas de la API
+            workers (int): Hilos del pool de análisis
+            max_pending (int): Peticiones admitidas a la vez (en cola o en curso)
+        """
+        self.wsgi_app = wsgi_app
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='safetext-asgi')
+        self.max_pending = max_pending
+        self.pending = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        if scope['path'] not in ROUTES:
+            await self._send_json(send, 404, {'success': False, 'error': 'Endpoint no encontrado'})
+            return
+
+        if self.pending >= self.max_pending:
+            await self._send_json(send, 503, {'success': False, 'error': 'Servidor ocupado, intenta de nuevo'})
+            return
+
+        self.pending += 1
+        try:
+            try:
+                body = await self._read_body(receive)
+            except ClientDisconnected:
+                # Un cuerpo a medias no se analiza: no hay a quién responder
+                return
+            if body is None:
+                await self._send_json(send, 413, {'success': False, 'error': 'Cuerpo de la petición demasiado grande'})
+                return
+
+            environ = self._build_environ(scope, body)
+            loop = asyncio.get_running_loop()
+            status, headers, content = await loop.run_in_executor(self.executor, self._call_wsgi, environ)
+        finally:
+            self.pending -= 1
+
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': content})
+
+    async def _lifespan(self, receive, send):
+        """
+        Atiende los eventos de arranque y parada del servidor.
+        """
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _read_body(self, receive):
+        """
+        Recibe el cuerpo completo de la petición sin bloquear el bucle de eventos.
+
+        Returns:
+            bytes: El cuerpo, o None si supera MAX_BODY_BYTES
+
+        Raises:
+            ClientDisconnected: Si el cliente se desconecta antes del final
+        """
+        parts = []
+        size = 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                raise ClientDisconnected()
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > MAX_BODY_BYTES:
+                return None
+            parts.append(chunk)
+            if not message.get('more_body', False):
+                break
+        return b''.join(parts)
+
+    def _build_environ(self, scope, body):
+        """
+        Traduce una petición ASGI al entorno WSGI que esperan las vistas de Flask.
+
+        Args:
+            scope (dict): Scope ASGI de la petición
+            body (bytes): Cuerpo completo de la petición
+
+        Returns:
+            dict: Entorno WSGI
+        """
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', ''),
+            'PATH_INFO': scope['path'],
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': client[0],
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False
+        }
+
+        for name, value in scope.get('headers', []):
+            name = name.decode('latin-1').upper().replace('-', '_')
+            value = value.decode('latin-1')
+            if name == 'CONTENT_TYPE':
+                environ['CONTENT_TYPE'] = value
+            elif name != 'CONTENT_LENGTH':
+                key = f'HTTP_{name}'
+                environ[key] = f'{environ[key]},{value}' if key in environ else value
+
+        return environ
+
+    def _call_wsgi(self, environ):
+        """
+        Ejecuta la vista de Flask (en un hilo del pool) y recoge la respuesta.
+
+        Args:
+            environ (dict): Entorno WSGI de la petición
+
+        Returns:
+            tuple: (estado, cabeceras ASGI, cuerpo)
+        """
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [
+                (name.lower().encode('latin-1'), value.encode('latin-1'))
+                for name, value in headers
+            ]
+
+        result = self.wsgi_app(environ, start_response)
+        try:
+            content = b''.join(result)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+
+        return response['status'], response['headers'], content
+
+    async def _send_json(self, send, status, payload):
+        """
+        Envía una respuesta JSON generada directamente en el bucle de eventos.
+        """
+        body = json.dumps(payload).encode('utf-8')
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode('latin-1'))
+            ]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+
+app = SafeTextASGI(flask_app)
+
+if __name__ == '__main__':
+    import uvicorn
+
+    port = int(os.environ.get('PORT', 5000))
+    uvicorn.run(app, host='0.0.0.0', port=port)
@@ -0,0 +1,74 @@
+"""
+Configuración de gunicorn para producción con varios workers.
+
+    gunicorn -c gunicorn.conf.py app:app
+
+El proceso maestro importa la aplicación (y con ella compila los patrones)
+una sola vez antes de crear los workers. Justo antes del fork se congelan
+los objetos del recolector de basura, así que los workers comparten esas
+páginas de memoria por copy-on-write en lugar de tener cada uno su copia.
+Las recargas se coordinan con el archivo de versión de app.py. Cada worker
+crea su propio pool de análisis por lotes, dimensionado con WEB_CONCURRENCY
+para no multiplicar los procesos (ver algorithms/batch.py).
+
+Las métricas de /metrics se reúnen en SAFETEXT_METRICS_DIR (por defecto un
+directorio temporal de este maestro, que se vacía al arrancar): cualquier
+worker que atienda el scrape devuelve los totales de todos.
+"""
+
+import gc
+import glob
+import multiprocessing
+import os
+import sys
+import tempfile
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY') or multiprocessing.cpu_count())
+# El pool de /api/analyze-batch reparte los núcleos entre los workers
+os.environ.setdefault('WEB_CONCURRENCY', str(workers))
+threads = int(os.environ.get('GUNICORN_THREADS') or 4)
+worker_class = 'gthread'
+timeout = int(os.environ.get('GUNICORN_TIMEOUT') or 120)
+preload_app = True
+accesslog = '-'
+
+os.environ.setdefault(
+    'SAFETEXT_METRICS_DIR', os.path.join(tempfile.gettempdir(), f'safetext-metricas-{os.getpid()}'))
+
+# Sin recolecciones mientras se carga la aplicación: una recolección en el
+# maestro tocaría los objetos de los patrones y los sacaría de las páginas
+# compartidas
+gc.disable()
+
+
+def on_starting(server):
+    # Valores de una ejecución anterior no deben sumarse a los de esta
+    for path in glob.glob(os.path.join(os.environ['SAFETEXT_METRICS_DIR'], 'metricas-*.json')):
+        os.remove(path)
+
+
+def when_ready(server):
+    # Las métricas de la carga inicial se guardan una vez desde el maestro
+    # (sin sus medidores) y cada worker empieza de cero
+    app = sys.modules.get('app')
+    if app is not None:
+        from algorithms.metrics import mark_process_dead
+        app.metrics.flush()
+        mark_process_dead(app.metrics.directory, os.getpid())
+
+    # Mover todo lo cargado a la generación permanente antes de crear workers
+    gc.freeze()
+    server.log.info('Patrones precargados; %d objetos congelados', gc.get_freeze_count())
+
+
+def post_fork(server, worker):
+    app = sys.modules.get('app')
+    if app is not None:
+        app.metrics.reset()
+    gc.enable()
+
+
+def child_exit(server, worker):
+    from algorithms.metrics import mark_process_dead
+    mark_process_dead(os.environ['SAFETEXT_METRICS_DIR'], worker.pid)
@@ -0,0 +1,78 @@
+import random
+
+import pytest
+
+from algorithms.approximate import ApproximateAlgorithm
+from algorithms.compiled import CompiledPattern
+
+
+def edit_distance(a, b):
+    row = list(range(len(b) + 1))
+    for i, a_char in enumerate(a, 1):
+        new_row = [i]
+        for j, b_char in enumerate(b, 1):
+            new_row.append(min(row[j - 1] + (a_char != b_char), row[j] + 1, new_row[j - 1] + 1))
+        row = new_row
+    return row[-1]
+
+
+def best_distance_by_end(text, pattern):
+    # Sellers: menor distancia de edición de un fragmento que termina en cada posición
+    row = [0] * (len(text) + 1)
+    for i, p_char in enumerate(pattern, 1):
+        new_row = [i]
+        for j, t_char in enumerate(text, 1):
+            new_row.append(min(row[j - 1] + (p_char != t_char), row[j] + 1, new_row[j - 1] + 1))
+        row = new_row
+    return row[1:]
+
+
+def runs_within(distances, k):
+    # Grupos de finales consecutivos con distancia <= k, como los agrupa _collapse
+    runs = []
+    for end, distance in enumerate(distances):
+        if distance <= k:
+            if runs and runs[-1][-1][0] == end - 1:
+                runs[-1].append((end, distance))
+            else:
+                runs.append([(end, distance)])
+    return runs
+
+
+def random_cases(seed, count=200):
+    rng = random.Random(seed)
+    for _ in range(count):
+        pattern = ''.join(rng.choice('abc') for _ in range(rng.randint(2, 7)))
+        text = ''.join(rng.choice('abcd') for _ in range(rng.randint(0, 40)))
+        yield text, pattern
+
+
+def test_exact_mode_matches_str_find():
+    engine = ApproximateAlgorithm()
+    for text, pattern in random_cases(0):
+        expected = [i for i in range(len(text)) if text.startswith(pattern, i)]
+        assert [start for start, _, _ in engine.scan(text, CompiledPattern(pattern))] == expected
+
+
+@pytest.mark.parametrize('k', [1, 2])
+def test_matches_agree_with_brute_force_edit_distance(k):
+    engine = ApproximateAlgorithm()
+    for text, pattern in random_cases(k):
+        k_used = min(k, len(pattern) - 1)
+        runs = runs_within(best_distance_by_end(text, pattern), k_used)
+        matches = engine.scan(text, CompiledPattern(pattern, max_errors=k))
+
+        assert len(matches) == len(runs), (text, pattern)
+        for (start, length, distance), run in zip(matches, runs):
+            end = start + length - 1
+            assert run[0][0] <= end <= run[-1][0]
+            assert distance == min(d for _, d in run)
+            assert edit_distance(text[start:start + length], pattern) == distance
+
+
+def test_finds_typo_variants():
+    engine = ApproximateAlgorithm()
+    pattern = CompiledPattern('estupido', max_errors=1)
+    for variant in ['estupdo', 'estuppido', 'estipido']:
+        assert engine.search(f'eres un {variant} de verdad', pattern) == [8]
+    assert engine.search('eres un estudiante', pattern) == []
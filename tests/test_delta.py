@@ -0,0 +1,110 @@
+import csv
+
+import pytest
+
+from algorithms import snapshot as snapshot_module
+from algorithms.analyzer import CyberbullyingAnalyzer
+from algorithms.prepared_text import PreparedText
+
+COLUMNS = ['id', 'frase', 'categorias', 'nivel_gravedad', 'descripcion', 'max_errores', 'modo']
+
+BASE = [
+    {'id': '1', 'frase': 'idiota', 'nivel_gravedad': 70},
+    {'id': '2', 'frase': 'nadie te quiere', 'nivel_gravedad': 90, 'modo': 'palabra'},
+    {'id': '3', 'frase': 'estupido', 'nivel_gravedad': 60, 'max_errores': 1},
+    {'id': '4', 'frase': 'tonto', 'nivel_gravedad': 40},
+    {'id': '5', 'frase': 'fea', 'nivel_gravedad': 30, 'modo': 'palabra'},
+]
+
+ADDED = [
+    {'id': '6', 'frase': 'perdedor', 'nivel_gravedad': 80},
+    {'id': '7', 'frase': 'vete de aqui', 'nivel_gravedad': 85, 'modo': 'palabra'},
+    {'id': '8', 'frase': 'basura', 'nivel_gravedad': 50, 'max_errores': 1},
+]
+
+TEXTS = [
+    'eres un idiota y nadie te quiere',
+    'que estupdo eres, tonto, vete de aqui',
+    'eres un perdedor y una basurra, fea',
+    'la feria de la tontería',
+    'nadie te quiere perdedor idiota estupido',
+    'hola que tal',
+]
+
+
+def write_csv(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=COLUMNS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({'categorias': 'insulto', 'descripcion': 'd', **row})
+    return str(path)
+
+
+def full_row(row):
+    return {'categorias': 'insulto', 'descripcion': 'd', **{key: str(value) for key, value in row.items()}}
+
+
+def summary(analyzer, text):
+    result = analyzer.analyze_text(text)
+    matches = sorted(
+        (match['pattern_info']['id'], match['pattern_info']['severity'], tuple(match['positions']))
+        for match in result['matches']
+    )
+    return result['total_matches'], result['risk_level'], matches, analyzer.analyze_verdict(text, 10)['risk_level']
+
+
+def assert_same_results(incremental, reloaded):
+    for text in TEXTS:
+        assert summary(incremental, text) == summary(reloaded, text), text
+
+
+def apply_edits(analyzer):
+    analyzer.add_patterns([full_row(row) for row in ADDED])
+    assert analyzer.remove_patterns(['4', '7']) == 2
+    assert analyzer.update_severity('1', 95) == 1
+    assert analyzer.update_severity('6', 20) == 1
+
+
+def final_rows():
+    rows = [dict(row) for row in BASE + ADDED if row['id'] not in ('4', '7')]
+    for row in rows:
+        if row['id'] == '1':
+            row['nivel_gravedad'] = 95
+        if row['id'] == '6':
+            row['nivel_gravedad'] = 20
+    return rows
+
+
+def test_delta_updates_match_a_full_reload(tmp_path):
+    incremental = CyberbullyingAnalyzer(write_csv(tmp_path / 'base.csv', BASE), precompiled=False, cache=False)
+    apply_edits(incremental)
+    assert incremental.snapshot.delta_indices
+
+    reloaded = CyberbullyingAnalyzer(write_csv(tmp_path / 'final.csv', final_rows()), precompiled=False, cache=False)
+    assert_same_results(incremental, reloaded)
+
+
+def test_compaction_rebuilds_without_delta(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot_module, 'COMPACT_MIN', 1)
+    monkeypatch.setattr(snapshot_module, 'COMPACT_RATIO', 1000)
+
+    incremental = CyberbullyingAnalyzer(write_csv(tmp_path / 'base.csv', BASE), precompiled=False, cache=False)
+    apply_edits(incremental)
+    snapshot = incremental.snapshot
+    assert snapshot.delta_indices == ()
+    assert snapshot.overridden == frozenset()
+    assert None not in snapshot.patterns
+
+    reloaded = CyberbullyingAnalyzer(write_csv(tmp_path / 'final.csv', final_rows()), precompiled=False, cache=False)
+    assert_same_results(incremental, reloaded)
+
+
+def test_previous_snapshot_is_not_modified(tmp_path):
+    analyzer = CyberbullyingAnalyzer(write_csv(tmp_path / 'base.csv', BASE), precompiled=False, cache=False)
+    before = analyzer.snapshot
+    analyzer.remove_patterns(['1'])
+
+    text = PreparedText('eres un idiota', fold=True)
+    assert [info['id'] for info, _ in before.search_patterns(text)] == ['1']
+    assert [info['id'] for info, _ in analyzer.snapshot.search_patterns(text)] == []
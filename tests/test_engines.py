@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+from algorithms.boyer_moore import BoyerMooreAlgorithm
+from algorithms.compiled import CompiledPattern
+from algorithms.horspool import HorspoolAlgorithm
+from algorithms.kmp import KMPAlgorithm
+from algorithms.sunday import SundayAlgorithm
+from algorithms.two_way import TwoWayAlgorithm
+
+ENGINES = [KMPAlgorithm, BoyerMooreAlgorithm, HorspoolAlgorithm, SundayAlgorithm, TwoWayAlgorithm]
+
+
+def find_all(text, pattern):
+    positions = []
+    position = text.find(pattern)
+    while position != -1:
+        positions.append(position)
+        position = text.find(pattern, position + 1)
+    return positions
+
+
+def random_cases(seed, alphabet, count=300):
+    rng = random.Random(seed)
+    for _ in range(count):
+        pattern = ''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 8)))
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 60)))
+        yield text, pattern
+
+
+@pytest.mark.parametrize('engine_class', ENGINES)
+@pytest.mark.parametrize('alphabet', ['ab', 'abc', 'abcdefgh'])
+def test_scan_matches_str_find(engine_class, alphabet):
+    engine = engine_class()
+    for text, pattern in random_cases(len(alphabet), alphabet):
+        assert list(engine.scan(text, CompiledPattern(pattern))) == find_all(text, pattern), (text, pattern)
+
+
+@pytest.mark.parametrize('engine_class', ENGINES)
+@pytest.mark.parametrize('pattern', ['aaaa', 'abab', 'abaabaab', 'aabaaab', 'tonto', 'a'])
+def test_periodic_patterns_overlap(engine_class, pattern):
+    # Patrones periódicos: es donde la regla de Galil y la factorización
+    # crítica de Two-Way pueden saltarse una coincidencia solapada
+    text = 'x' + pattern * 4 + pattern[:-1] + 'aaaaaaaaaa' + 'ab' * 10 + 'tontonto'
+    engine = engine_class()
+    assert list(engine.scan(text, CompiledPattern(pattern))) == find_all(text, pattern)
+
+
+@pytest.mark.parametrize('engine_class', ENGINES)
+def test_search_reports_original_positions(engine_class):
+    text = 'Eres un TONTO, muy tonto'
+    assert engine_class().search(text, 'tonto') == find_all(text.lower(), 'tonto')
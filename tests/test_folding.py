@@ -0,0 +1,73 @@
+import csv
+import random
+
+import pytest
+
+from algorithms import folding
+from algorithms.analyzer import CyberbullyingAnalyzer
+from algorithms.folding import fold_text, fold_with_offsets
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('ESTÚÚPIDO', 'estupido'),
+    ('3stúp1d0', 'estupido'),
+    ('idiiiiota', 'idiota'),
+    ('perrrrra', 'perra'),
+    ('perra', 'perra'),
+    ('perro', 'perro'),
+    ('correa', 'correa'),
+    ('gallina', 'gallina'),
+    ('leer', 'leer'),
+    ('año', 'año'),
+])
+def test_fold_text(text, expected):
+    assert fold_text(text) == expected
+
+
+def test_offsets_point_back_to_the_original():
+    rng = random.Random(0)
+    alphabet = 'aábcdeéillnñoóprrstuü013@$ .,!İIÉ'
+    for _ in range(500):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        folded, offsets = fold_with_offsets(text)
+        if offsets is None:
+            assert len(folded) == len(text)
+            offsets = range(len(text))
+        assert len(offsets) == len(folded)
+        assert list(offsets) == sorted(offsets)
+        for position, original in zip(range(len(folded)), offsets):
+            assert folded[position] in fold_text(text[original])
+
+
+@pytest.mark.skipif(folding.np is None, reason='requiere NumPy')
+def test_vectorized_and_python_folds_agree():
+    rng = random.Random(1)
+    alphabet = 'aábcdeéillnñoóprrstuü013@$ .,!IÉ'
+    for _ in range(500):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        vectorized, vectorized_offsets = folding._fold_vectorized(text.lower())
+        python, python_offsets = folding._fold_python(text)
+        assert vectorized == python
+        assert list(vectorized_offsets or range(len(text))) == list(python_offsets or range(len(text)))
+
+
+@pytest.fixture
+def folded_analyzer(tmp_path):
+    path = tmp_path / 'patrones.csv'
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(['id', 'frase', 'categorias', 'nivel_gravedad', 'descripcion'])
+        writer.writerow([1, 'perra', 'insulto', 80, ''])
+        writer.writerow([2, 'cara de perro', 'insulto', 70, ''])
+        writer.writerow([3, 'idiota', 'insulto', 70, ''])
+    return CyberbullyingAnalyzer(str(path), precompiled=False)
+
+
+@pytest.mark.parametrize('text', ['espera un momento', 'quiero una pera', 'pero no vino', 'cara de pero'])
+def test_doubled_letters_are_not_folded_away(folded_analyzer, text):
+    assert folded_analyzer.analyze_text(text)['total_matches'] == 0
+
+
+@pytest.mark.parametrize('text', ['eres una perrrra', 'IDIIIOTA', '1d10ta', 'cara de perro'])
+def test_obfuscated_variants_still_match(folded_analyzer, text):
+    assert folded_analyzer.analyze_text(text)['total_matches'] == 1
@@ -0,0 +1,86 @@
+import csv
+import pickle
+
+import pytest
+
+from algorithms import result_cache
+from algorithms.analyzer import CyberbullyingAnalyzer
+from algorithms.result_cache import ResultCache, text_digest
+
+
+@pytest.fixture
+def analyzer(tmp_path):
+    path = tmp_path / 'patrones.csv'
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(['id', 'frase', 'categorias', 'nivel_gravedad', 'descripcion'])
+        writer.writerow([1, 'idiota', 'insulto', 70, 'd'])
+        writer.writerow([2, 'tonto', 'insulto', 40, 'd'])
+    return CyberbullyingAnalyzer(str(path), precompiled=False)
+
+
+def test_hits_return_independent_copies():
+    cache = ResultCache()
+    cache.put('k', {'matches': [1, 2]})
+
+    first = cache.get('k')
+    first['matches'].append(3)
+    assert cache.get('k') == {'matches': [1, 2]}
+    assert cache.get('otra') is None
+    assert (cache.stats()['hits'], cache.stats()['misses']) == (2, 1)
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(result_cache.time, 'monotonic', lambda: now[0])
+    cache = ResultCache(ttl=10)
+    cache.put('k', {'a': 1})
+
+    now[0] = 109.0
+    assert cache.get('k') == {'a': 1}
+    now[0] = 111.0
+    assert cache.get('k') is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_evicts_least_recently_used_within_max_bytes():
+    entry_size = len(pickle.dumps({'v': 'x' * 100}, protocol=pickle.HIGHEST_PROTOCOL))
+    cache = ResultCache(max_bytes=entry_size * 2)
+    cache.put('a', {'v': 'x' * 100})
+    cache.put('b', {'v': 'x' * 100})
+    cache.get('a')
+    cache.put('c', {'v': 'x' * 100})
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['size_bytes'] <= cache.max_bytes
+
+    cache.put('grande', {'v': 'x' * 1000})
+    assert cache.get('grande') is None
+
+
+def test_text_digest_distinguishes_texts():
+    assert text_digest('hola') == text_digest('hola')
+    assert text_digest('hola') != text_digest('hola ')
+
+
+def test_analyzer_serves_repeated_texts_from_cache(analyzer):
+    first = analyzer.analyze_text('eres un idiota')
+    second = analyzer.analyze_text('eres un idiota')
+    assert second == first
+    assert analyzer.cache.stats()['hits'] == 1
+
+    # Cada modo de análisis tiene su propia entrada
+    analyzer.analyze_text('eres un idiota', compact=True)
+    analyzer.analyze_verdict('eres un idiota')
+    assert analyzer.cache.stats()['hits'] == 1
+
+
+def test_pattern_changes_never_return_stale_results(analyzer):
+    assert analyzer.analyze_text('eres un idiota')['total_matches'] == 1
+    analyzer.remove_patterns(['1'])
+    assert analyzer.analyze_text('eres un idiota')['total_matches'] == 0
+
+    analyzer.add_patterns([{'id': '3', 'frase': 'idiota', 'categorias': 'insulto', 'nivel_gravedad': '70', 'descripcion': 'd'}])
+    assert analyzer.analyze_text('eres un idiota')['total_matches'] == 1
@@ -0,0 +1,30 @@
+from algorithms.folding import fold_text
+from algorithms.selector import AlgorithmSelector
+
+
+def calibrated_selector(patterns, bucket_winner='KMP'):
+    selector = AlgorithmSelector(calibration_file=None)
+    costs = {'KMP': 1.0, 'Sunday': 2.0}
+    selector.calibration = {
+        'unit': 'ns/carácter',
+        'patterns': {pattern: {'winner': 'Sunday', 'costs': costs} for pattern in patterns},
+        'buckets': {bucket: {'winner': bucket_winner, 'costs': costs}
+                    for bucket in ('1-5', '6-10', '11-20', '21-40', '41+')}
+    }
+    return selector
+
+
+def test_calibration_is_looked_up_by_the_folded_form():
+    selector = calibrated_selector([fold_text('ESTÚPIDO'), fold_text('p3rra')])
+
+    for pattern in ('ESTÚPIDO', 'p3rra'):
+        compiled = selector.compile_pattern(pattern, normalized=fold_text(pattern))
+        assert compiled.analysis['recommended_algorithm'] == 'Sunday'
+        assert 'medición del patrón' in compiled.analysis['reason']
+
+
+def test_unmeasured_pattern_falls_back_to_its_length_bucket():
+    selector = calibrated_selector([], bucket_winner='KMP')
+    compiled = selector.compile_pattern('idiota', normalized=fold_text('idiota'))
+    assert compiled.analysis['recommended_algorithm'] == 'KMP'
+    assert 'longitud' in compiled.analysis['reason']
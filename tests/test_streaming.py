@@ -0,0 +1,41 @@
+import csv
+
+import pytest
+
+from algorithms import streaming
+from algorithms.analyzer import CyberbullyingAnalyzer
+from algorithms.streaming import StreamingAnalyzer
+
+
+@pytest.fixture
+def word_analyzer(tmp_path):
+    path = tmp_path / 'patrones.csv'
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(['id', 'frase', 'categorias', 'nivel_gravedad', 'descripcion', 'modo'])
+        writer.writerow([1, 'nadie te quiere', 'exclusión', 90, '', 'palabra'])
+        writer.writerow([2, 'idiota', 'insulto', 70, '', 'subcadena'])
+    return CyberbullyingAnalyzer(str(path), precompiled=False)
+
+
+def test_windows_stay_bounded_without_separators(word_analyzer, monkeypatch):
+    window_lengths = []
+    prepared_text = streaming.PreparedText
+
+    def recording(text, **kwargs):
+        window_lengths.append(len(text))
+        return prepared_text(text, **kwargs)
+
+    monkeypatch.setattr(streaming, 'PreparedText', recording)
+
+    document = 'ab' * 400_000 + ' idiota, nadie te quiere'
+    chunks = [document[i:i + 8192] for i in range(0, len(document), 8192)]
+    events = list(StreamingAnalyzer(word_analyzer, window_size=65536).analyze_chunks(chunks))
+
+    assert max(window_lengths) < 2 * 65536
+    found = sorted((match['pattern_id'], match['position'])
+                   for event in events if event['type'] == 'matches' for match in event['matches'])
+    expected = sorted((match['pattern_info']['id'], position)
+                      for match in word_analyzer.analyze_text(document)['matches'] for position in match['positions'])
+    assert found == expected
+    assert events[-1]['total_matches'] == 2
@@ -0,0 +1,78 @@
+import csv
+
+import pytest
+
+from algorithms.analyzer import CyberbullyingAnalyzer
+
+ROWS = [
+    ('1', 'idiota', 70, 0, 'subcadena'),
+    ('2', 'nadie te quiere', 90, 0, 'palabra'),
+    ('3', 'estupido', 60, 1, 'subcadena'),
+    ('4', 'tonto', 40, 0, 'subcadena'),
+    ('5', 'fea', 10, 0, 'palabra'),
+]
+
+TEXTS = [
+    '',
+    'hola que tal',
+    'fea',
+    'eres fea y tonta',
+    'que tonto, muy tonto',
+    'estupdo',
+    'eres un idiota',
+    'idiota idiota, nadie te quiere, estupido y tonto',
+    'la feria de la tontería',
+]
+
+
+@pytest.fixture(params=['aho-corasick', 'selector'])
+def analyzer(request, tmp_path):
+    path = tmp_path / 'patrones.csv'
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(['id', 'frase', 'categorias', 'nivel_gravedad', 'descripcion', 'max_errores', 'modo'])
+        for pattern_id, phrase, level, errors, mode in ROWS:
+            writer.writerow([pattern_id, phrase, 'insulto', level, 'd', errors, mode])
+    return CyberbullyingAnalyzer(str(path), engine=request.param, precompiled=False, cache=False)
+
+
+def test_without_early_exit_matches_full_analysis(analyzer):
+    for text in TEXTS:
+        verdict = analyzer.analyze_verdict(text, threshold=10 ** 6)
+        full = analyzer.analyze_text(text)
+        assert verdict['early_exit'] is False
+        assert verdict['risk_level'] == full['risk_level'], text
+        assert verdict['is_cyberbullying'] == full['is_cyberbullying'], text
+
+
+@pytest.mark.parametrize('threshold', [1, 3, 7, 15])
+def test_early_exit_reaches_the_threshold(analyzer, threshold):
+    levels = ['None', 'Low', 'Medium', 'High', 'Critical']
+    cut = {1: 'Low', 3: 'Medium', 7: 'High', 15: 'Critical'}[threshold]
+    for text in TEXTS:
+        verdict = analyzer.analyze_verdict(text, threshold)
+        full = analyzer.analyze_text(text)
+        if verdict['early_exit']:
+            assert levels.index(verdict['risk_level']) >= levels.index(cut)
+            assert levels.index(verdict['risk_level']) <= levels.index(full['risk_level'])
+        else:
+            assert verdict['risk_level'] == full['risk_level'], text
+
+
+def test_stops_consuming_matches_once_the_threshold_is_met(analyzer):
+    snapshot = analyzer.snapshot
+    original = snapshot.iter_severity_matches
+    consumed = []
+
+    def counting(*args, **kwargs):
+        for item in original(*args, **kwargs):
+            consumed.append(item)
+            yield item
+
+    snapshot.iter_severity_matches = counting
+    verdict = analyzer.analyze_verdict('idiota idiota, nadie te quiere, estupido y tonto', threshold=15)
+
+    assert verdict['early_exit'] is True
+    assert verdict['risk_level'] == 'Critical'
+    # El primer patrón crítico basta: no se recorren los niveles inferiores
+    assert [severity for severity, _ in consumed] == ['Critical']